@@ -0,0 +1,30 @@
+import gc
+import os
+
+# ============ gunicorn設定 ============
+# 起動コマンドの引数（--bind, --workers, --threads, --timeout）はDockerfileで指定する。
+# WARMUP_ON_BOOT=1 のときはアプリをマスタープロセスで読み込み（main でキャッシュをウォームアップ）、
+# 読み込んだオブジェクトをGCの対象外にしてからワーカーをフォークする。
+# GCが参照カウント・ヘッダーを書き換えないため、ワーカー間でメモリページがコピーオンライトで共有されたままになる。
+# CACHE_SNAPSHOT_PATH があれば、ワーカーの終了時（Cloud RunのSIGTERMを含む）にキャッシュを保存する。
+
+preload_app = os.environ.get('WARMUP_ON_BOOT') == '1'
+
+
+def when_ready(server):
+    """ワーカーのフォーク前（プリロード済み）: 読み込んだオブジェクトを固定世代に移す"""
+    if preload_app:
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    """フォーク直後のワーカー: 親プロセスのSheets APIの接続を使わないよう作り直させる"""
+    if preload_app:
+        from services import sheet_api
+        sheet_api.reset_connection()
+
+
+def worker_exit(server, worker):
+    """ワーカーの終了時: 次の起動で使うキャッシュのスナップショットを保存"""
+    from services import sheet_api
+    sheet_api.save_snapshot()
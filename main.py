@@ -1,14 +1,76 @@
 import os
 import io
 import csv
-import json
+import time
+import zlib
+import hashlib
 import calendar
+import math
+import functools
 from datetime import datetime, timedelta
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, Response
-from services import sheet_api
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, Response, session, make_response, stream_with_context, send_file
+from services import sheet_api, render_cache, csv_import, compression, assets, metrics, profiler, request_log
 
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'ekiden-app-secret-key')
+app.jinja_env.globals['cache_fragment'] = render_cache.cache_fragment
+app.jinja_env.globals['asset_url'] = assets.asset_url
+app.before_request(metrics.start_request)
+app.after_request(metrics.record_request)  # 圧縮後に実行されるよう先に登録（応答時間に圧縮を含める）
+request_log.init_app(app)  # SLOW_REQUEST_MS を超えたリクエストをJSONで標準出力に記録
+app.after_request(compression.compress_response)  # HTML・JSONをbrotli/gzipで圧縮
+app.before_request(profiler.start_request)  # PROFILING_ENABLED=1 のとき ?_profile=1 のリクエストをプロファイル
+app.after_request(profiler.finish_request)
+
+# デプロイ単位の識別子（テンプレート変更時にETagを変えるため）
+BUILD_ID = os.environ.get('K_REVISION') or str(int(time.time()))
+
+# ============ 条件付きGET (ETag) ============
+
+def conditional_get(*cache_keys, daily=False):
+    """ルートが読むテーブルのデータバージョンからETagを作り、If-None-Matchが一致すれば304を返すデコレータ
+
+    描画結果はETagをキーにキャッシュし、データが変わっていなければ描画自体を省略する。
+
+    Args:
+        cache_keys: ルートが参照する sheet_api のキャッシュキー
+        daily: 今日の日付で表示が変わる画面（カレンダー等）の場合True
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            # フラッシュメッセージ表示待ち・プロファイル中の場合は毎回描画する
+            if session.get('_flashes') or profiler.is_profiling():
+                return view(*args, **kwargs)
+            try:
+                versions = sheet_api.get_data_versions(cache_keys)
+            except Exception:
+                return view(*args, **kwargs)
+
+            parts = [BUILD_ID, request.full_path]
+            parts.extend(f'{key}={versions[key]}' for key in cache_keys)
+            if daily:
+                parts.append(datetime.now().strftime('%Y-%m-%d'))
+            etag = hashlib.md5('|'.join(parts).encode('utf-8')).hexdigest()
+
+            cached = render_cache.pages.get(etag)
+            # 圧縮時は弱いETag（W/"..."）で返すため弱い比較で判定
+            if request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+            elif cached is not None:
+                body, mimetype = cached
+                response = Response(body, mimetype=mimetype)
+            else:
+                response = make_response(view(*args, **kwargs))
+                # エラー時（flashを設定した場合）やリダイレクトはキャッシュさせない
+                if response.status_code != 200 or session.modified:
+                    return response
+                render_cache.pages.set(etag, (response.get_data(), response.mimetype))
+            response.set_etag(etag)
+            response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
 
 # ============ カスタムJinja2フィルター ============
 
@@ -99,6 +161,7 @@ def calc_pace(time_str, distance_m):
 # ============ 選手一覧 (ホーム) ============
 
 @app.route("/")
+@conditional_get('all_players')
 def index():
     """選手一覧画面"""
     try:
@@ -139,6 +202,7 @@ def index():
 # ============ 選手詳細 ============
 
 @app.route("/player/<player_id>")
+@conditional_get('all_players_inactive', 'all_records')
 def player_detail(player_id):
     """選手詳細画面"""
     try:
@@ -148,13 +212,11 @@ def player_detail(player_id):
             return redirect(url_for('index'))
 
         records = sheet_api.get_records_by_player(player_id)
-        records_json = json.dumps(records, ensure_ascii=False)
         personal_bests = sheet_api.get_personal_bests(player_id)
 
         return render_template('detail.html',
                                player=player,
                                records=records,
-                               records_json=records_json,
                                personal_bests=personal_bests)
     except Exception as e:
         flash(f'エラーが発生しました: {str(e)}', 'danger')
@@ -384,20 +446,104 @@ def record_delete(row_index):
 
     return redirect(url_for('index'))
 
+# ============ 記録API ============
+
+@app.route("/api/records")
+@conditional_get('all_records')
+def api_records():
+    """記録検索APIエンドポイント
+
+    クエリ: player_id, race_id, race_name, event, date_from, date_to,
+            limit（既定50・最大500）, cursor（前回のnext_cursor）, fields（カンマ区切り）
+    """
+    fields = [f.strip() for f in request.args.get('fields', '').split(',') if f.strip()]
+    allowed = set(sheet_api.RECORD_EXPECTED_HEADERS) | {'row_index'}
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        return jsonify({'error': f'指定できない項目です: {", ".join(unknown)}'}), 400
+
+    try:
+        result = sheet_api.query_records(
+            player_id=request.args.get('player_id', ''),
+            race_id=request.args.get('race_id', ''),
+            race_name=request.args.get('race_name', ''),
+            event=request.args.get('event', ''),
+            date_from=request.args.get('date_from', ''),
+            date_to=request.args.get('date_to', ''),
+            cursor=request.args.get('cursor', ''),
+            limit=request.args.get('limit', sheet_api.RECORDS_PAGE_SIZE, type=int),
+            fields=fields or None
+        )
+        return jsonify({'data': result['records'], 'next_cursor': result['next_cursor']})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route("/api/snapshot")
+@conditional_get('all_players', 'all_records', 'all_masters', 'all_events', daily=True)
+def api_snapshot():
+    """オフライン用データ一式（Service WorkerがIndexedDBに保存する）"""
+    try:
+        return jsonify({'data': sheet_api.get_offline_snapshot()})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route("/api/changes")
+def api_changes():
+    """差分同期APIエンドポイント
+
+    クエリ: since（前回のversion、必須）, tables（カンマ区切り、省略時は全テーブル）
+    reset=true が返った場合は全データ（/api/snapshot など）を取り直す。
+    """
+    since = request.args.get('since', type=int)
+    if since is None:
+        return jsonify({'error': 'since を整数で指定してください'}), 400
+    tables = [t.strip() for t in request.args.get('tables', '').split(',') if t.strip()]
+    known = {table for table, _ in sheet_api.CHANGE_TRACKED_KEYS.values()}
+    unknown = [t for t in tables if t not in known]
+    if unknown:
+        return jsonify({'error': f'指定できないテーブルです: {", ".join(unknown)}'}), 400
+
+    try:
+        result = sheet_api.get_changes(since, tables or None)
+        return jsonify({'data': result['changes'], 'version': result['version'], 'reset': result['reset']})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # ============ シミュレーション ============
 
 @app.route("/simulation")
+@conditional_get('all_players', 'all_records', 'all_simulations')
 def simulation():
     """シミュレーション画面"""
     try:
         players = sheet_api.get_all_players()
-        simulations = sheet_api.get_all_simulations()
+        page = request.args.get('page', 1, type=int)
+        simulation_page = sheet_api.get_simulations_page(page)
+        # PB未登録の選手は記録から予測した5000mタイムを表示
+        predicted_5000m = sheet_api.get_predicted_times(5.0, players)
         return render_template('simulation.html',
                                players=players,
-                               simulations=simulations)
+                               simulations=simulation_page['items'],
+                               page=simulation_page['page'],
+                               pages=simulation_page['pages'],
+                               predicted_5000m=predicted_5000m)
     except Exception as e:
         flash(f'エラーが発生しました: {str(e)}', 'danger')
-        return render_template('simulation.html', players=[], simulations=[])
+        return render_template('simulation.html', players=[], simulations=[], page=1, pages=1, predicted_5000m={})
+
+@app.route("/api/simulation/<int:row_index>")
+@conditional_get('all_simulations')
+def api_simulation_detail(row_index):
+    """保存済みシミュレーション取得APIエンドポイント"""
+    try:
+        simulation = sheet_api.get_simulation_by_row(row_index)
+        if not simulation:
+            return jsonify({'error': 'シミュレーションが見つかりません'}), 404
+        return jsonify({'data': simulation})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
 @app.route("/simulation/save", methods=['POST'])
 def simulation_save():
@@ -412,9 +558,60 @@ def simulation_save():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route("/api/predictions")
+@conditional_get('all_players', 'all_records', 'ekiden_distance', 'ekiden_individual')
+def api_predictions():
+    """区間予測タイムAPIエンドポイント（leg指定時はその区間の選手別予測と順位相当）"""
+    leg = request.args.get('leg', '')
+
+    try:
+        if leg:
+            data = sheet_api.get_ekiden_leg_predictions(leg)
+        else:
+            data = sheet_api.get_ekiden_prediction_matrix()
+        if isinstance(data, dict) and 'error' in data:
+            return jsonify({'error': data['error']}), 400
+        return jsonify({'data': data})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route("/api/simulation/optimize", methods=['POST'])
+def api_simulation_optimize():
+    """区間オーダー最適化APIエンドポイント
+
+    リクエストJSON:
+        legs: [{'leg': 区間名, 'distance_km': 距離}, ...]（省略時はeditionの区間距離）
+        edition: 区間距離を使う大会回数（省略時は最新回）
+        pinned: {区間名: 選手ID}
+        excluded: [選手ID, ...]
+        alternatives: 次善案の件数（既定2）
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        legs = data.get('legs')
+        if not legs:
+            legs = sheet_api.get_ekiden_leg_distances(data.get('edition'))
+        else:
+            legs = [{'leg': str(l['leg']), 'distance_km': float(l['distance_km'])} for l in legs]
+
+        result = sheet_api.optimize_ekiden_order(
+            legs=legs,
+            pinned=data.get('pinned'),
+            excluded=data.get('excluded'),
+            alternatives=data.get('alternatives', 2)
+        )
+        if isinstance(result, dict) and 'error' in result:
+            return jsonify({'error': result['error']}), 400
+        return jsonify({'data': result})
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'error': f'リクエストが不正です: {str(e)}'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # ============ チーム統計 ============
 
 @app.route("/statistics")
+@conditional_get('all_players', 'all_records')
 def statistics():
     """チーム統計画面"""
     try:
@@ -431,84 +628,145 @@ def statistics():
 
 # ============ CSVエクスポート ============
 
-@app.route("/export/players")
-def export_players():
-    """選手一覧をCSVエクスポート"""
-    try:
-        players = sheet_api.get_all_players_including_inactive()
-
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(['ID', '登録番号', '姓', '名', '氏名', '生年月日', '学年', '所属', 'カテゴリ', 'ステータス',
-                        '1500m PB', '3000m PB', '5000m PB', '10000m PB', 'ハーフPB', 'フルPB', 'コメント'])
-
-        for p in players:
-            writer.writerow([
-                p.get('id', ''),
-                p.get('registration_number', ''),
-                p.get('name_sei', ''),
-                p.get('name_mei', ''),
-                p.get('name', ''),
-                p.get('birth_date', ''),
-                p.get('grade', ''),
-                p.get('affiliation', ''),
-                p.get('category', ''),
-                p.get('status', ''),
-                p.get('pb_1500m', ''),
-                p.get('pb_3000m', ''),
-                p.get('pb_5000m', ''),
-                p.get('pb_10000m', ''),
-                p.get('pb_half', ''),
-                p.get('pb_full', ''),
-                p.get('comment', '')
-            ])
-
-        output.seek(0)
-        return Response(
-            output.getvalue(),
-            mimetype='text/csv',
-            headers={'Content-Disposition': 'attachment; filename=players.csv'}
-        )
-    except Exception as e:
-        flash(f'エクスポートに失敗しました: {str(e)}', 'danger')
+# ストリーミング時に1回で送るおおよそのサイズ（文字数）
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+def _iter_csv(header, rows):
+    """CSVを一定サイズごとに文字列で返すジェネレータ（全体をメモリに持たない）"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def _iter_gzip(chunks):
+    """文字列チャンクをgzip圧縮したバイト列で返すジェネレータ"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip形式
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+def _export_players():
+    """選手一覧（表示用の列名）"""
+    players = sheet_api.get_all_players_including_inactive()
+    header = ['ID', '登録番号', '姓', '名', '氏名', '生年月日', '学年', '所属', 'カテゴリ', 'ステータス',
+              '1500m PB', '3000m PB', '5000m PB', '10000m PB', 'ハーフPB', 'フルPB', 'コメント']
+    columns = ['id', 'registration_number', 'name_sei', 'name_mei', 'name', 'birth_date', 'grade',
+               'affiliation', 'category', 'status', 'pb_1500m', 'pb_3000m', 'pb_5000m', 'pb_10000m',
+               'pb_half', 'pb_full', 'comment']
+    return header, ([p.get(c, '') for c in columns] for p in players)
+
+def _export_records():
+    """記録一覧（全カラム、選手名が空なら選手マスタから補完）"""
+    records = sheet_api.get_all_records()
+    players = sheet_api.get_all_players_including_inactive()
+    player_names = {str(p.get('id')): p.get('name') for p in players}
+    columns = sheet_api.RECORD_EXPECTED_HEADERS
+
+    def rows():
+        for r in records:
+            row = [r.get(c, '') for c in columns]
+            if not r.get('player_name'):
+                row[columns.index('player_name')] = player_names.get(str(r.get('player_id', '')), '')
+            yield row
+    return columns, rows()
+
+def _export_table(loader, columns):
+    """スプレッドシートの物理名カラムそのままで出力するエクスポートを作成"""
+    def build():
+        data = loader()
+        return columns, ([r.get(c, '') for c in columns] for r in data)
+    return build
+
+def _export_ekiden_individual():
+    """県縦断駅伝の個人シート（シートのまま）"""
+    header, data = sheet_api._get_ekiden_individual_data()
+    if header is None:
+        raise ValueError('個人シートが見つかりません')
+    return header, iter(data)
+
+# エクスポート名 → (ファイル名, ヘッダーと行を返す関数)
+EXPORT_PROFILES = {
+    'players': ('players', _export_players),
+    'records': ('records', _export_records),
+    'races': ('races', _export_table(sheet_api.get_all_races, sheet_api.RACES_EXPECTED_HEADERS)),
+    'team_records': ('team_records', _export_table(sheet_api.get_all_team_records, sheet_api.TEAM_RECORDS_EXPECTED_HEADERS)),
+    'attendance': ('attendance', _export_table(sheet_api.get_all_attendance, sheet_api.ATTENDANCE_EXPECTED_HEADERS)),
+    'practice_logs': ('practice_logs', _export_table(sheet_api.get_all_practice_logs, sheet_api.PRACTICE_LOGS_EXPECTED_HEADERS)),
+    'events': ('events', _export_table(sheet_api.get_all_events, sheet_api.EVENTS_EXPECTED_HEADERS)),
+    'ekiden_individual': ('ekiden_individual', _export_ekiden_individual),
+}
+
+@app.route("/export/<profile>")
+def export_csv(profile):
+    """CSVエクスポート（?gzip=1 でgzip圧縮）"""
+    if profile not in EXPORT_PROFILES:
+        flash('指定されたエクスポートはありません', 'warning')
         return redirect(url_for('index'))
 
-@app.route("/export/records")
-def export_records():
-    """記録一覧をCSVエクスポート"""
     try:
-        records = sheet_api.get_all_records()
-        players = sheet_api.get_all_players()
-        player_names = {str(p.get('id')): p.get('name') for p in players}
-
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(['日付', '選手ID', '選手名', '種目', 'タイム', 'メモ'])
-
-        for r in records:
-            player_id = str(r.get('player_id', ''))
-            writer.writerow([
-                r.get('date', ''),
-                player_id,
-                player_names.get(player_id, ''),
-                r.get('event', ''),
-                r.get('time', ''),
-                r.get('memo', '')
-            ])
-
-        output.seek(0)
+        filename, build = EXPORT_PROFILES[profile]
+        # データ取得はレスポンス開始前に行い、失敗時はエラー表示に戻す
+        header, rows = build()
+        chunks = _iter_csv(header, rows)
+
+        if request.args.get('gzip') == '1':
+            return Response(
+                stream_with_context(_iter_gzip(chunks)),
+                mimetype='application/gzip',
+                headers={'Content-Disposition': f'attachment; filename={filename}.csv.gz'}
+            )
         return Response(
-            output.getvalue(),
+            stream_with_context(chunks),
             mimetype='text/csv',
-            headers={'Content-Disposition': 'attachment; filename=records.csv'}
+            headers={'Content-Disposition': f'attachment; filename={filename}.csv'}
         )
     except Exception as e:
         flash(f'エクスポートに失敗しました: {str(e)}', 'danger')
         return redirect(url_for('index'))
 
+# ============ CSVインポート ============
+
+@app.route("/import", methods=['GET', 'POST'])
+def csv_import_page():
+    """記録・選手のCSV一括インポート画面"""
+    kind = request.form.get('kind', 'records')
+    result = None
+    if request.method == 'POST':
+        upload = request.files.get('file')
+        dry_run = request.form.get('dry_run') == '1'
+        if not upload or not upload.filename:
+            flash('CSVファイルを選択してください', 'warning')
+        else:
+            try:
+                text = csv_import.decode_csv(upload.read())
+                result = csv_import.import_csv(kind, text, dry_run=dry_run)
+                result['dry_run'] = dry_run
+                if not result['errors'] and not dry_run:
+                    flash(f"{result['added']}件を取り込みました（重複 {result['duplicates']}件はスキップ）", 'success')
+            except (ValueError, UnicodeDecodeError) as e:
+                flash(f'インポートできません: {str(e)}', 'danger')
+            except Exception as e:
+                flash(f'インポートに失敗しました: {str(e)}', 'danger')
+
+    return render_template('import.html',
+                           kind=kind,
+                           result=result,
+                           record_headers=sheet_api.RECORD_EXPECTED_HEADERS,
+                           player_headers=sheet_api.PLAYER_EXPECTED_HEADERS)
+
 # ============ 大会管理 ============
 
 @app.route("/races")
+@conditional_get('all_records', 'all_players')
 def races():
     """大会一覧画面（Recordsから集計）"""
     try:
@@ -519,6 +777,7 @@ def races():
         return render_template('races.html', races=[])
 
 @app.route("/race/detail/<path:race_name>")
+@conditional_get('all_records', 'all_players')
 def race_detail(race_name):
     """大会詳細画面（Recordsから取得）"""
     try:
@@ -543,6 +802,7 @@ def race_detail(race_name):
         return redirect(url_for('races'))
 
 @app.route("/race/section/<path:race_name>/<section>")
+@conditional_get('all_records', 'all_players')
 def section_result(race_name, section):
     """区間別結果画面（Recordsテーブルから）"""
     try:
@@ -558,6 +818,7 @@ def section_result(race_name, section):
         return redirect(url_for('races'))
 
 @app.route("/ekiden/section/<int:edition>/<path:leg>")
+@conditional_get('ekiden_individual', 'ekiden_distance', 'ekiden_temperature')
 def ekiden_section_result(edition, leg):
     """縦断駅伝区間別結果画面（全チーム表示）"""
     try:
@@ -643,6 +904,7 @@ def race_delete(race_id):
 KENJUDAN_PARENT = '山形県縦断駅伝競走大会'
 
 @app.route("/ekiden")
+@conditional_get('all_races')
 def ekiden_menu():
     """駅伝メニュー画面"""
     try:
@@ -659,6 +921,7 @@ def ekiden_menu():
         return render_template('ekiden_menu.html', ekiden_races=[])
 
 @app.route("/ekiden/<race_id>")
+@conditional_get('all_races', 'all_team_records')
 def ekiden_race_detail(race_id):
     """駅伝大会別の記録一覧"""
     try:
@@ -690,6 +953,7 @@ def ekiden_race_detail(race_id):
 # ============ チーム記録管理 ============
 
 @app.route("/team_records")
+@conditional_get('all_team_records', 'all_races')
 def team_records():
     """チーム記録一覧画面"""
     try:
@@ -728,6 +992,7 @@ def team_record_add():
     return render_template('team_record_add.html', races=races, today=today)
 
 @app.route("/team_record/<team_record_id>")
+@conditional_get('all_team_records', 'all_races', 'all_records', 'all_players')
 def team_record_detail(team_record_id):
     """チーム記録詳細画面"""
     try:
@@ -764,57 +1029,96 @@ def team_record_delete(team_record_id):
 
 # ============ チーム記録の区間管理 ============
 
+def _section_form_item(form, index=None):
+    """フォームから区間記録1件分の値を取り出す（index指定時はグリッドのi行目）"""
+    def get(name):
+        if index is None:
+            return form.get(name, '')
+        values = form.getlist(f'{name}[]')
+        return values[index].strip() if index < len(values) else ''
+    return {
+        'section': get('section'),
+        'player_id': get('player_id'),
+        'time': get('time'),
+        'rank_in_section': get('rank_in_section'),
+        'distance_km': get('distance_km'),
+        'memo': get('memo'),
+    }
+
 @app.route("/team_record/<team_record_id>/section/add", methods=['POST'])
 def team_record_section_add(team_record_id):
     """チーム記録に区間記録を追加（Recordsテーブルに登録）"""
     try:
-        # TeamRecordから情報を取得
-        team_record = sheet_api.get_team_record_by_id(team_record_id)
-        if not team_record:
-            flash('チーム記録が見つかりません', 'warning')
-            return redirect(url_for('team_records'))
-
-        # フォームデータ取得
-        section = request.form.get('section')
-        player_id = request.form.get('player_id')
-        time = request.form.get('time', '')
-        rank_in_section = request.form.get('rank_in_section', '')
-        distance_km = request.form.get('distance_km', '')
-        memo = request.form.get('memo', '')
-
-        # 選手情報を取得
-        player = sheet_api.get_player_by_id(player_id)
-        player_name = player.get('name', '') if player else ''
-
-        # 大会情報を取得
-        race = sheet_api.get_race_by_id(team_record.get('race_id'))
-        race_name = race.get('race_name', '') if race else ''
-        race_type = race.get('type', '') if race else ''
-
-        # Recordsテーブルに追加
-        sheet_api.add_record(
-            player_id=player_id,
-            event='',
-            time=time,
-            memo=memo,
-            date=team_record.get('date'),
-            race_id=team_record.get('race_id'),
-            distance_km=distance_km,
-            section=section,
-            rank_in_section=rank_in_section,
-            player_name=player_name,
-            race_name=race_name,
-            race_type=race_type,
-            team_record_id=team_record_id
-        )
+        sheet_api.add_team_record_sections(team_record_id, [_section_form_item(request.form)])
         flash('区間記録を追加しました', 'success')
+    except ValueError as e:
+        flash(str(e), 'warning')
     except Exception as e:
         flash(f'追加に失敗しました: {str(e)}', 'danger')
     return redirect(url_for('team_record_detail', team_record_id=team_record_id))
 
+# 区間数が大会マスタにない場合のグリッド行数
+DEFAULT_SECTION_ROWS = 10
+
+@app.route("/team_record/<team_record_id>/sections", methods=['GET', 'POST'])
+def team_record_sections(team_record_id):
+    """チーム全区間の一括入力画面（全区間を1回の一括追記で登録）"""
+    team_record = sheet_api.get_team_record_by_id(team_record_id)
+    if not team_record:
+        flash('チーム記録が見つかりません', 'warning')
+        return redirect(url_for('team_records'))
+
+    entered = {}
+    if request.method == 'POST':
+        rows = len(request.form.getlist('section[]'))
+        items = [_section_form_item(request.form, i) for i in range(rows)]
+        # 選手が選ばれていない行は未入力として扱う
+        items = [item for item in items if item['player_id']]
+        entered = {item['section']: item for item in items}
+        if not items:
+            flash('登録する区間がありません', 'warning')
+        else:
+            try:
+                new_ids = sheet_api.add_team_record_sections(team_record_id, items)
+                flash(f'{len(new_ids)}区間の記録を追加しました', 'success')
+                return redirect(url_for('team_record_detail', team_record_id=team_record_id))
+            except ValueError as e:
+                flash(str(e), 'warning')
+            except Exception as e:
+                flash(f'追加に失敗しました: {str(e)}', 'danger')
+
+    race = sheet_api.get_race_by_id(team_record.get('race_id'))
+    registered = {str(r.get('section')): r for r in sheet_api.get_records_by_team_record(team_record_id)}
+    try:
+        section_count = int(race.get('section_count') or 0) if race else 0
+    except ValueError:
+        section_count = 0
+    numbered = [int(s) for s in registered if s.isdigit()]
+    section_count = max([section_count or DEFAULT_SECTION_ROWS] + numbered)
+
+    # 同じ大会の過去記録から区間距離を初期値にする（新しい記録を優先）
+    distances = {}
+    for r in sheet_api.query_records(race_id=str(team_record.get('race_id', '')), limit=sheet_api.RECORDS_PAGE_SIZE_MAX)['records']:
+        section = str(r.get('section', ''))
+        if section and r.get('distance_m') and section not in distances:
+            distances[section] = r.get('distance_m')
+
+    players = sheet_api.get_all_players()
+    player_dict = {str(p.get('id')): p for p in players}
+    return render_template('team_record_sections.html',
+                           record=team_record,
+                           race=race,
+                           sections=range(1, section_count + 1),
+                           registered=registered,
+                           distances=distances,
+                           players=players,
+                           player_dict=player_dict,
+                           entered=entered)
+
 # ============ マスタ管理 ============
 
 @app.route("/masters")
+@conditional_get('all_masters')
 def masters():
     """マスタ管理画面"""
     try:
@@ -862,6 +1166,7 @@ def master_delete():
 # ============ カレンダー ============
 
 @app.route("/calendar")
+@conditional_get('all_events', 'all_practice_logs', 'all_masters', daily=True)
 def calendar_view():
     """カレンダー画面"""
     try:
@@ -993,6 +1298,7 @@ def event_delete(event_id):
 # ============ 練習日誌 ============
 
 @app.route("/practice_logs")
+@conditional_get('all_practice_logs')
 def practice_logs():
     """練習日誌一覧画面"""
     try:
@@ -1075,6 +1381,7 @@ def practice_log_add():
     return render_template('practice_log_add.html', weather_list=weather_list, date=date, players=players)
 
 @app.route("/practice_log/<log_id>")
+@conditional_get('all_practice_logs', 'all_attendance', 'all_players')
 def practice_log_detail(log_id):
     """練習日誌詳細画面"""
     try:
@@ -1157,6 +1464,7 @@ def practice_log_delete(log_id):
 # ============ 出欠管理 ============
 
 @app.route("/attendance")
+@conditional_get('all_players', 'all_attendance', daily=True)
 def attendance():
     """出欠管理画面"""
     try:
@@ -1252,6 +1560,7 @@ def attendance_save():
     return redirect(url_for('attendance', date=request.form.get('date')))
 
 @app.route("/attendance/player/<player_id>")
+@conditional_get('all_players_inactive', 'all_attendance')
 def attendance_player(player_id):
     """選手別出欠履歴"""
     try:
@@ -1274,11 +1583,13 @@ def attendance_player(player_id):
 # ============ ペース分析 ============
 
 @app.route("/analysis")
+@conditional_get()
 def analysis_menu():
     """分析メニュー画面"""
     return render_template('analysis_menu.html')
 
 @app.route("/pace_analysis")
+@conditional_get()
 def pace_analysis():
     """県縦断駅伝ペース分析画面"""
     legs = sheet_api.get_ekiden_legs()
@@ -1293,6 +1604,7 @@ def pace_analysis():
 
 
 @app.route("/api/pace_analysis")
+@conditional_get('ekiden_individual', 'ekiden_distance', 'ekiden_temperature')
 def api_pace_analysis():
     """ペース分析APIエンドポイント"""
     leg = request.args.get('leg', '第１区遊佐～酒田')
@@ -1308,6 +1620,7 @@ def api_pace_analysis():
 
 
 @app.route("/api/team_sections")
+@conditional_get('ekiden_individual')
 def api_team_sections():
     """チーム大会別区間一覧APIエンドポイント"""
     team = request.args.get('team', '南陽東置賜')
@@ -1323,6 +1636,7 @@ def api_team_sections():
 
 
 @app.route("/api/team_section_all_editions")
+@conditional_get('ekiden_individual', 'ekiden_distance', 'ekiden_temperature')
 def api_team_section_all_editions():
     """チーム区間全大会一覧APIエンドポイント"""
     team = request.args.get('team', '南陽東置賜')
@@ -1337,6 +1651,148 @@ def api_team_section_all_editions():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route("/api/pace_statistics")
+@conditional_get('ekiden_individual', 'ekiden_distance')
+def api_pace_statistics():
+    """区間ペース統計APIエンドポイント（leg指定時はその区間のみ）"""
+    leg = request.args.get('leg', '')
+
+    try:
+        data = sheet_api.get_ekiden_pace_statistics()
+        if isinstance(data, dict) and 'error' in data:
+            return jsonify({'error': data['error']}), 400
+        if leg:
+            leg_stats = data['legs'].get(leg)
+            if leg_stats is None:
+                return jsonify({'error': f'指定された区間のデータがありません: {leg}'}), 404
+            return jsonify({'data': {'editions': data['editions'], 'leg': leg, 'stats': leg_stats}})
+        return jsonify({'data': data})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route("/api/pace_temperature")
+@conditional_get('ekiden_individual', 'ekiden_distance', 'ekiden_temperature')
+def api_pace_temperature():
+    """気温補正ペースAPIエンドポイント（leg・temperature指定時は補正ペース、未指定時はモデル表）"""
+    leg = request.args.get('leg', '')
+    temperature = request.args.get('temperature', type=float)
+    rank = request.args.get('rank', type=int)
+    pace = request.args.get('pace') or None
+    from_temperature = request.args.get('from_temperature', type=float)
+    if any(value is not None and not math.isfinite(value) for value in (temperature, from_temperature)):
+        return jsonify({'error': '気温は数値で指定してください'}), 400
+
+    try:
+        if not leg or temperature is None:
+            data = sheet_api.get_ekiden_temperature_model()
+        else:
+            data = sheet_api.predict_ekiden_pace(leg, temperature, rank, pace, from_temperature)
+        if isinstance(data, dict) and 'error' in data:
+            return jsonify({'error': data['error']}), 400
+        return jsonify({'data': data})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+# ============ 静的バンドル ============
+
+@app.route("/static/dist/<filename>")
+def static_bundle(filename):
+    """内容ハッシュ付きのCSS/JSを配信（内容が変わると名前が変わるためimmutableでキャッシュさせる）"""
+    bundle = assets.get_bundle(filename, compression.choose_encoding())
+    if bundle is None:
+        return Response('Not Found', status=404, mimetype='text/plain')
+    body, mimetype, etag, encoding = bundle
+
+    response = Response(status=304) if request.if_none_match.contains(etag) else Response(body, mimetype=mimetype)
+    if encoding and response.status_code == 200:
+        response.headers['Content-Encoding'] = encoding
+    response.set_etag(etag)
+    response.vary.add('Accept-Encoding')
+    response.headers['Cache-Control'] = assets.IMMUTABLE_CACHE_CONTROL
+    return response
+
+@app.route("/sw.js")
+def service_worker():
+    """Service Worker（ルートのスコープで登録するため /sw.js で配信、事前キャッシュ対象を埋め込む）"""
+    response = Response(assets.service_worker_script(), mimetype='application/javascript')
+    response.cache_control.no_cache = True
+    return response
+
+# ============ メトリクス ============
+
+@app.route("/metrics")
+def metrics_endpoint():
+    """Sheets API・キャッシュ・ルートのメトリクス（Prometheusテキスト形式）"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+# ============ プロファイル（管理者） ============
+
+@app.route("/admin/profiles")
+def admin_profiles():
+    """保存済みプロファイルの一覧（未ログインならログインフォーム）"""
+    if not profiler.ADMIN_ENABLED:
+        return Response('Forbidden', status=403, mimetype='text/plain')
+    if not profiler.is_admin():
+        return render_template('admin_profiles.html', login_required=True), 403
+    return render_template('admin_profiles.html',
+                           profiles=profiler.list_profiles(),
+                           selected=None,
+                           enabled=profiler.PROFILING_ENABLED)
+
+@app.route("/admin/login", methods=["POST"])
+def admin_login():
+    """管理者トークンでログイン（トークンをURLに含めないようフォームで受け取る）"""
+    if not profiler.login(request.form.get('token', '')):
+        flash('トークンが正しくありません', 'danger')
+    return redirect(url_for('admin_profiles'))
+
+@app.route("/admin/profiles/<name>")
+def admin_profile_detail(name):
+    """プロファイルの詳細（?download=pstats|html|txt でファイルをダウンロード）"""
+    if not profiler.is_admin():
+        return Response('Forbidden', status=403, mimetype='text/plain')
+    download = request.args.get('download')
+    if download:
+        path = profiler.profile_file(name, '.' + download)
+        if path is None:
+            return Response('Not Found', status=404, mimetype='text/plain')
+        return send_file(path, as_attachment=True)
+
+    selected = profiler.get_profile(name)
+    if selected is None:
+        flash('プロファイルが見つかりません', 'warning')
+        return redirect(url_for('admin_profiles'))
+    return render_template('admin_profiles.html',
+                           profiles=profiler.list_profiles(),
+                           selected=selected,
+                           enabled=profiler.PROFILING_ENABLED)
+
+# ============ 起動時のウォームアップ ============
+# WARMUP_ON_BOOT=1 のとき、リクエストを受け付ける前に全シートと主な集計結果を読み込む。
+# gunicornでは gunicorn.conf.py がプリロードを有効にするため、マスタープロセスで1回だけ実行され、
+# フォークしたワーカーはキャッシュをコピーオンライトで共有する。
+# CACHE_SNAPSHOT_PATH があれば先に前回のキャッシュを読み込むため、ウォームアップはSheets APIを呼ばずに済む。
+
+WARMUP_ON_BOOT = os.environ.get('WARMUP_ON_BOOT') == '1'
+
+sheet_api.load_snapshot()
+app.before_request(sheet_api.start_snapshot_threads)  # 定期保存と読み込んだデータの確認はワーカーごとに開始
+
+if WARMUP_ON_BOOT:
+    sheet_api.warm_up()
+    app.before_request(sheet_api.retry_warmup_if_due)  # 失敗していれば間隔を空けて再試行（/ready もここで再試行される）
+
+@app.route("/ready")
+def ready():
+    """レディネス確認（ウォームアップ有効時は完了するまで503。失敗時は再試行が成功すると200になる）"""
+    state = sheet_api.get_warmup_status()
+    state['enabled'] = WARMUP_ON_BOOT
+    if WARMUP_ON_BOOT and state['status'] != 'warm':
+        return jsonify({'error': f"キャッシュの準備ができていません（{state['status']}）", 'data': state}), 503
+    return jsonify({'data': state})
+
 # ============ メイン ============
 
 if __name__ == "__main__":
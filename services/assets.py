@@ -0,0 +1,97 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+from services import compression
+
+# ============ 静的バンドル（内容ハッシュ付きファイル） ============
+# static/css・static/js のファイルを起動時に読み込み、内容ハッシュ付きの名前
+# （例: /static/dist/base.3f2a9c1d0e.css）で配信する。名前が内容で決まるため、
+# ブラウザには1年間のimmutableキャッシュを指定できる。圧縮済みの本文は初回配信時に作って保持する。
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static')
+BUNDLE_DIRS = ('css', 'js')
+DIST_PREFIX = 'dist'
+HASH_LENGTH = 10
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# 論理パス（css/base.css）→ ハッシュ付きパス（dist/base.<hash>.css）
+_manifest = {}
+# ハッシュ付きファイル名 → {'mimetype', 'etag', 'bodies': {エンコーディング: 本文}}
+_bundles = {}
+# 全バンドルの内容から求めたバージョン（Service Workerのキャッシュ名に使用）
+_version = ''
+
+
+def build(static_dir=STATIC_DIR):
+    """static/css・static/js を読み込み、ハッシュ付きの名前を割り当てる"""
+    global _version
+    manifest = {}
+    bundles = {}
+    for sub in BUNDLE_DIRS:
+        directory = os.path.join(static_dir, sub)
+        if not os.path.isdir(directory):
+            continue
+        for filename in sorted(os.listdir(directory)):
+            path = os.path.join(directory, filename)
+            if not os.path.isfile(path):
+                continue
+            with open(path, 'rb') as f:
+                body = f.read()
+            digest = hashlib.sha256(body).hexdigest()[:HASH_LENGTH]
+            stem, ext = os.path.splitext(filename)
+            hashed_name = f'{stem}.{digest}{ext}'
+            manifest[f'{sub}/{filename}'] = f'{DIST_PREFIX}/{hashed_name}'
+            bundles[hashed_name] = {
+                'mimetype': mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+                'etag': digest,
+                'bodies': {None: body},
+            }
+
+    _manifest.clear()
+    _manifest.update(manifest)
+    _bundles.clear()
+    _bundles.update(bundles)
+    _version = hashlib.sha256(json.dumps(manifest, sort_keys=True).encode('utf-8')).hexdigest()[:HASH_LENGTH]
+    return manifest
+
+
+def asset_url(path):
+    """テンプレート用: 論理パス（'css/base.css'）からハッシュ付きのURLを返す"""
+    return '/static/' + _manifest.get(path, path)
+
+
+def get_bundle(hashed_name, encoding=None):
+    """ハッシュ付きファイル名から (本文, mimetype, ETag, 使ったエンコーディング) を返す（なければNone）"""
+    bundle = _bundles.get(hashed_name)
+    if bundle is None:
+        return None
+    bodies = bundle['bodies']
+    if encoding not in bodies:
+        # 初回のみ最高圧縮率で圧縮して保持する（内容は変わらないため）
+        body = bodies[None]
+        if encoding == 'br' and compression.brotli is not None:
+            bodies['br'] = compression.brotli.compress(body, quality=11)
+        elif encoding == 'gzip':
+            bodies['gzip'] = gzip.compress(body, compresslevel=9, mtime=0)
+        else:
+            encoding = None
+    return bodies[encoding], bundle['mimetype'], bundle['etag'], encoding
+
+
+def precache_urls():
+    """Service Workerで事前キャッシュするバンドルのURL一覧"""
+    return ['/static/' + path for path in sorted(_manifest.values())]
+
+
+def service_worker_script(static_dir=STATIC_DIR):
+    """static/sw.js に事前キャッシュ対象とバージョンを埋め込んだスクリプトを返す"""
+    with open(os.path.join(static_dir, 'sw.js'), encoding='utf-8') as f:
+        source = f.read()
+    header = (f'self.ASSET_VERSION = {json.dumps(_version)};\n'
+              f'self.PRECACHE_ASSETS = {json.dumps(precache_urls())};\n')
+    return header + source
+
+
+build()
@@ -0,0 +1,77 @@
+import gzip
+import os
+from flask import request
+from services.render_cache import LRUCache
+
+try:
+    import brotli
+except ImportError:  # brotli未インストール時はgzipのみ
+    brotli = None
+
+# ============ レスポンス圧縮 ============
+# HTML・JSONをAccept-Encodingに応じてbrotli/gzipで圧縮する。
+# ETagが同じ本文は圧縮済みのバイト列をキャッシュし、再圧縮しない。
+
+COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))  # これより小さい本文は圧縮しない（バイト）
+COMPRESSED_CACHE_SIZE = int(os.environ.get('COMPRESSED_CACHE_SIZE', 256))  # 圧縮済み本文の最大件数
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # 動的生成の本文向け（11は遅すぎる）
+
+COMPRESSIBLE_MIMETYPES = {
+    'text/html', 'text/plain', 'text/css', 'text/javascript',
+    'application/javascript', 'application/json', 'image/svg+xml',
+}
+
+# (ETag, エンコーディング) → 圧縮済み本文
+compressed = LRUCache(COMPRESSED_CACHE_SIZE)
+
+
+def available_encodings():
+    """サーバーが対応するエンコーディング（優先順）"""
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+def choose_encoding():
+    """Accept-Encodingから使うエンコーディングを選ぶ（q値が同じならbrotliを優先、なければNone）"""
+    return request.accept_encodings.best_match(available_encodings())
+
+
+def compress(data, encoding):
+    """本文を指定エンコーディングで圧縮"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def compress_response(response):
+    """after_requestフック: 対象のレスポンスを圧縮する"""
+    if (response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or 'Content-Encoding' in response.headers):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding()
+    if encoding is None or len(response.get_data()) < COMPRESS_MIN_SIZE:
+        return response
+
+    etag, _ = response.get_etag()
+    body = compressed.get((etag, encoding)) if etag else None
+    if body is None:
+        body = compress(response.get_data(), encoding)
+        if etag:
+            compressed.set((etag, encoding), body)
+
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    if etag:
+        # 圧縮後は本文のバイト列が変わるため弱いETagにする（条件付きGETは弱い比較で判定）
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def clear():
+    """圧縮済み本文のキャッシュを削除"""
+    compressed.clear()
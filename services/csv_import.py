@@ -0,0 +1,212 @@
+import argparse
+import csv
+import io
+import sys
+from datetime import datetime
+from services import sheet_api
+
+# ============ CSV一括インポート ============
+# 過去の記録・選手をCSVから取り込む。ヘッダーを検証し、選手・大会IDをインデックスで解決、
+# 既存データとCSV内の重複をハッシュで除外してから、まとめて追記する。
+# エラーが1件でもあれば何も書き込まない。
+
+# インポート種別 → 必須カラム
+REQUIRED_COLUMNS = {
+    'records': ['date', 'event', 'time'],
+    'players': ['name_sei'],
+}
+
+# 取り込み時に無視するカラム（書き込み時に採番・設定される）
+IGNORED_COLUMNS = {
+    'records': {'record_id', 'created_at', 'updated_at', 'row_index'},
+    'players': {'id', 'created_at', 'updated_at', 'race_count'},
+}
+
+
+def decode_csv(data):
+    """アップロードされたバイト列を文字列に変換（UTF-8(BOM付き可)、だめならShift_JIS）"""
+    try:
+        return data.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return data.decode('cp932')
+
+
+def _read_rows(text, kind):
+    """CSVを読み込み、ヘッダーを検証して (行番号, 行の辞書) のリストを返す"""
+    expected = sheet_api.RECORD_EXPECTED_HEADERS if kind == 'records' else sheet_api.PLAYER_EXPECTED_HEADERS
+    reader = csv.reader(io.StringIO(text.lstrip('\ufeff')))
+    header = next(reader, None)
+    if not header:
+        raise ValueError('CSVが空です')
+    header = [h.strip() for h in header]
+
+    unknown = [h for h in header if h and h not in expected and h not in IGNORED_COLUMNS[kind]]
+    if unknown:
+        raise ValueError(f"不明なカラムがあります: {', '.join(unknown)}")
+    missing = [c for c in REQUIRED_COLUMNS[kind] if c not in header]
+    if kind == 'records' and 'player_id' not in header and 'player_name' not in header:
+        missing.append('player_id または player_name')
+    if missing:
+        raise ValueError(f"必須カラムがありません: {', '.join(missing)}")
+
+    rows = []
+    for line_no, values in enumerate(reader, start=2):
+        if not any(v.strip() for v in values):
+            continue
+        row = {h: v.strip() for h, v in zip(header, values)
+               if h and h not in IGNORED_COLUMNS[kind]}
+        rows.append((line_no, row))
+    return rows
+
+
+def _valid_date(value):
+    """YYYY-MM-DD / YYYY/MM/DD 形式の日付か"""
+    for fmt in ('%Y-%m-%d', '%Y/%m/%d'):
+        try:
+            datetime.strptime(value, fmt)
+            return True
+        except ValueError:
+            continue
+    return False
+
+
+def _resolve_record(row, player_index, race_index):
+    """記録行の選手・大会を解決して補完する（エラーメッセージを返す、問題なければNone）"""
+    player_id = row.get('player_id', '')
+    if player_id:
+        player = player_index['id'].get(player_id)
+        if player is None:
+            return f'選手ID {player_id} が見つかりません'
+    else:
+        candidates = player_index['name'].get(sheet_api._name_key(row.get('player_name')), [])
+        if not candidates:
+            return f"選手 {row.get('player_name', '')} が見つかりません"
+        if len(candidates) > 1:
+            return f"選手 {row.get('player_name', '')} が複数います（player_idを指定してください）"
+        player = candidates[0]
+    row['player_id'] = str(player.get('id', ''))
+    row['player_name'] = player.get('name', '')
+
+    race_id = row.get('race_id', '')
+    race = None
+    if race_id:
+        race = race_index['id'].get(race_id)
+        if race is None:
+            return f'大会ID {race_id} が見つかりません'
+    elif row.get('race_name'):
+        # 大会マスタにない大会名は記録上の大会名のまま取り込む
+        race = race_index['name'].get(sheet_api._name_key(row['race_name']))
+    if race is not None:
+        row['race_id'] = str(race.get('race_id', ''))
+        row['race_name'] = race.get('race_name', '')
+        row.setdefault('race_type', race.get('type', ''))
+
+    if not _valid_date(row.get('date', '')):
+        return f"日付 {row.get('date', '')} が不正です（YYYY-MM-DD）"
+    row['date'] = row['date'].replace('/', '-')
+    time_sec = sheet_api._convert_time_to_seconds(row.get('time', ''))
+    if time_sec <= 0:
+        return f"タイム {row.get('time', '')} が不正です"
+    if not row.get('time_sec'):
+        row['time_sec'] = time_sec
+    row.setdefault('is_pb', 'FALSE')
+    row.setdefault('is_section_record', 'FALSE')
+    return None
+
+
+def _validate_player(row):
+    """選手行を検証（エラーメッセージを返す、問題なければNone）"""
+    if not row.get('name_sei'):
+        return '姓が空です'
+    if row.get('birth_date') and not _valid_date(row['birth_date']):
+        return f"生年月日 {row['birth_date']} が不正です（YYYY-MM-DD）"
+    return None
+
+
+def import_csv(kind, text, dry_run=False):
+    """CSVをインポート
+
+    Args:
+        kind: 'records' または 'players'
+        text: CSVの文字列
+        dry_run: Trueなら検証のみで書き込まない
+
+    Returns:
+        {'total', 'added', 'duplicates', 'errors': [(行番号, メッセージ), ...], 'new_ids'}
+    """
+    if kind not in REQUIRED_COLUMNS:
+        raise ValueError(f'不明なインポート種別です: {kind}')
+    rows = _read_rows(text, kind)
+
+    if kind == 'records':
+        player_index = sheet_api.get_player_index()
+        race_index = sheet_api.get_race_index()
+        existing = sheet_api.get_record_fingerprints()
+        fingerprint = sheet_api.record_fingerprint
+    else:
+        existing = sheet_api.get_player_fingerprints()
+        fingerprint = sheet_api.player_fingerprint
+
+    errors = []
+    duplicates = 0
+    seen = set()
+    to_add = []
+    for line_no, row in rows:
+        if kind == 'records':
+            error = _resolve_record(row, player_index, race_index)
+        else:
+            error = _validate_player(row)
+        if error:
+            errors.append((line_no, error))
+            continue
+        key = fingerprint(row)
+        if key in existing or key in seen:
+            duplicates += 1
+            continue
+        seen.add(key)
+        to_add.append(row)
+
+    new_ids = []
+    if not errors and not dry_run:
+        if kind == 'records':
+            new_ids = sheet_api.add_records_bulk(to_add)
+        else:
+            new_ids = sheet_api.add_players_bulk(to_add)
+
+    return {
+        'total': len(rows),
+        'added': len(to_add),
+        'duplicates': duplicates,
+        'errors': errors,
+        'new_ids': new_ids,
+    }
+
+
+def main(argv=None):
+    """コマンドラインからのインポート（python -m services.csv_import records data.csv）"""
+    parser = argparse.ArgumentParser(description='記録・選手のCSVを一括インポート')
+    parser.add_argument('kind', choices=sorted(REQUIRED_COLUMNS), help='インポート種別')
+    parser.add_argument('path', help='CSVファイルのパス')
+    parser.add_argument('--dry-run', action='store_true', help='検証のみ行い書き込まない')
+    args = parser.parse_args(argv)
+
+    with open(args.path, 'rb') as f:
+        text = decode_csv(f.read())
+    try:
+        result = import_csv(args.kind, text, dry_run=args.dry_run)
+    except ValueError as e:
+        print(f'エラー: {e}', file=sys.stderr)
+        return 1
+
+    for line_no, message in result['errors']:
+        print(f'{line_no}行目: {message}', file=sys.stderr)
+    status = '検証のみ' if args.dry_run else '追加'
+    print(f"{result['total']}件中 {status} {result['added']}件 / 重複 {result['duplicates']}件 / エラー {len(result['errors'])}件")
+    if result['errors']:
+        print('エラーがあるため書き込みませんでした', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,249 @@
+import bisect
+import functools
+import threading
+import time
+from flask import g, request
+from services import request_log
+
+# ============ メトリクス（Prometheusテキスト形式） ============
+# Sheets APIの呼び出し（回数・時間・データ量）、キャッシュの参照結果・件数・サイズ、ルートごとの応答時間を集計し、
+# /metrics でPrometheusのテキスト形式として返す。外部サービスやライブラリは使わず、プロセス内で数える。
+# gunicornのワーカーが複数ある場合はワーカーごとの値になる。
+
+PREFIX = 'ekiden_'
+
+# 応答時間のヒストグラムのバケット（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 計測対象の gspread のメソッド（シートの読み書き）
+SHEETS_READ_OPERATIONS = {'get_all_values', 'get_all_records', 'row_values', 'col_values'}
+SHEETS_WRITE_OPERATIONS = {'append_row', 'append_rows', 'update', 'update_acell', 'delete_rows'}
+
+# メトリクス名 → (種類, 説明)
+METRICS = {
+    'sheets_requests_total': ('counter', 'Sheets APIの呼び出し回数'),
+    'sheets_payload_bytes_total': ('counter', 'Sheets APIで読み書きしたセルのデータ量（UTF-8のバイト数）'),
+    'sheets_request_duration_seconds': ('histogram', 'Sheets APIの呼び出し時間'),
+    'cache_lookups_total': ('counter', 'キャッシュの参照結果（hit/revalidated/stale/restored/miss/expired）'),
+    'cache_evictions_total': ('counter', 'キャッシュから削除したエントリ数（書き込みによるクリア・件数上限）'),
+    'cache_entries': ('gauge', 'キャッシュのエントリ数'),
+    'cache_entry_rows': ('gauge', 'キャッシュ中のデータの行数'),
+    'cache_entry_bytes': ('gauge', 'キャッシュ中のデータのおおよそのサイズ（バイト）'),
+    'http_request_duration_seconds': ('histogram', 'ルートごとの応答時間'),
+}
+
+_lock = threading.Lock()
+_counters = {}  # (名前, ラベルのタプル) → 値
+_histograms = {}  # (名前, ラベルのタプル) → [バケットごとの件数, 合計, 件数]
+
+
+def inc(name, labels=(), value=1):
+    """カウンターを増やす（labels は (名前, 値) のタプル）"""
+    key = (name, tuple(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, labels, value):
+    """ヒストグラムに値を記録"""
+    key = (name, tuple(labels))
+    index = bisect.bisect_left(LATENCY_BUCKETS, value)
+    with _lock:
+        entry = _histograms.get(key)
+        if entry is None:
+            entry = _histograms[key] = [[0] * len(LATENCY_BUCKETS), 0.0, 0]
+        if index < len(LATENCY_BUCKETS):
+            entry[0][index] += 1
+        entry[1] += value
+        entry[2] += 1
+
+
+def reset():
+    """集計値をすべて削除"""
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+# ============ Sheets APIの計測 ============
+
+def _payload_size(value):
+    """セルの値（リスト・リストのリスト）のUTF-8でのバイト数"""
+    if isinstance(value, (list, tuple)):
+        return sum(_payload_size(v) for v in value)
+    if isinstance(value, dict):
+        return sum(_payload_size(v) for v in value.values())
+    if value is None:
+        return 0
+    return len(str(value).encode('utf-8'))
+
+
+def _record_sheets_call(sheet, operation, status, elapsed, payload=0):
+    labels = (('sheet', sheet), ('operation', operation))
+    inc('sheets_requests_total', labels + (('status', status),))
+    observe('sheets_request_duration_seconds', labels, elapsed)
+    if payload:
+        inc('sheets_payload_bytes_total', labels, payload)
+    request_log.record_sheets_call(elapsed)
+
+
+def _timed(func, sheet, operation, payload_of):
+    """呼び出し回数・時間・データ量を記録するラッパー"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            _record_sheets_call(sheet, operation, 'error', time.perf_counter() - start)
+            raise
+        _record_sheets_call(sheet, operation, 'ok', time.perf_counter() - start, payload_of(args, kwargs, result))
+        return result
+    return wrapper
+
+
+def _read_payload(args, kwargs, result):
+    """読み込んだデータ量（戻り値）"""
+    return _payload_size(result)
+
+
+def _write_payload(args, kwargs, result):
+    """書き込んだデータ量（セル番地・範囲の文字列を除いた引数）"""
+    values = [a for a in args if not isinstance(a, (str, int))]
+    if len(args) == 2 and all(isinstance(a, str) for a in args):
+        values = [args[1]]  # update_acell('S5', '値')
+    return _payload_size(values) + _payload_size(kwargs.get('values'))
+
+
+class _InstrumentedWorksheet:
+    """Worksheetの読み書きを計測するプロキシ"""
+
+    def __init__(self, worksheet):
+        self._worksheet = worksheet
+
+    def __getattr__(self, name):
+        attr = getattr(self._worksheet, name)
+        if name in SHEETS_READ_OPERATIONS:
+            return _timed(attr, self._worksheet.title, name, _read_payload)
+        if name in SHEETS_WRITE_OPERATIONS:
+            return _timed(attr, self._worksheet.title, name, _write_payload)
+        return attr
+
+
+class _InstrumentedSpreadsheet:
+    """Spreadsheetのシート取得・更新日時の確認を計測し、Worksheetも計測対象にするプロキシ"""
+
+    def __init__(self, spreadsheet):
+        self._spreadsheet = spreadsheet
+
+    def worksheet(self, title):
+        worksheet = _timed(self._spreadsheet.worksheet, title, 'worksheet', lambda *_: 0)(title)
+        return _InstrumentedWorksheet(worksheet)
+
+    def add_worksheet(self, title, *args, **kwargs):
+        worksheet = _timed(self._spreadsheet.add_worksheet, title, 'add_worksheet', lambda *_: 0)(title, *args, **kwargs)
+        return _InstrumentedWorksheet(worksheet)
+
+    def worksheets(self, *args, **kwargs):
+        worksheets = _timed(self._spreadsheet.worksheets, '', 'worksheets', lambda *_: 0)(*args, **kwargs)
+        return [_InstrumentedWorksheet(w) for w in worksheets]
+
+    def get_lastUpdateTime(self):
+        return _timed(self._spreadsheet.get_lastUpdateTime, '', 'get_lastUpdateTime', lambda *_: 0)()
+
+    def __getattr__(self, name):
+        return getattr(self._spreadsheet, name)
+
+
+def instrument_spreadsheet(spreadsheet):
+    """gspreadのSpreadsheetを計測用のプロキシで包む"""
+    return _InstrumentedSpreadsheet(spreadsheet)
+
+
+# ============ ルートの計測 ============
+
+def start_request():
+    """before_requestフック: 開始時刻を記録"""
+    g.metrics_start = time.perf_counter()
+
+
+def record_request(response):
+    """after_requestフック: ルートごとの応答時間を記録"""
+    start = g.pop('metrics_start', None)
+    if start is not None:
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        labels = (('endpoint', endpoint), ('method', request.method), ('status', str(response.status_code)))
+        observe('http_request_duration_seconds', labels, time.perf_counter() - start)
+    return response
+
+
+# ============ 出力 ============
+
+def _collect_gauges():
+    """キャッシュの参照結果・件数・サイズを集める（(名前, ラベル, 値) のリスト）"""
+    from services import sheet_api, render_cache, compression
+
+    samples = []
+    for (kind, key, result), count in sheet_api.get_cache_stats(by_key=True).items():
+        name = 'cache_evictions_total' if result == 'evicted' else 'cache_lookups_total'
+        labels = (('cache', kind), ('key', key)) + ((('result', result),) if result != 'evicted' else ())
+        samples.append((name, labels, count))
+    lru_caches = (('pages', render_cache.pages), ('fragments', render_cache.fragments),
+                  ('compressed', compression.compressed))
+    for cache_name, cache in lru_caches:
+        labels = (('cache', cache_name), ('key', ''))
+        samples.append(('cache_lookups_total', labels + (('result', 'hit'),), cache.hits))
+        samples.append(('cache_lookups_total', labels + (('result', 'miss'),), cache.misses))
+        samples.append(('cache_evictions_total', labels, cache.evictions))
+        samples.append(('cache_entries', (('cache', cache_name),), len(cache)))
+
+    entries = sheet_api.get_cache_entries()
+    samples.append(('cache_entries', (('cache', 'data'),), len(entries)))
+    samples.append(('cache_entries', (('cache', 'derived'),), len(sheet_api._derived_cache)))
+    for key, (rows, size) in entries.items():
+        samples.append(('cache_entry_rows', (('key', key),), rows))
+        samples.append(('cache_entry_bytes', (('key', key),), size))
+    return samples
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels) + '}'
+
+
+def _format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render():
+    """Prometheusのテキスト形式で出力"""
+    samples = {}
+    with _lock:
+        for (name, labels), value in _counters.items():
+            samples.setdefault(name, []).append((name, labels, value))
+        for (name, labels), (buckets, total, count) in sorted(_histograms.items()):
+            cumulative = 0
+            for bound, n in zip(LATENCY_BUCKETS, buckets):
+                cumulative += n
+                samples.setdefault(name, []).append((name + '_bucket', labels + (('le', repr(bound)),), cumulative))
+            samples[name].append((name + '_bucket', labels + (('le', '+Inf'),), count))
+            samples[name].append((name + '_sum', labels, total))
+            samples[name].append((name + '_count', labels, count))
+    for name, labels, value in _collect_gauges():
+        samples.setdefault(name, []).append((name, labels, value))
+
+    lines = []
+    for name, (metric_type, help_text) in METRICS.items():
+        lines.append(f'# HELP {PREFIX}{name} {help_text}')
+        lines.append(f'# TYPE {PREFIX}{name} {metric_type}')
+        items = samples.get(name, [])
+        if metric_type != 'histogram':  # ヒストグラムはバケット順のまま出力する
+            items = sorted(items, key=lambda s: (s[0], s[1]))
+        for sample_name, labels, value in items:
+            lines.append(f'{PREFIX}{sample_name}{_format_labels(labels)} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
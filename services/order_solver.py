@@ -0,0 +1,156 @@
+import heapq
+
+# ============ 区間オーダー最適化（割当問題） ============
+# 選手×区間の予測タイム行列から、合計タイム最小の区間配置を求める。
+# ハンガリアン法で最適解を求め、Murtyの方法で次善の候補を列挙する。
+
+# 配置不可（予測タイムなし・除外指定）を表すコスト
+INFEASIBLE = 1e9
+
+
+def solve_assignment(cost):
+    """ハンガリアン法で割当問題を解く（行数 <= 列数）
+
+    Args:
+        cost: 行=区間, 列=選手 のコスト行列（リストのリスト）
+
+    Returns:
+        (合計コスト, 各行に割り当てた列番号のリスト)。行が0件の場合は (0, [])
+    """
+    n = len(cost)
+    if n == 0:
+        return 0, []
+    m = len(cost[0])
+    if n > m:
+        raise ValueError('選手数が区間数より少ないため割り当てできません')
+
+    inf = float('inf')
+    u = [0.0] * (n + 1)
+    v = [0.0] * (m + 1)
+    p = [0] * (m + 1)  # p[j] = 列jに割り当てた行（1始まり）
+    way = [0] * (m + 1)
+
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = [inf] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            row = cost[i0 - 1]
+            u_i0 = u[i0]
+            delta = inf
+            j1 = 0
+            for j in range(1, m + 1):
+                if not used[j]:
+                    cur = row[j - 1] - u_i0 - v[j]
+                    if cur < minv[j]:
+                        minv[j] = cur
+                        way[j] = j0
+                    if minv[j] < delta:
+                        delta = minv[j]
+                        j1 = j
+            for j in range(m + 1):
+                if used[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        # 増加路に沿って割当を更新
+        while True:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+            if j0 == 0:
+                break
+
+    assignment = [0] * n
+    for j in range(1, m + 1):
+        if p[j]:
+            assignment[p[j] - 1] = j - 1
+    total = sum(cost[i][assignment[i]] for i in range(n))
+    return total, assignment
+
+
+def _solve_constrained(cost, fixed, forbidden):
+    """固定割当・禁止割当つきで解く（実行不可能ならNone）"""
+    n = len(cost)
+    m = len(cost[0]) if n else 0
+    used_cols = set(fixed.values())
+    free_rows = [i for i in range(n) if i not in fixed]
+    free_cols = [j for j in range(m) if j not in used_cols]
+    if len(free_rows) > len(free_cols):
+        return None
+
+    sub_cost = []
+    for i in free_rows:
+        row = cost[i]
+        sub_cost.append([INFEASIBLE if (i, j) in forbidden else row[j] for j in free_cols])
+
+    _, sub_assignment = solve_assignment(sub_cost)
+    assignment = [0] * n
+    for i, j in fixed.items():
+        assignment[i] = j
+    for k, i in enumerate(free_rows):
+        assignment[i] = free_cols[sub_assignment[k]]
+
+    total = 0.0
+    for i in range(n):
+        c = cost[i][assignment[i]]
+        if c >= INFEASIBLE or (i not in fixed and (i, assignment[i]) in forbidden):
+            return None
+        total += c
+    return total, assignment
+
+
+def k_best_assignments(cost, k=1, fixed=None):
+    """Murtyの方法で合計コストの小さい順にk件の割当を列挙
+
+    Args:
+        cost: 行=区間, 列=選手 のコスト行列
+        k: 列挙する件数
+        fixed: {行番号: 列番号} の固定割当（ピン留め）
+
+    Returns:
+        [(合計コスト, 割当リスト), ...] をコスト昇順で最大k件
+        （同一コスト行の入れ替えだけで得られる解は1件にまとめる）
+    """
+    fixed = dict(fixed or {})
+    first = _solve_constrained(cost, fixed, frozenset())
+    if first is None:
+        return []
+
+    # コストが同一の行（同距離の区間など）は入れ替えても同じ解になるため、
+    # 分岐時に同じ選手をまとめて禁止し、入れ替えだけの解を列挙しない
+    equivalent_rows = {}
+    for i, row in enumerate(cost):
+        equivalent_rows.setdefault(tuple(row), []).append(i)
+
+    results = []
+    counter = 0  # 同コスト時の比較用
+    heap = [(first[0], counter, first[1], fixed, frozenset())]
+    while heap and len(results) < k:
+        total, _, assignment, node_fixed, node_forbidden = heapq.heappop(heap)
+        results.append((total, assignment))
+        if len(results) >= k:
+            break
+
+        # 未固定の行を順に分岐（i番目の割当を禁止し、それより前を固定）
+        child_fixed = dict(node_fixed)
+        for i in range(len(cost)):
+            if i in node_fixed:
+                continue
+            child_forbidden = node_forbidden | {
+                (r, assignment[i]) for r in equivalent_rows[tuple(cost[i])] if r not in child_fixed
+            }
+            solved = _solve_constrained(cost, child_fixed, child_forbidden)
+            if solved is not None:
+                counter += 1
+                heapq.heappush(heap, (solved[0], counter, solved[1], dict(child_fixed), child_forbidden))
+            child_fixed[i] = assignment[i]
+
+    return results
@@ -0,0 +1,192 @@
+import cProfile
+import hashlib
+import hmac
+import io
+import json
+import os
+import pstats
+import re
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from flask import g, request, session
+
+try:
+    from pyinstrument import Profiler as SamplingProfiler
+except ImportError:  # pyinstrument未インストール時はcProfileを使う
+    SamplingProfiler = None
+
+# ============ リクエスト単位のプロファイラ ============
+# PROFILING_ENABLED=1 のときだけ有効。管理者が ?_profile=1（またはヘッダー X-Profile: 1）を付けた
+# リクエストをプロファイラの下で実行し、結果を PROFILE_DIR に保存する（/admin/profiles で一覧）。
+# pyinstrument（サンプリング方式）があればそれを、なければcProfileを使う。
+# 管理者の判定は ADMIN_TOKEN（ヘッダー X-Admin-Token か、/admin/profiles のフォームでログインしたセッション）。
+# トークンはアクセスログに残らないようURLでは受け付けない。セッションにはトークンから作ったHMACを保存し、毎回照合する。
+# セッションの署名鍵（SECRET_KEY）が既定値のままだとセッションを偽造できるため、未設定なら管理者機能・プロファイルは無効。
+
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
+ADMIN_ENABLED = bool(ADMIN_TOKEN) and bool(os.environ.get('SECRET_KEY'))
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED') == '1' and ADMIN_ENABLED
+PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'ekiden_profiles'))
+PROFILE_KEEP = int(os.environ.get('PROFILE_KEEP', 50))  # 保存しておく件数
+PROFILE_TOP = 60  # テキストの要約に出す関数の数
+
+_NAME_PATTERN = re.compile(r'^[0-9]{8}-[0-9]{6}-[0-9a-f]{6}$')
+
+
+def _session_marker():
+    """セッションに保存する管理者の印（ADMIN_TOKEN を変えると無効になる）"""
+    return hmac.new(ADMIN_TOKEN.encode('utf-8'), b'ekiden-admin-session', hashlib.sha256).hexdigest()
+
+
+def _token_matches(token):
+    return bool(token) and hmac.compare_digest(token.encode('utf-8'), ADMIN_TOKEN.encode('utf-8'))
+
+
+def is_admin():
+    """管理者からのリクエストか（ヘッダーのトークンか、ログイン済みのセッションを毎回照合する）"""
+    if not ADMIN_ENABLED:
+        return False
+    if _token_matches(request.headers.get('X-Admin-Token', '')):
+        return True
+    marker = session.get('admin')
+    return isinstance(marker, str) and hmac.compare_digest(marker, _session_marker())
+
+
+def login(token):
+    """トークンが一致すればセッションに管理者の印を保存する。成功したらTrue"""
+    if not ADMIN_ENABLED or not _token_matches(token):
+        return False
+    session['admin'] = _session_marker()
+    return True
+
+
+def is_profiling():
+    """このリクエストをプロファイル中か"""
+    return g.get('profiler') is not None
+
+
+def start_request():
+    """before_requestフック: 指定があればプロファイルを開始"""
+    if not PROFILING_ENABLED:
+        return
+    if request.args.get('_profile') != '1' and request.headers.get('X-Profile') != '1':
+        return
+    if not is_admin():
+        return
+    profiler = SamplingProfiler() if SamplingProfiler is not None else cProfile.Profile()
+    g.profiler = profiler
+    g.profile_start = time.perf_counter()
+    if SamplingProfiler is not None:
+        profiler.start()
+    else:
+        profiler.enable()
+
+
+def finish_request(response):
+    """after_requestフック: プロファイルを止めて保存し、IDをヘッダーで返す"""
+    profiler = g.pop('profiler', None)
+    if profiler is None:
+        return response
+    elapsed = time.perf_counter() - g.pop('profile_start')
+    if SamplingProfiler is not None:
+        profiler.stop()
+    else:
+        profiler.disable()
+    name = save(profiler, elapsed, response.status_code)
+    response.headers['X-Profile-Id'] = name
+    return response
+
+
+def _cumulative_ms(stats, filename_part, function_name):
+    """pstatsから指定関数の累積時間（ミリ秒）を合計する"""
+    total = 0.0
+    for (filename, _, func), (_, _, _, cumtime, _) in stats.stats.items():
+        if func == function_name and filename_part in filename.replace('\\', '/'):
+            total += cumtime
+    return round(total * 1000, 1)
+
+
+def save(profiler, elapsed, status):
+    """プロファイル結果を PROFILE_DIR に保存し、名前を返す"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    name = f'{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}'
+    base = os.path.join(PROFILE_DIR, name)
+    meta = {
+        'name': name,
+        'method': request.method,
+        'path': request.full_path.rstrip('?'),
+        'endpoint': request.url_rule.rule if request.url_rule is not None else '',
+        'status': status,
+        'total_ms': round(elapsed * 1000, 1),
+        'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+    if SamplingProfiler is not None:
+        meta['profiler'] = 'pyinstrument'
+        with open(base + '.txt', 'w', encoding='utf-8') as f:
+            f.write(profiler.output_text(unicode=True, color=False))
+        with open(base + '.html', 'w', encoding='utf-8') as f:
+            f.write(profiler.output_html())
+    else:
+        meta['profiler'] = 'cProfile'
+        profiler.dump_stats(base + '.pstats')
+        stream = io.StringIO()
+        stats = pstats.Stats(profiler, stream=stream)
+        # Sheets API（計測プロキシ経由の呼び出し）とテンプレート描画の内訳
+        meta['sheets_ms'] = _cumulative_ms(stats, 'services/metrics.py', 'wrapper')
+        meta['render_ms'] = _cumulative_ms(stats, 'flask/templating.py', 'render_template')
+        stats.sort_stats('cumulative').print_stats(PROFILE_TOP)
+        with open(base + '.txt', 'w', encoding='utf-8') as f:
+            f.write(stream.getvalue())
+
+    with open(base + '.json', 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+    _prune()
+    return name
+
+
+def _prune():
+    """古いプロファイルを削除して PROFILE_KEEP 件に保つ"""
+    names = sorted({os.path.splitext(f)[0] for f in os.listdir(PROFILE_DIR) if _NAME_PATTERN.match(os.path.splitext(f)[0])})
+    for name in names[:-PROFILE_KEEP]:
+        for ext in ('.json', '.txt', '.pstats', '.html'):
+            path = os.path.join(PROFILE_DIR, name + ext)
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def list_profiles():
+    """保存済みプロファイルの一覧（新しい順）"""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    profiles = []
+    for filename in sorted(os.listdir(PROFILE_DIR), reverse=True):
+        if filename.endswith('.json') and _NAME_PATTERN.match(filename[:-5]):
+            with open(os.path.join(PROFILE_DIR, filename), encoding='utf-8') as f:
+                profiles.append(json.load(f))
+    return profiles
+
+
+def get_profile(name):
+    """プロファイルの情報とテキストの要約（なければNone）"""
+    if not _NAME_PATTERN.match(name):
+        return None
+    base = os.path.join(PROFILE_DIR, name)
+    if not os.path.exists(base + '.json'):
+        return None
+    with open(base + '.json', encoding='utf-8') as f:
+        meta = json.load(f)
+    with open(base + '.txt', encoding='utf-8') as f:
+        meta['text'] = f.read()
+    meta['files'] = [ext for ext in ('.pstats', '.html') if os.path.exists(base + ext)]
+    return meta
+
+
+def profile_file(name, ext):
+    """ダウンロード用のファイルパス（なければNone）"""
+    if not _NAME_PATTERN.match(name) or ext not in ('.pstats', '.html', '.txt'):
+        return None
+    path = os.path.join(PROFILE_DIR, name + ext)
+    return path if os.path.exists(path) else None
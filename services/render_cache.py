@@ -0,0 +1,73 @@
+import os
+import threading
+from collections import OrderedDict
+from markupsafe import Markup
+
+# ============ 描画結果キャッシュ ============
+# 重いテンプレートの描画結果（ページ全体・部分HTML）をLRUで保持する。
+# キーにはデータバージョンや表示内容を含めるため、データが変わると自然に別キーになる。
+
+PAGE_CACHE_SIZE = int(os.environ.get('PAGE_CACHE_SIZE', 128))  # ページ全体の最大件数
+FRAGMENT_CACHE_SIZE = int(os.environ.get('FRAGMENT_CACHE_SIZE', 4096))  # 部分HTMLの最大件数
+
+
+class LRUCache:
+    """件数上限つきのLRUキャッシュ（スレッドセーフ）"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """値を取得（なければNone）。取得したエントリは最新扱いにする"""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def set(self, key, value):
+        """値を保存し、上限を超えたら最も古いエントリを削除"""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """全エントリを削除"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+pages = LRUCache(PAGE_CACHE_SIZE)
+fragments = LRUCache(FRAGMENT_CACHE_SIZE)
+
+
+def cache_fragment(name, *key, caller=None):
+    """テンプレート内の部分HTMLをキャッシュする（{% call cache_fragment('名前', 値...) %}で使用）
+
+    key には部分HTMLの表示に使う値をすべて渡す。値が同じならキャッシュを返す。
+    """
+    cache_key = (name, repr(key))
+    cached = fragments.get(cache_key)
+    if cached is None:
+        cached = Markup(caller())
+        fragments.set(cache_key, cached)
+    return cached
+
+
+def clear():
+    """描画結果キャッシュをすべて削除"""
+    pages.clear()
+    fragments.clear()
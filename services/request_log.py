@@ -0,0 +1,161 @@
+import functools
+import json
+import os
+import sys
+import time
+from flask import g, has_app_context, request, before_render_template, template_rendered
+
+# ============ 遅いリクエストの構造化ログ ============
+# 応答時間が SLOW_REQUEST_MS を超えたリクエストを、1行のJSONとして標準出力に書き出す（Cloud Runのログで検索できる）。
+# Sheets APIの呼び出し回数・時間、キャッシュキーごとのヒット・ミス、sheet_apiでの集計時間、テンプレートの描画時間、
+# レスポンスのサイズを記録する。時間の内訳は
+#   sheets_ms（Sheets APIの待ち）/ aggregation_ms（sheet_api内のSheets API以外）/ render_ms（テンプレート描画）
+#   / other_ms（それ以外のビュー処理・圧縮など）
+# SLOW_REQUEST_MS=0 で全リクエストを、負の値で出力を止める。
+
+SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', 1000))
+
+# 時間を計る sheet_api の関数（行ごとに呼ばれる正規化等は含めない）
+TIMED_PREFIXES = ('get_', 'query_', 'filter_', 'predict_', 'optimize_', 'project_')
+UNTIMED_FUNCTIONS = {'get_client', 'get_spreadsheet', 'get_cache_version', 'get_cache_stats', 'get_cache_entries'}
+
+
+def _current():
+    """このリクエストの集計値（リクエスト外・開始前ならNone）"""
+    return g.get('request_log') if has_app_context() else None
+
+
+def record_sheets_call(elapsed):
+    """Sheets APIの呼び出しを記録（services.metrics から呼ばれる）"""
+    current = _current()
+    if current is not None:
+        current['sheets_calls'] += 1
+        current['sheets_seconds'] += elapsed
+
+
+def record_cache(kind, key, result):
+    """キャッシュの参照結果を記録（services.sheet_api から呼ばれる）"""
+    current = _current()
+    if current is not None:
+        counts = current['cache'].setdefault(f'{kind}:{key}', {})
+        counts[result] = counts.get(result, 0) + 1
+
+
+def _timed(func):
+    """sheet_api の関数の実行時間を記録するラッパー（入れ子の呼び出しは外側だけ数える）"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        current = _current()
+        if current is None or current['depth']:
+            return func(*args, **kwargs)
+        current['depth'] += 1
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            current['sheet_api_seconds'] += time.perf_counter() - start
+            current['depth'] -= 1
+    return wrapper
+
+
+def instrument_module(module):
+    """モジュールの公開関数のうち集計用のものを計測対象にする"""
+    for name, value in list(vars(module).items()):
+        if (callable(value) and getattr(value, '__module__', None) == module.__name__
+                and name.startswith(TIMED_PREFIXES) and name not in UNTIMED_FUNCTIONS):
+            setattr(module, name, _timed(value))
+
+
+def _render_started(sender, template, context, **extra):
+    current = _current()
+    if current is not None:
+        current['render_stack'].append(time.perf_counter())
+
+
+def _render_finished(sender, template, context, **extra):
+    current = _current()
+    if current is not None and current['render_stack']:
+        start = current['render_stack'].pop()
+        if not current['render_stack']:  # 入れ子の描画は外側だけ数える
+            current['render_seconds'] += time.perf_counter() - start
+
+
+def _timed_template_load(load):
+    """テンプレートの読み込み（初回はコンパイル）も描画時間に含める（描画開始のシグナルより前に行われるため）"""
+    @functools.wraps(load)
+    def wrapper(*args, **kwargs):
+        current = _current()
+        if current is None or current['render_stack']:
+            return load(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return load(*args, **kwargs)
+        finally:
+            current['render_seconds'] += time.perf_counter() - start
+    return wrapper
+
+
+def init_app(app):
+    """アプリにフックを登録し、sheet_api の集計関数を計測対象にする（圧縮後のサイズを記録するため圧縮より先に呼ぶ）"""
+    from services import sheet_api
+
+    if SLOW_REQUEST_MS < 0:
+        return
+    instrument_module(sheet_api)
+    app.jinja_env.get_or_select_template = _timed_template_load(app.jinja_env.get_or_select_template)
+    before_render_template.connect(_render_started, app)
+    template_rendered.connect(_render_finished, app)
+    app.before_request(start_request)
+    app.after_request(finish_request)
+
+
+def start_request():
+    """before_requestフック: 集計を開始"""
+    g.request_log = {
+        'start': time.perf_counter(), 'depth': 0, 'render_stack': [],
+        'sheets_calls': 0, 'sheets_seconds': 0.0, 'sheet_api_seconds': 0.0, 'render_seconds': 0.0,
+        'cache': {},
+    }
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 1)
+
+
+def finish_request(response):
+    """after_requestフック: 閾値を超えていれば1行のJSONを出力"""
+    current = g.pop('request_log', None)
+    if current is None:
+        return response
+    total = time.perf_counter() - current['start']
+    if total * 1000 < SLOW_REQUEST_MS:
+        return response
+
+    sheets = current['sheets_seconds']
+    sheet_api_seconds = max(current['sheet_api_seconds'], sheets)  # Sheets APIはsheet_api経由でのみ呼ばれる
+    render = current['render_seconds']
+    endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    size = None if response.is_streamed else response.calculate_content_length()
+    entry = {
+        'severity': 'WARNING',
+        'message': f'slow request {request.method} {request.path} {_ms(total)}ms',
+        'type': 'slow_request',
+        'method': request.method,
+        'path': request.path,
+        'endpoint': endpoint,
+        'view_args': request.view_args or {},
+        'args': request.args.to_dict(),
+        'status': response.status_code,
+        'total_ms': _ms(total),
+        'sheets_calls': current['sheets_calls'],
+        'sheets_ms': _ms(sheets),
+        'aggregation_ms': _ms(sheet_api_seconds - sheets),
+        'render_ms': _ms(render),
+        'other_ms': _ms(max(0.0, total - sheet_api_seconds - render)),
+        'cache': current['cache'],
+        'response_bytes': size,
+        'content_encoding': response.headers.get('Content-Encoding'),
+    }
+    sys.stdout.write(json.dumps(entry, ensure_ascii=False) + '\n')
+    sys.stdout.flush()
+    return response
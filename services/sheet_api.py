@@ -1,8 +1,35 @@
-import gspread
-import google.auth
+import importlib
 import json
+import math
+import os
+import pickle
+import tempfile
+import threading
+import zlib
+import hashlib
+from collections import Counter, deque
 from datetime import datetime
 import time
+from services import order_solver, metrics, request_log
+
+# ============ 遅延インポート ============
+
+class _LazyModule:
+    """属性を最初に参照したときにモジュールを読み込む（起動時に重いGoogleのライブラリを読み込まないため）"""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)  # インポートのロックでスレッド間でも1回だけ読み込む
+        return getattr(self._module, attr)
+
+
+# 最初のSheets API利用（認証）か、例外の判定で参照したときに読み込む
+gspread = _LazyModule('gspread')
+google_auth = _LazyModule('google.auth')
 
 # スプレッドシートID
 SPREADSHEET_ID = '1emj5sW_saJpydDTva7mH5pi00YA2QIloCi_rKx_cbdU'
@@ -17,23 +44,206 @@ CACHE_TTL_LONG = 600  # 長期キャッシュ有効期間（秒）- 10分（駅
 # 長期キャッシュ対象のキー
 LONG_CACHE_KEYS = {'ekiden_individual', 'ekiden_distance', 'ekiden_temperature'}
 
+# データバージョン管理（キー → (バージョン, チェックサム)）
+# 内容が変わった時だけバージョンを進めるため、TTL切れで再取得しても
+# データが同じなら集計結果のキャッシュはそのまま使える。
+# プロセス再起動後も以前のバージョンより大きくなるよう、起動時刻（ミリ秒）から数える
+_versions = {}
+_version_counter = int(time.time() * 1000)
+
+# 変更ログ（行の追加・更新・削除）の最大件数
+CHANGE_LOG_SIZE = 2000
+# 変更を記録するキャッシュキー → (テーブル名, 主キーのカラム)
+CHANGE_TRACKED_KEYS = {
+    'all_players_inactive': ('players', ('id',)),
+    'all_records': ('records', ('record_id',)),
+    'all_races': ('races', ('race_id',)),
+    'all_team_records': ('team_records', ('team_record_id',)),
+    'all_events': ('events', ('event_id',)),
+    'all_practice_logs': ('practice_logs', ('log_id',)),
+    'all_attendance': ('attendance', ('attendance_id',)),
+    'all_masters': ('masters', ('type', 'code')),
+    'all_simulations': ('simulations', ('row_index',)),
+}
+_change_log = deque()
+_change_log_floor = _version_counter  # これより前のバージョンからの差分は返せない
+_tracked_rows = {}  # キー → 前回取得したデータ（clear_cache後も差分を取るため別に保持）
+
+# 集計結果のキャッシュ（キー → (依存バージョンのタプル, データ)）
+_derived_cache = {}
+
+# キャッシュの参照結果の回数（(種類, キー, 結果) → 回数）
+# 種類: 'data'（シートのデータ）/ 'derived'（集計結果）
+# 結果: hit（有効期間内）/ revalidated（更新日時を確認して延長）/ stale（更新日時を確認できずTTL内で返した）
+#       / restored（スナップショットから読み込み、未確認のまま返した）
+#       / miss（未取得）/ expired（期限切れ・変更あり）/ evicted（書き込みでクリア）
+_cache_stats = Counter()
+_cache_sizes = {}  # キー → データのおおよそのサイズ（バイト、repr の長さ）
+
+# 変更検知: TTL切れのたびに全件を取り直す代わりに、スプレッドシートの最終更新日時（Drive APIのmodifiedTime）を
+# 確認し、データ取得時から変わっていなければ有効期限を延長する。更新日時は全キーで共有し、
+# CHANGE_CHECK_INTERVAL 秒に1回だけ問い合わせる。取得できない場合は従来のTTLで動作する。
+
+CHANGE_CHECK_INTERVAL = 15  # 更新日時を確認する間隔（秒）
+
+_modified_time = {'value': None, 'checked_at': 0.0}
+_fetched_modified = {}  # キー → データ取得直前に確認した更新日時
+_pending_modified = {}  # キー → 取得中のデータの更新日時（_set_cacheで確定）
+
+def get_spreadsheet_modified_time():
+    """スプレッドシートの最終更新日時を取得（取得できなければNone）"""
+    try:
+        return get_spreadsheet().get_lastUpdateTime()
+    except Exception:
+        return None
+
+def _get_modified_time():
+    """最終更新日時（CHANGE_CHECK_INTERVAL秒以内に確認済みならその値）"""
+    now = time.time()
+    if now - _modified_time['checked_at'] >= CHANGE_CHECK_INTERVAL:
+        _modified_time['value'] = get_spreadsheet_modified_time()
+        _modified_time['checked_at'] = now
+    return _modified_time['value']
+
+def _count_cache(kind, key, result):
+    """キャッシュの参照結果を数える（リクエスト単位のログにも記録）"""
+    _cache_stats[kind, key, result] += 1
+    request_log.record_cache(kind, key, result)
+
 def _get_cache(key):
-    """キャッシュからデータを取得"""
-    if key in _cache:
-        data, timestamp = _cache[key]
+    """キャッシュからデータを取得
+
+    CHANGE_CHECK_INTERVAL を過ぎたデータは更新日時を確認し、変更がなければ有効期限を延長して返す。
+    """
+    now = time.time()
+    entry = _cache.get(key)
+    if entry is not None and key in _restored_keys and not getattr(_refreshing, 'active', False):
+        # スナップショットから読み込んだデータは確認が済むまでそのまま返す
+        _count_cache('data', key, 'restored')
+        _schedule_refresh()
+        return entry[0]
+    if entry is not None:
+        data, timestamp = entry
+        if now - timestamp < CHANGE_CHECK_INTERVAL:
+            _count_cache('data', key, 'hit')
+            return data
+    modified = _get_modified_time()
+    if entry is not None:
+        if modified is not None and modified == _fetched_modified.get(key):
+            _cache[key] = (data, now)
+            _count_cache('data', key, 'revalidated')
+            return data
         ttl = CACHE_TTL_LONG if key in LONG_CACHE_KEYS else CACHE_TTL
-        if time.time() - timestamp < ttl:
+        if modified is None and now - timestamp < ttl:
+            _count_cache('data', key, 'stale')
             return data
+    # 取り直す。取得前の更新日時を記録しておく（取得中の編集は次回の確認で検知される）
+    _pending_modified[key] = modified
+    _count_cache('data', key, 'miss' if entry is None else 'expired')
     return None
 
 def _set_cache(key, data):
-    """キャッシュにデータを保存"""
+    """キャッシュにデータを保存（内容が変わっていればバージョンを更新）"""
+    global _version_counter
     _cache[key] = (data, time.time())
+    _fetched_modified[key] = _pending_modified.pop(key, None)
+    _restored_keys.discard(key)
+    encoded = repr(data).encode('utf-8')
+    _cache_sizes[key] = len(encoded)
+    checksum = zlib.crc32(encoded)
+    current = _versions.get(key)
+    if current is None or current[1] != checksum:
+        _version_counter += 1
+        _versions[key] = (_version_counter, checksum)
+        if key in CHANGE_TRACKED_KEYS:
+            previous = _tracked_rows.get(key)
+            if previous is not None:
+                _record_changes(key, previous, data, _version_counter)
+            _tracked_rows[key] = data
+
+def _row_key(row, key_columns):
+    """変更ログ用の行のキー"""
+    return '|'.join(str(row.get(c, '')) for c in key_columns)
+
+def _record_changes(key, old_rows, new_rows, version):
+    """前回と今回のデータを比べ、追加・更新・削除を変更ログに記録
+
+    行番号（row_index）は削除で後続の行がずれるため比較には含めない。
+    """
+    global _change_log_floor
+    table, key_columns = CHANGE_TRACKED_KEYS[key]
+
+    def comparable(row):
+        return {k: v for k, v in row.items() if k != 'row_index'}
+
+    old_index = {_row_key(r, key_columns): r for r in old_rows}
+    new_index = {_row_key(r, key_columns): r for r in new_rows}
+    changes = []
+    for row_key, row in new_index.items():
+        old = old_index.get(row_key)
+        if old is None:
+            changes.append({'version': version, 'table': table, 'op': 'insert', 'key': row_key, 'row': row})
+        elif comparable(old) != comparable(row):
+            changes.append({'version': version, 'table': table, 'op': 'update', 'key': row_key, 'row': row})
+    for row_key in old_index.keys() - new_index.keys():
+        changes.append({'version': version, 'table': table, 'op': 'delete', 'key': row_key, 'row': None})
+
+    _change_log.extend(changes)
+    while len(_change_log) > CHANGE_LOG_SIZE:
+        _change_log_floor = _change_log.popleft()['version']
+
+def get_cache_version(key):
+    """キャッシュキーのデータバージョンを取得（未取得なら0）"""
+    current = _versions.get(key)
+    return current[0] if current else 0
+
+def _get_derived(key, source_keys):
+    """集計結果のキャッシュを取得（依存データのバージョンが一致する場合のみ）"""
+    entry = _derived_cache.get(key)
+    if entry is None or entry[0] != tuple(get_cache_version(k) for k in source_keys):
+        _count_cache('derived', key, 'miss' if entry is None else 'expired')
+        return None
+    _count_cache('derived', key, 'hit')
+    return entry[1]
+
+def _set_derived(key, source_keys, data):
+    """集計結果を依存データのバージョンと共に保存"""
+    versions = tuple(get_cache_version(k) for k in source_keys)
+    _derived_cache[key] = (versions, data)
+
+def get_cache_stats(by_key=False):
+    """キャッシュの参照結果の回数
+
+    Returns:
+        by_key=False: {'data': {結果: 回数}, 'derived': {...}}（キーを合算）
+        by_key=True: {(種類, キー, 結果): 回数}
+    """
+    counts = dict(_cache_stats)
+    if by_key:
+        return counts
+    stats = {'data': {}, 'derived': {}}
+    for (kind, _, result), count in counts.items():
+        stats[kind][result] = stats[kind].get(result, 0) + count
+    return stats
+
+def get_cache_entries():
+    """キャッシュ中のデータのキー → (行数, おおよそのバイト数)"""
+    entries = {}
+    for key, (data, _) in list(_cache.items()):
+        # 駅伝シートは (ヘッダー, データ) のタプル
+        rows = data[1] if isinstance(data, tuple) and len(data) == 2 and isinstance(data[1], list) else data
+        entries[key] = (len(rows) if isinstance(rows, (list, dict)) else 1, _cache_sizes.get(key, 0))
+    return entries
 
 def clear_cache():
     """キャッシュをクリア"""
     global _cache
+    for key in _cache:
+        _count_cache('data', key, 'evicted')
     _cache = {}
+    _restored_keys.clear()
+    # 自分の書き込みで更新日時が変わっているため、次回は必ず問い合わせる
+    _modified_time['checked_at'] = 0.0
 
 # ============ カラム名の正規化 ============
 # スプレッドシートの実際のカラム名をアプリの内部名にマッピング
@@ -106,21 +316,32 @@ def normalize_records(records):
     """記録リストを正規化"""
     return [normalize_record(r) for r in records]
 
+_spreadsheet = None
+
 def get_client():
     """Google Sheets クライアントを取得"""
-    credentials, project = google.auth.default(
-        scopes=['https://www.googleapis.com/auth/spreadsheets']
+    credentials, project = google_auth.default(
+        scopes=[
+            'https://www.googleapis.com/auth/spreadsheets',
+            'https://www.googleapis.com/auth/drive.metadata.readonly',  # 変更検知（最終更新日時）用
+        ]
     )
     return gspread.authorize(credentials)
 
 def get_spreadsheet():
-    """スプレッドシートを開く"""
-    gc = get_client()
-    return gc.open_by_key(SPREADSHEET_ID)
+    """スプレッドシートを開く（認証とメタデータ取得を毎回行わないよう再利用する）"""
+    global _spreadsheet
+    if _spreadsheet is None:
+        # API呼び出しの回数・時間・データ量を /metrics で集計する
+        _spreadsheet = metrics.instrument_spreadsheet(get_client().open_by_key(SPREADSHEET_ID))
+    return _spreadsheet
 
 # ============ Players (選手マスタ) ============
 # 拡張カラム: id, name, group, best_5000m, target_time, active, grade, school, height, weight, message, photo_url
 
+# 一括追加で1回のAPI呼び出しにまとめる最大行数
+IMPORT_BATCH_SIZE = 500
+
 def get_all_players():
     """全選手を取得（キャッシュ付き）"""
     cached = _get_cache('all_players')
@@ -201,6 +422,32 @@ def get_player_by_id(player_id):
             return player
     return None
 
+def _name_key(name):
+    """照合用に氏名の空白（全角含む）を除去"""
+    return ''.join(str(name or '').split())
+
+def get_player_index():
+    """選手の照合用インデックスを取得（Playersが変わるまでキャッシュ）
+
+    id・登録番号・氏名（空白除去）から選手を引く辞書。同姓同名は氏名インデックスに複数入る。
+    """
+    players = get_all_players_including_inactive()
+    cached = _get_derived('player_index', ('all_players_inactive',))
+    if cached is not None:
+        return cached
+
+    index = {'id': {}, 'registration_number': {}, 'name': {}}
+    for p in players:
+        if str(p.get('is_deleted', '')).upper() == 'TRUE':
+            continue
+        index['id'][str(p.get('id', ''))] = p
+        if p.get('registration_number'):
+            index['registration_number'][str(p['registration_number']).strip()] = p
+        index['name'].setdefault(_name_key(p.get('name')), []).append(p)
+
+    _set_derived('player_index', ('all_players_inactive',), index)
+    return index
+
 def add_player(name_sei, name_mei, affiliation='', category='', status='現役', role='', grade='', birth_date='',
                pb_1500m='', pb_3000m='', pb_5000m='', pb_10000m='', pb_half='', pb_full='',
                comment='', registration_number=''):
@@ -231,6 +478,62 @@ def add_player(name_sei, name_mei, affiliation='', category='', status='現役',
     return new_id
 
 
+def player_fingerprint(player):
+    """選手の重複判定用ハッシュ（登録番号、なければ氏名+生年月日）"""
+    registration_number = str(player.get('registration_number', '')).strip()
+    if registration_number:
+        key = f"reg:{registration_number}"
+    else:
+        key = "name:{}|{}|{}".format(_name_key(player.get('name_sei')), _name_key(player.get('name_mei')),
+                                     str(player.get('birth_date', '')).strip().replace('/', '-'))
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+def get_player_fingerprints():
+    """既存選手の重複判定用ハッシュの集合（Playersが変わるまでキャッシュ）"""
+    players = get_all_players_including_inactive()
+    cached = _get_derived('player_fingerprints', ('all_players_inactive',))
+    if cached is not None:
+        return cached
+    result = {player_fingerprint(p) for p in players}
+    _set_derived('player_fingerprints', ('all_players_inactive',), result)
+    return result
+
+def add_players_bulk(players):
+    """選手を一括追加 (players: [{PLAYER_EXPECTED_HEADERSのキー: 値}, ...])
+
+    IDは件数から連番で採番し、IMPORT_BATCH_SIZE件ずつまとめて追記する。追加したIDのリストを返す。
+    """
+    if not players:
+        return []
+    sh = get_spreadsheet()
+    try:
+        worksheet = sh.worksheet('Players')
+    except gspread.exceptions.WorksheetNotFound:
+        worksheet = sh.add_worksheet(title='Players', rows=500, cols=22)
+        worksheet.append_row(PLAYER_EXPECTED_HEADERS)
+        worksheet.append_row(['システムID', '登録番号', '姓', '名', '生年月日', '学年', '所属', '区分', '状態', '役職', '出場回数',
+                              'PB 1500m', 'PB 3000m', 'PB 5000m', 'PB 10000m', 'PB ハーフ', 'PB フル',
+                              '備考', '写真URL', '削除フラグ', '作成日時', '更新日時'])
+
+    # IDはA列の行数から採番（全データは取得しない）
+    base_id = len(worksheet.col_values(1))
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    new_ids = []
+    rows = []
+    for i, player in enumerate(players):
+        new_id = f"P{base_id + i:03d}"
+        new_ids.append(new_id)
+        values = dict(player, id=new_id, created_at=now, updated_at=now)
+        values.setdefault('status', '現役')
+        values.setdefault('race_count', 0)
+        values.setdefault('is_deleted', 'FALSE')
+        rows.append([values.get(h, '') for h in PLAYER_EXPECTED_HEADERS])
+
+    for start in range(0, len(rows), IMPORT_BATCH_SIZE):
+        worksheet.append_rows(rows[start:start + IMPORT_BATCH_SIZE])
+    clear_cache()
+    return new_ids
+
 def update_player_photo(player_id, photo_url):
     """選手の写真URLのみを更新"""
     sh = get_spreadsheet()
@@ -357,6 +660,116 @@ def get_records_by_team_record(team_record_id):
     filtered = [r for r in records if str(r.get('team_record_id')) == str(team_record_id)]
     return sorted(filtered, key=lambda x: int(x.get('section') or 0))
 
+# 記録APIの1ページあたりの件数（既定・上限）
+RECORDS_PAGE_SIZE = 50
+RECORDS_PAGE_SIZE_MAX = 500
+
+def _get_records_index():
+    """記録の検索用インデックスを取得（Recordsが変わるまでキャッシュ）
+
+    records は日付の新しい順（同日は行番号の大きい順）に並べ、
+    選手ID・大会ID・大会名・種目ごとに並び順の位置リストを持つ。
+    """
+    records = get_all_records()
+    cached = _get_derived('records_index', ('all_records',))
+    if cached is not None:
+        return cached
+
+    ordered = sorted(records, key=lambda r: (str(r.get('date', '')).replace('/', '-'), r.get('row_index', 0)),
+                     reverse=True)
+    index = {'records': ordered, 'player_id': {}, 'race_id': {}, 'race_name': {}, 'event': {}}
+    for pos, record in enumerate(ordered):
+        for field in ('player_id', 'race_id', 'race_name', 'event'):
+            value = str(record.get(field, '')).strip()
+            if value:
+                index[field].setdefault(value, []).append(pos)
+
+    _set_derived('records_index', ('all_records',), index)
+    return index
+
+def _encode_records_cursor(record):
+    """ページ送り用カーソル（最後に返した記録の日付と行番号）を作成"""
+    import base64
+    raw = json.dumps([str(record.get('date', '')).replace('/', '-'), record.get('row_index', 0)])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def _decode_records_cursor(cursor):
+    """カーソルを (日付, 行番号) に戻す（不正ならValueError）"""
+    import base64
+    try:
+        date, row_index = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+        return str(date), int(row_index)
+    except Exception:
+        raise ValueError('カーソルが不正です')
+
+def query_records(player_id='', race_id='', race_name='', event='', date_from='', date_to='',
+                  cursor='', limit=RECORDS_PAGE_SIZE, fields=None):
+    """条件で記録を検索（日付の新しい順、カーソルでページ送り、fieldsで項目を絞り込み）
+
+    Returns:
+        {'records': [...], 'next_cursor': 次ページのカーソル（最終ページはNone）}
+    """
+    index = _get_records_index()
+    ordered = index['records']
+
+    # 最も件数の少ないインデックスから候補を絞る
+    candidates = None
+    for field, value in (('player_id', player_id), ('race_id', race_id),
+                         ('race_name', race_name), ('event', event)):
+        if value:
+            positions = index[field].get(str(value).strip(), [])
+            if candidates is None or len(positions) < len(candidates):
+                candidates = positions
+    if candidates is None:
+        candidates = range(len(ordered))
+
+    def sort_key(record):
+        return (str(record.get('date', '')).replace('/', '-'), record.get('row_index', 0))
+
+    # カーソル位置まで二分探索で進める（候補は新しい順に並んでいる）
+    start = 0
+    if cursor:
+        after = _decode_records_cursor(cursor)
+        lo, hi = 0, len(candidates)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if sort_key(ordered[candidates[mid]]) >= after:
+                lo = mid + 1
+            else:
+                hi = mid
+        start = lo
+
+    date_from = date_from.replace('/', '-')
+    date_to = date_to.replace('/', '-')
+    limit = max(1, min(int(limit), RECORDS_PAGE_SIZE_MAX))
+
+    results = []
+    next_cursor = None
+    for k in range(start, len(candidates)):
+        record = ordered[candidates[k]]
+        date = sort_key(record)[0]
+        if player_id and str(record.get('player_id')) != str(player_id):
+            continue
+        if race_id and str(record.get('race_id')) != str(race_id):
+            continue
+        if race_name and str(record.get('race_name', '')).strip() != race_name:
+            continue
+        if event and str(record.get('event', '')).strip() != event:
+            continue
+        if date_to and date[:len(date_to)] > date_to:
+            continue
+        if date_from and date < date_from:
+            # 新しい順なので以降はすべて範囲外
+            break
+        if len(results) == limit:
+            next_cursor = _encode_records_cursor(results[-1])
+            break
+        results.append(record)
+
+    if fields:
+        results = [{f: r.get(f, '') for f in fields} for r in results]
+    return {'records': results, 'next_cursor': next_cursor}
+
 def add_record(player_id, event, time, memo='', date=None, race_id='', distance_km='',
                time_sec='', is_pb=False, is_section_record=False,
                section='', rank_in_section='', player_name='', race_name='', race_type='',
@@ -396,6 +809,58 @@ def add_record(player_id, event, time, memo='', date=None, race_id='', distance_
     ])
     clear_cache()  # キャッシュクリア
 
+def record_fingerprint(record):
+    """記録の重複判定用ハッシュ（選手・大会・日付・種目・区間・タイム）"""
+    key = '|'.join([
+        str(record.get('player_id', '')).strip(),
+        str(record.get('race_id', '')).strip(),
+        str(record.get('date', '')).strip().replace('/', '-'),
+        str(record.get('event', '')).strip(),
+        str(record.get('section', '')).strip(),
+        str(record.get('time', '')).strip(),
+    ])
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+def get_record_fingerprints():
+    """既存記録の重複判定用ハッシュの集合（Recordsが変わるまでキャッシュ）"""
+    records = get_all_records()
+    cached = _get_derived('record_fingerprints', ('all_records',))
+    if cached is not None:
+        return cached
+    result = {record_fingerprint(r) for r in records}
+    _set_derived('record_fingerprints', ('all_records',), result)
+    return result
+
+def add_records_bulk(records):
+    """記録を一括追加 (records: [{RECORD_EXPECTED_HEADERSのキー: 値}, ...])
+
+    IDは件数から連番で採番し、IMPORT_BATCH_SIZE件ずつまとめて追記する。追加したIDのリストを返す。
+    """
+    if not records:
+        return []
+    sh = get_spreadsheet()
+    try:
+        worksheet = sh.worksheet('Records')
+    except gspread.exceptions.WorksheetNotFound:
+        worksheet = sh.add_worksheet(title='Records', rows=1000, cols=20)
+        worksheet.append_row(RECORD_EXPECTED_HEADERS)
+
+    # IDはA列の行数から採番（全データは取得しない）
+    base_id = len(worksheet.col_values(1))
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    new_ids = []
+    rows = []
+    for i, record in enumerate(records):
+        new_id = f"R{base_id + i:03d}"
+        new_ids.append(new_id)
+        values = dict(record, record_id=new_id, created_at=now, updated_at=now)
+        rows.append([values.get(h, '') for h in RECORD_EXPECTED_HEADERS])
+
+    for start in range(0, len(rows), IMPORT_BATCH_SIZE):
+        worksheet.append_rows(rows[start:start + IMPORT_BATCH_SIZE])
+    clear_cache()
+    return new_ids
+
 def update_record(row_index, date, player_id, event, time, memo='', race_id='', distance_km='',
                   time_sec='', is_pb=False, is_section_record=False,
                   section='', rank_in_section='', player_name='', race_name='', race_type='',
@@ -478,22 +943,74 @@ def get_record_by_row(row_index):
 
 # ============ Simulations (区間オーダー案) ============
 
+# 一覧の1ページあたりの件数
+SIMULATIONS_PER_PAGE = 20
+
 def get_all_simulations():
-    """全シミュレーションを取得"""
+    """全シミュレーションを取得（キャッシュ付き、新しい順）
+
+    order_dataはJSON文字列のまま order_json に保持し、
+    個別に開くときに get_simulation_by_row でデコードする。
+    """
+    cached = _get_cache('all_simulations')
+    if cached is not None:
+        return cached
+
     sh = get_spreadsheet()
     try:
         worksheet = sh.worksheet('Simulations')
     except gspread.exceptions.WorksheetNotFound:
         return []
 
-    records = worksheet.get_all_records()
-    for r in records:
-        if r.get('order_data'):
+    # 仕様: 1行目=ヘッダー, 2行目以降=データ
+    all_values = worksheet.get_all_values()
+    if len(all_values) < 2:
+        return []
+
+    headers = all_values[0]
+    records = []
+    for i, row in enumerate(all_values[1:]):
+        record = dict(zip(headers, row))
+        records.append({
+            'row_index': i + 2,
+            'created_at': record.get('created_at', ''),
+            'title': record.get('title', ''),
+            'order_json': record.get('order_data', ''),
+        })
+
+    records.sort(key=lambda x: (x['created_at'], x['row_index']), reverse=True)
+    _set_cache('all_simulations', records)
+    return records
+
+def get_simulations_page(page=1, per_page=SIMULATIONS_PER_PAGE):
+    """シミュレーション一覧をページ単位で取得"""
+    simulations = get_all_simulations()
+    total = len(simulations)
+    pages = max(1, (total + per_page - 1) // per_page)
+    page = min(max(1, page), pages)
+    start = (page - 1) * per_page
+    return {
+        'items': simulations[start:start + per_page],
+        'page': page,
+        'pages': pages,
+        'total': total,
+    }
+
+def get_simulation_by_row(row_index):
+    """行番号でシミュレーションを取得（order_dataをデコード）"""
+    for sim in get_all_simulations():
+        if sim['row_index'] == row_index:
             try:
-                r['order_data'] = json.loads(r['order_data'])
+                order_data = json.loads(sim['order_json']) if sim['order_json'] else {}
             except json.JSONDecodeError:
-                r['order_data'] = {}
-    return records
+                order_data = {}
+            return {
+                'row_index': sim['row_index'],
+                'created_at': sim['created_at'],
+                'title': sim['title'],
+                'order_data': order_data,
+            }
+    return None
 
 def save_simulation(title, order_data):
     """シミュレーションを保存"""
@@ -507,6 +1024,7 @@ def save_simulation(title, order_data):
     created_at = datetime.now().strftime('%Y/%m/%d %H:%M:%S')
     order_json = json.dumps(order_data, ensure_ascii=False)
     worksheet.append_row([created_at, title, order_json])
+    clear_cache()
 
 # ============ 統計機能 ============
 
@@ -721,6 +1239,27 @@ def get_race_by_id(race_id):
             return race
     return None
 
+def get_race_index():
+    """大会の照合用インデックスを取得（Racesが変わるまでキャッシュ）
+
+    race_id・大会名・略称から大会を引く辞書。
+    """
+    races = get_all_races()
+    cached = _get_derived('race_index', ('all_races',))
+    if cached is not None:
+        return cached
+
+    index = {'id': {}, 'name': {}}
+    for race in races:
+        index['id'][str(race.get('race_id', ''))] = race
+        for field in ('race_name', 'short_name'):
+            name = _name_key(race.get(field))
+            if name:
+                index['name'].setdefault(name, race)
+
+    _set_derived('race_index', ('all_races',), index)
+    return index
+
 def get_section_results(race_name, section):
     """特定の大会・区間の全結果を取得"""
     records = get_all_records()
@@ -895,6 +1434,70 @@ def add_team_record(race_id, edition='', date='', total_time='', total_time_sec=
     clear_cache()
     return new_id
 
+def add_team_record_sections(team_record_id, sections):
+    """チーム記録に区間記録をまとめて追加（Recordsテーブルに1回の一括追記で登録）
+
+    Args:
+        team_record_id: チーム記録ID
+        sections: [{section, player_id, time, rank_in_section, distance_km, memo}, ...]
+
+    Returns:
+        追加した記録IDのリスト。選手不明・区間重複があればValueError（何も書き込まない）
+    """
+    team_record = get_team_record_by_id(team_record_id)
+    if not team_record:
+        raise ValueError('チーム記録が見つかりません')
+
+    # 選手・大会はキャッシュ済みのインデックスから引く
+    race = get_race_index()['id'].get(str(team_record.get('race_id', '')))
+    player_index = get_player_index()['id']
+    registered = {str(r.get('section', '')) for r in get_records_by_team_record(team_record_id)}
+
+    records = []
+    seen = set()
+    for item in sections:
+        section = str(item.get('section', '')).strip()
+        if section in registered or section in seen:
+            raise ValueError(f'{section}区は既に登録されています')
+        seen.add(section)
+
+        player_id = str(item.get('player_id', '')).strip()
+        player = player_index.get(player_id)
+        if player is None:
+            raise ValueError(f'{section}区の選手（{player_id}）が見つかりません')
+
+        # 距離をメートルに変換
+        distance_km = item.get('distance_km', '')
+        distance_m = ''
+        if distance_km:
+            try:
+                distance_m = str(float(distance_km) * 1000)
+            except (ValueError, TypeError):
+                distance_m = distance_km
+
+        time_str = item.get('time', '')
+        time_sec = _convert_time_to_seconds(time_str)
+        records.append({
+            'player_id': player_id,
+            'race_id': team_record.get('race_id', ''),
+            'date': team_record.get('date', ''),
+            'event': '',
+            'section': section,
+            'distance_m': distance_m,
+            'time': time_str,
+            'time_sec': time_sec or '',
+            'is_pb': 'FALSE',
+            'is_section_record': 'FALSE',
+            'rank_in_section': item.get('rank_in_section', ''),
+            'memo': item.get('memo', ''),
+            'player_name': player.get('name', ''),
+            'race_name': race.get('race_name', '') if race else '',
+            'race_type': race.get('type', '') if race else '',
+            'team_record_id': team_record_id,
+        })
+
+    return add_records_bulk(records)
+
 def update_team_record(team_record_id, race_id, edition='', date='', total_time='', total_time_sec='', rank='', total_teams='', category='', team_name='', memo=''):
     """チーム記録を更新"""
     sh = get_spreadsheet()
@@ -1518,8 +2121,11 @@ def _calculate_avg_time(time_str, distance):
     except (ValueError, TypeError):
         return 'N/A'
 
-    avg_time_per_km = total_seconds / distance_float
+    return _format_pace(total_seconds / distance_float)
 
+
+def _format_pace(avg_time_per_km):
+    """1kmあたりの秒数を「分:秒.1桁」形式に変換"""
     avg_minutes = int(avg_time_per_km // 60)
     avg_seconds = avg_time_per_km % 60
 
@@ -1822,3 +2428,925 @@ def get_team_section_all_editions(team_name, leg):
         return {'error': '該当データがありません'}
 
     return results
+
+
+# ============ 県縦断駅伝 区間ペース統計 ============
+
+# 順位帯（下限, 上限）
+EKIDEN_RANK_BANDS = [(1, 3), (4, 6), (7, 11)]
+
+# 算出するパーセンタイル
+PACE_PERCENTILES = [10, 25, 75, 90]
+
+
+def _build_edition_index(header, data):
+    """区間距離・区間気温シートを (大会回数, 区間名) → 値 の辞書に変換"""
+    index = {}
+    for row in data:
+        if not row:
+            continue
+        edition = str(row[0])
+        for j in range(1, min(len(header), len(row))):
+            index[(edition, header[j])] = row[j]
+    return index
+
+
+def _iter_ekiden_paces(individual_header, individual_data, distance_index):
+    """個人シートの全セルを走査し (区間, 大会回数, 順位, ペース秒/km, タイム秒) を返す"""
+    for row in individual_data:
+        if len(row) < 2:
+            continue
+        edition = str(row[1])
+        for j in range(2, min(len(individual_header), len(row))):
+            cell = row[j]
+            if not cell:
+                continue
+            details = cell.split('_')
+            if len(details) < 6 or not details[4].isdigit():
+                continue
+
+            leg = individual_header[j]
+            distance = _parse_distance_to_km(distance_index.get((edition, leg)))
+            time_sec = _convert_time_to_seconds(details[5])
+            if not distance or time_sec <= 0:
+                continue
+
+            yield leg, edition, int(details[4]), time_sec / distance, time_sec
+
+
+def _percentile(sorted_values, p):
+    """ソート済みリストのパーセンタイル（線形補間）"""
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * p / 100
+    lower = int(k)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (k - lower)
+
+
+def _summarize(values):
+    """数値リストの統計量（件数・最小・最大・平均・中央値・パーセンタイル）"""
+    values = sorted(values)
+    if not values:
+        return None
+    summary = {
+        'min': values[0],
+        'max': values[-1],
+        'mean': sum(values) / len(values),
+        'median': _percentile(values, 50),
+    }
+    for p in PACE_PERCENTILES:
+        summary[f'p{p}'] = _percentile(values, p)
+    return summary
+
+
+def _pace_summary(entries):
+    """(ペース秒/km, タイム秒) のリストから統計情報を作成"""
+    paces = [e[0] for e in entries]
+    times = [e[1] for e in entries]
+    pace_sec = _summarize(paces)
+    time_sec = _summarize(times)
+    return {
+        'count': len(entries),
+        'pace_sec': {k: round(v, 1) for k, v in pace_sec.items()},
+        'pace': {k: _format_pace(v) for k, v in pace_sec.items()},
+        'time_sec': {k: round(v, 1) for k, v in time_sec.items()},
+    }
+
+
+def get_ekiden_pace_statistics():
+    """区間別・順位別・順位帯別のペース統計を取得（個人・区間距離シートが変わるまでキャッシュ）"""
+    individual_header, individual_data = _get_ekiden_individual_data()
+    if individual_header is None:
+        return {'error': '個人シートが見つかりません'}
+
+    distance_header, distance_data = _get_ekiden_distance_data()
+    if distance_header is None:
+        distance_header, distance_data = [], []
+
+    source_keys = ('ekiden_individual', 'ekiden_distance')
+    cached = _get_derived('ekiden_pace_statistics', source_keys)
+    if cached is not None:
+        return cached
+
+    distance_index = _build_edition_index(distance_header, distance_data)
+
+    # 1回の走査で区間ごとに (順位, ペース, タイム) を集める
+    entries_by_leg = {}
+    editions = set()
+    for leg, edition, rank, pace, time_sec in _iter_ekiden_paces(individual_header, individual_data, distance_index):
+        entries_by_leg.setdefault(leg, []).append((rank, pace, time_sec))
+        editions.add(edition)
+
+    legs_stats = {}
+    for leg, entries in entries_by_leg.items():
+        if not entries:
+            continue
+
+        by_rank = {}
+        for rank, pace, time_sec in entries:
+            by_rank.setdefault(rank, []).append((pace, time_sec))
+
+        bands = {}
+        for low, high in EKIDEN_RANK_BANDS:
+            band_entries = [(pace, time_sec) for rank, pace, time_sec in entries if low <= rank <= high]
+            if band_entries:
+                bands[f'{low}-{high}'] = _pace_summary(band_entries)
+
+        legs_stats[leg] = {
+            'all': _pace_summary([(pace, time_sec) for _, pace, time_sec in entries]),
+            'ranks': {str(rank): _pace_summary(by_rank[rank]) for rank in sorted(by_rank)},
+            'bands': bands,
+        }
+
+    result = {
+        'editions': sorted(editions, key=lambda e: int(e) if e.isdigit() else 0),
+        'legs': legs_stats,
+    }
+    _set_derived('ekiden_pace_statistics', source_keys, result)
+    return result
+
+
+# ============ 県縦断駅伝 気温補正ペースモデル ============
+
+# 区間単独で回帰するのに必要な最小件数（未満の場合は全区間共通の傾きを使う）
+TEMPERATURE_MODEL_MIN_SAMPLES = 8
+
+
+def _parse_temperature(value):
+    """気温文字列（例: "15.2", "15.2℃"）を数値に変換"""
+    import re
+    if value is None:
+        return None
+    match = re.search(r'-?\d+(?:\.\d+)?', str(value))
+    if not match:
+        return None
+    return float(match.group(0))
+
+
+def get_ekiden_temperature_model():
+    """区間別の「ペース = 切片 + 傾き × 気温」回帰モデルを取得（駅伝シートが変わるまでキャッシュ）"""
+    individual_header, individual_data = _get_ekiden_individual_data()
+    if individual_header is None:
+        return {'error': '個人シートが見つかりません'}
+
+    distance_header, distance_data = _get_ekiden_distance_data()
+    if distance_header is None:
+        distance_header, distance_data = [], []
+
+    temp_header, temp_data = _get_ekiden_temperature_data()
+    if temp_header is None:
+        return {'error': '区間気温シートが見つかりません'}
+
+    source_keys = ('ekiden_individual', 'ekiden_distance', 'ekiden_temperature')
+    cached = _get_derived('ekiden_temperature_model', source_keys)
+    if cached is not None:
+        return cached
+
+    distance_index = _build_edition_index(distance_header, distance_data)
+    temp_index = _build_edition_index(temp_header, temp_data)
+
+    # 区間ごとに (気温, ペース, 順位) を集める
+    samples_by_leg = {}
+    for leg, edition, rank, pace, _ in _iter_ekiden_paces(individual_header, individual_data, distance_index):
+        temperature = _parse_temperature(temp_index.get((edition, leg)))
+        if temperature is None:
+            continue
+        samples_by_leg.setdefault(leg, []).append((temperature, pace, rank))
+
+    # 区間ごとの平均と偏差平方和
+    moments = {}
+    pooled_sxy = 0.0
+    pooled_sxx = 0.0
+    for leg, samples in samples_by_leg.items():
+        n = len(samples)
+        mean_t = sum(s[0] for s in samples) / n
+        mean_p = sum(s[1] for s in samples) / n
+        sxx = sum((s[0] - mean_t) ** 2 for s in samples)
+        sxy = sum((s[0] - mean_t) * (s[1] - mean_p) for s in samples)
+        syy = sum((s[1] - mean_p) ** 2 for s in samples)
+        moments[leg] = (n, mean_t, mean_p, sxx, sxy, syy)
+        pooled_sxx += sxx
+        pooled_sxy += sxy
+
+    pooled_slope = pooled_sxy / pooled_sxx if pooled_sxx > 0 else 0.0
+
+    legs_model = {}
+    for leg, (n, mean_t, mean_p, sxx, sxy, syy) in moments.items():
+        if n >= TEMPERATURE_MODEL_MIN_SAMPLES and sxx > 0:
+            slope = sxy / sxx
+            source = 'leg'
+        else:
+            slope = pooled_slope
+            source = 'pooled'
+        intercept = mean_p - slope * mean_t
+        r2 = (sxy * sxy) / (sxx * syy) if source == 'leg' and syy > 0 else None
+
+        # 順位ごとの平均残差（同じ気温での順位による差）
+        residuals = {}
+        temps = []
+        for temperature, pace, rank in samples_by_leg[leg]:
+            residuals.setdefault(rank, []).append(pace - (intercept + slope * temperature))
+            temps.append(temperature)
+
+        legs_model[leg] = {
+            'count': n,
+            'slope': round(slope, 3),
+            'intercept': round(intercept, 3),
+            'r2': round(r2, 3) if r2 is not None else None,
+            'source': source,
+            'temperature_min': min(temps),
+            'temperature_max': max(temps),
+            'rank_offsets': {str(rank): round(sum(v) / len(v), 3) for rank, v in sorted(residuals.items())},
+        }
+
+    result = {
+        'pooled_slope': round(pooled_slope, 3),
+        'legs': legs_model,
+    }
+    _set_derived('ekiden_temperature_model', source_keys, result)
+    return result
+
+
+def _parse_pace(value):
+    """ペース（秒/kmの数値、または「分:秒」の文字列）を秒に変換（解釈できなければNone）"""
+    if isinstance(value, str):
+        value = value.strip()
+        if ':' in value:
+            seconds = _convert_time_to_seconds(value)
+            return seconds if seconds > 0 else None
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        return None
+    return seconds if seconds > 0 and math.isfinite(seconds) else None
+
+
+def predict_ekiden_pace(leg, temperature, rank=None, pace=None, from_temperature=None):
+    """気温補正後のペースを計算
+
+    pace（秒/km または "分:秒"）と from_temperature を指定した場合は、
+    その気温で走ったペースを temperature での換算ペースに補正する。指定しない場合はモデルの予測ペース
+    （rank指定時はその順位の予測ペース）を返す。
+    """
+    model = get_ekiden_temperature_model()
+    if 'error' in model:
+        return model
+
+    leg_model = model['legs'].get(leg)
+    if leg_model is None:
+        return {'error': f'指定された区間のモデルがありません: {leg}'}
+
+    for value in (temperature, from_temperature):
+        if value is not None and not (isinstance(value, (int, float)) and math.isfinite(value)):
+            return {'error': '気温は数値で指定してください'}
+
+    slope = leg_model['slope']
+    if pace is not None:
+        pace = _parse_pace(pace)
+        if pace is None:
+            return {'error': 'ペースは秒/km（例: 200）または「分:秒」（例: 3:20）で指定してください'}
+        if from_temperature is None:
+            return {'error': 'ペースを指定する場合は、そのペースで走った気温（from_temperature）も指定してください'}
+        pace_sec = pace + slope * (temperature - from_temperature)
+    else:
+        pace_sec = leg_model['intercept'] + slope * temperature
+        if rank is not None:
+            pace_sec += leg_model['rank_offsets'].get(str(rank), 0.0)
+    if not math.isfinite(pace_sec):
+        return {'error': '補正後のペースを計算できません'}
+
+    return {
+        'leg': leg,
+        'temperature': temperature,
+        'rank': rank,
+        'pace_sec': round(pace_sec, 1),
+        'pace': _format_pace(pace_sec),
+        'model': leg_model,
+    }
+
+
+# ============ 区間タイム予測 ============
+
+# 選手マスタのPBカラムと距離(km)
+PB_DISTANCES_KM = [
+    ('pb_1500m', 1.5),
+    ('pb_3000m', 3.0),
+    ('pb_5000m', 5.0),
+    ('pb_10000m', 10.0),
+    ('pb_half', 21.0975),
+    ('pb_full', 42.195),
+]
+
+# リーゲルの式の指数（T2 = T1 × (D2 / D1) ^ RIEGEL_EXPONENT）
+RIEGEL_EXPONENT = 1.06
+
+
+def _format_seconds(total_seconds):
+    """秒数を「時:分:秒」または「分:秒」形式に変換"""
+    total_seconds = int(round(total_seconds))
+    hours, remainder = divmod(total_seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+
+def get_ekiden_leg_distances(edition=None):
+    """区間距離シートから区間と距離(km)のリストを取得（edition未指定時は最新回）"""
+    distance_header, distance_data = _get_ekiden_distance_data()
+    if distance_header is None:
+        return []
+
+    target_row = None
+    for row in distance_data:
+        if not row or not str(row[0]).isdigit():
+            continue
+        if edition is not None:
+            if str(row[0]) == str(edition):
+                target_row = row
+                break
+        elif target_row is None or int(row[0]) > int(target_row[0]):
+            target_row = row
+
+    if target_row is None:
+        return []
+
+    legs = []
+    for j in range(1, min(len(distance_header), len(target_row))):
+        distance = _parse_distance_to_km(target_row[j])
+        if distance:
+            legs.append({'leg': distance_header[j], 'distance_km': distance})
+    return legs
+
+
+# 予測に使う記録の期間（日数）と最短距離(km)
+PREDICTION_RECENT_DAYS = 730
+PREDICTION_MIN_DISTANCE_KM = 1.5
+
+# 予測の基準距離(km)。各選手の記録をこの距離の換算タイムに揃えて比較する
+PREDICTION_BASE_KM = 10.0
+
+# 距離が書かれていない種目名の距離(km)
+EVENT_DISTANCES_KM = {
+    'ハーフ': 21.0975,
+    'ハーフマラソン': 21.0975,
+    'フル': 42.195,
+    'マラソン': 42.195,
+}
+
+
+def _riegel_factor(distance_km):
+    """基準距離の換算タイムから distance_km のタイムへの倍率"""
+    return (distance_km / PREDICTION_BASE_KM) ** RIEGEL_EXPONENT
+
+
+def _record_distance_km(record):
+    """記録の距離(km)を distance_m または種目名から取得"""
+    distance = _parse_distance_to_km(record.get('distance_m', ''))
+    if distance:
+        return distance
+    event = str(record.get('event', '')).strip()
+    if event in EVENT_DISTANCES_KM:
+        return EVENT_DISTANCES_KM[event]
+    return _parse_distance_to_km(event)
+
+
+def get_prediction_bases():
+    """選手ごとの予測基準（直近の最良記録を基準距離に換算したタイム）を取得
+
+    Records・Playersが変わるまでキャッシュする。直近 PREDICTION_RECENT_DAYS 日に
+    記録がない選手は選手マスタのPBを使う。
+    """
+    from datetime import timedelta
+    players = get_all_players()
+    records = get_all_records()
+
+    cutoff = (datetime.now() - timedelta(days=PREDICTION_RECENT_DAYS)).strftime('%Y-%m-%d')
+    source_keys = ('all_players', 'all_records')
+    cached = _get_derived('prediction_bases', source_keys)
+    if cached is not None and cached['cutoff'] == cutoff:
+        return cached
+
+    # 直近記録の基準距離換算タイム（選手ごとの最小値）
+    recent_best = {}
+    for record in records:
+        date = str(record.get('date', '')).replace('/', '-')[:10]
+        if date < cutoff:
+            continue
+        distance = _record_distance_km(record)
+        if not distance or distance < PREDICTION_MIN_DISTANCE_KM:
+            continue
+        try:
+            seconds = float(record.get('time_sec') or 0)
+        except (ValueError, TypeError):
+            seconds = 0
+        if seconds <= 0:
+            seconds = _convert_time_to_seconds(str(record.get('time', '')))
+        if seconds <= 0:
+            continue
+        base = seconds / _riegel_factor(distance)
+        player_id = str(record.get('player_id', ''))
+        current = recent_best.get(player_id)
+        if current is None or base < current[0]:
+            recent_best[player_id] = (base, f"{record.get('event') or record.get('section', '')} {record.get('time', '')}".strip())
+
+    bases = {}
+    for player in players:
+        player_id = str(player.get('id'))
+        if player_id in recent_best:
+            base, basis = recent_best[player_id]
+            bases[player_id] = {'base_sec': base, 'source': 'record', 'basis': basis}
+            continue
+        # 直近記録がなければPBから
+        for column, pb_distance in PB_DISTANCES_KM:
+            pb_seconds = _convert_time_to_seconds(player.get(column, ''))
+            if pb_seconds <= 0:
+                continue
+            base = pb_seconds / _riegel_factor(pb_distance)
+            if player_id not in bases or base < bases[player_id]['base_sec']:
+                bases[player_id] = {'base_sec': base, 'source': 'pb', 'basis': f"{column} {player.get(column)}"}
+
+    result = {'cutoff': cutoff, 'bases': bases}
+    _set_derived('prediction_bases', source_keys, result)
+    return result
+
+
+def predict_time_matrix(players, legs):
+    """選手×区間の予測タイム(秒)行列を作成（予測できない選手の行はNone）
+
+    予測タイム = 基準換算タイム × 区間ごとの倍率 なので、
+    基準タイムの列ベクトルと倍率の行ベクトルの外積として一度に求める。
+    """
+    bases = get_prediction_bases()['bases']
+    factors = [_riegel_factor(leg['distance_km']) for leg in legs]
+    matrix = []
+    for player in players:
+        base = bases.get(str(player.get('id')))
+        if base is None:
+            matrix.append(None)
+        else:
+            matrix.append([base['base_sec'] * f for f in factors])
+    return matrix
+
+
+def _active_players():
+    """現役選手のみ取得"""
+    return [p for p in get_all_players() if p.get('status', '現役') == '現役' or not p.get('status')]
+
+
+def get_ekiden_prediction_matrix():
+    """現役選手×県縦断駅伝全区間の予測タイム行列を取得
+
+    Records・Players・区間距離が変わるまでキャッシュする。
+    """
+    players = _active_players()
+    bases = get_prediction_bases()
+    legs = get_ekiden_leg_distances()
+
+    source_keys = ('all_players', 'all_records', 'ekiden_distance')
+    cached = _get_derived('ekiden_prediction_matrix', source_keys)
+    if cached is not None and cached['cutoff'] == bases['cutoff']:
+        return cached
+
+    matrix = predict_time_matrix(players, legs)
+    result = {
+        'cutoff': bases['cutoff'],
+        'legs': legs,
+        'players': [{
+            'id': p.get('id'),
+            'name': p.get('name', ''),
+            'source': bases['bases'].get(str(p.get('id')), {}).get('source'),
+            'basis': bases['bases'].get(str(p.get('id')), {}).get('basis'),
+        } for p in players],
+        'matrix': matrix,
+    }
+    _set_derived('ekiden_prediction_matrix', source_keys, result)
+    return result
+
+
+def get_ekiden_leg_predictions(leg):
+    """指定区間の選手別予測タイム（速い順、過去大会での順位相当つき）"""
+    prediction = get_ekiden_prediction_matrix()
+    leg_index = next((i for i, l in enumerate(prediction['legs']) if l['leg'] == leg), None)
+    if leg_index is None:
+        return {'error': f'指定された区間が見つかりません: {leg}'}
+
+    distance = prediction['legs'][leg_index]['distance_km']
+    results = []
+    for player, row in zip(prediction['players'], prediction['matrix']):
+        if row is None:
+            continue
+        predicted_sec = row[leg_index]
+        results.append({
+            'player_id': player['id'],
+            'player_name': player['name'],
+            'predicted_sec': round(predicted_sec, 1),
+            'predicted_time': _format_seconds(predicted_sec),
+            'pace': _format_pace(predicted_sec / distance),
+            'projected_rank': project_ekiden_rank(leg, predicted_sec / distance),
+            'basis': player['basis'],
+        })
+    results.sort(key=lambda x: x['predicted_sec'])
+    return {'leg': leg, 'distance_km': distance, 'predictions': results}
+
+
+def get_predicted_times(distance_km, players=None):
+    """選手ID → 指定距離の予測タイム文字列 の辞書を取得"""
+    if players is None:
+        players = _active_players()
+    matrix = predict_time_matrix(players, [{'leg': '', 'distance_km': distance_km}])
+    return {str(p.get('id')): _format_seconds(row[0]) for p, row in zip(players, matrix) if row is not None}
+
+
+def project_ekiden_rank(leg, pace_sec):
+    """予測ペースが過去大会の何位相当かを推定（順位別の中央値ペースと比較）"""
+    stats = get_ekiden_pace_statistics()
+    if 'error' in stats:
+        return None
+    leg_stats = stats['legs'].get(leg)
+    if not leg_stats:
+        return None
+    faster = sum(1 for rank_stats in leg_stats['ranks'].values()
+                 if rank_stats['pace_sec']['median'] < pace_sec)
+    return faster + 1
+
+
+# ============ 区間オーダー最適化 ============
+
+def optimize_ekiden_order(legs=None, pinned=None, excluded=None, alternatives=2):
+    """予測タイムの合計が最小となる区間オーダーを求める
+
+    Args:
+        legs: [{'leg': 区間名, 'distance_km': 距離}, ...]（未指定時は区間距離シートの最新回）
+        pinned: {区間名: 選手ID} の固定配置
+        excluded: 起用しない選手IDのリスト
+        alternatives: 最適解以外に返す候補数
+    """
+    if legs is None:
+        legs = get_ekiden_leg_distances()
+    if not legs:
+        return {'error': '区間距離が取得できません'}
+
+    pinned = {str(k): str(v) for k, v in (pinned or {}).items()}
+    excluded = {str(p) for p in (excluded or [])}
+
+    players = [p for p in _active_players()
+               if str(p.get('id')) not in excluded or str(p.get('id')) in pinned.values()]
+    player_index = {str(p.get('id')): j for j, p in enumerate(players)}
+    leg_index = {leg['leg']: i for i, leg in enumerate(legs)}
+
+    fixed = {}
+    for leg_name, player_id in pinned.items():
+        if leg_name not in leg_index:
+            return {'error': f'固定指定の区間が見つかりません: {leg_name}'}
+        if player_id not in player_index:
+            return {'error': f'固定指定の選手が見つかりません: {player_id}'}
+        fixed[leg_index[leg_name]] = player_index[player_id]
+    if len(set(fixed.values())) < len(fixed):
+        return {'error': '同じ選手が複数の区間に固定されています'}
+
+    if len(players) < len(legs):
+        return {'error': f'起用可能な選手（{len(players)}人）が区間数（{len(legs)}）より少ないです'}
+
+    # 区間×選手のコスト行列（予測タイム行列の転置、予測なしは配置不可）
+    predicted = predict_time_matrix(players, legs)
+    cost = [[row[i] if row is not None else order_solver.INFEASIBLE for row in predicted]
+            for i in range(len(legs))]
+
+    solutions = order_solver.k_best_assignments(cost, 1 + max(0, int(alternatives)), fixed)
+    if not solutions:
+        return {'error': '条件を満たすオーダーが見つかりません（予測タイムのない選手が多すぎます）'}
+
+    orders = []
+    for total, assignment in solutions:
+        order = []
+        for i, leg in enumerate(legs):
+            player = players[assignment[i]]
+            order.append({
+                'leg': leg['leg'],
+                'distance_km': leg['distance_km'],
+                'player_id': player.get('id'),
+                'player_name': player.get('name', ''),
+                'predicted_sec': round(cost[i][assignment[i]], 1),
+                'predicted_time': _format_seconds(cost[i][assignment[i]]),
+                'pinned': i in fixed,
+            })
+        orders.append({
+            'total_sec': round(total, 1),
+            'total_time': _format_seconds(total),
+            'order': order,
+        })
+
+    return {
+        'best': orders[0],
+        'alternatives': orders[1:],
+        'player_count': len(players),
+        'leg_count': len(legs),
+    }
+
+
+# ============ オフライン用スナップショット ============
+# Service WorkerがIndexedDBに保存し、オフライン時やページ表示直後に使う小さなデータ一式
+
+OFFLINE_RECORDS_LIMIT = 1000  # 直近の記録の最大件数（日付の新しい順）
+OFFLINE_PLAYER_FIELDS = [
+    'id', 'name', 'name_sei', 'name_mei', 'grade', 'affiliation', 'category', 'status', 'role',
+    'pb_1500m', 'pb_3000m', 'pb_5000m', 'pb_10000m', 'pb_half', 'pb_full', 'photo_url'
+]
+OFFLINE_RECORD_FIELDS = [
+    'record_id', 'player_id', 'race_id', 'race_name', 'date', 'event', 'section',
+    'distance_m', 'time', 'is_pb', 'rank_in_section', 'memo'
+]
+OFFLINE_EVENT_FIELDS = ['event_id', 'date', 'event_type', 'title', 'start_time', 'end_time', 'location']
+
+def get_offline_snapshot():
+    """オフライン用のデータ一式（選手・直近の記録・マスタ・今月の予定）を取得
+
+    元データが変わるか月が変わるまでキャッシュする。
+    """
+    players = get_all_players()
+    masters = get_all_masters()
+    get_all_records()
+    get_all_events()
+    month = datetime.now().strftime('%Y-%m')
+    source_keys = ('all_players', 'all_records', 'all_masters', 'all_events')
+    cached = _get_derived('offline_snapshot', source_keys)
+    if cached is not None and cached['month'] == month:
+        return cached
+
+    year, mon = (int(v) for v in month.split('-'))
+    snapshot = {
+        'version': _version_counter,  # /api/changes?since= に渡す
+        'month': month,
+        'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'players': [{f: p.get(f, '') for f in OFFLINE_PLAYER_FIELDS} for p in players],
+        'records': [{f: r.get(f, '') for f in OFFLINE_RECORD_FIELDS}
+                    for r in _get_records_index()['records'][:OFFLINE_RECORDS_LIMIT]],
+        'masters': [{f: m.get(f, '') for f in MASTERS_EXPECTED_HEADERS} for m in masters],
+        'events': [{f: e.get(f, '') for f in OFFLINE_EVENT_FIELDS} for e in get_events_by_month(year, mon)],
+    }
+    _set_derived('offline_snapshot', source_keys, snapshot)
+    return snapshot
+
+# ============ データバージョン ============
+
+# キャッシュキー → データ読み込み関数
+_CACHE_LOADERS = {
+    'all_players': get_all_players,
+    'all_players_inactive': get_all_players_including_inactive,
+    'all_records': get_all_records,
+    'all_simulations': get_all_simulations,
+    'all_masters': get_all_masters,
+    'all_races': get_all_races,
+    'all_team_records': get_all_team_records,
+    'all_events': get_all_events,
+    'all_practice_logs': get_all_practice_logs,
+    'all_attendance': get_all_attendance,
+    'ekiden_individual': _get_ekiden_individual_data,
+    'ekiden_distance': _get_ekiden_distance_data,
+    'ekiden_temperature': _get_ekiden_temperature_data,
+}
+
+
+def get_data_versions(keys):
+    """指定キャッシュキーのデータを読み込み（キャッシュ有効なら取得しない）、バージョンの辞書を返す"""
+    versions = {}
+    for key in keys:
+        _CACHE_LOADERS[key]()
+        versions[key] = get_cache_version(key)
+    return versions
+
+
+def get_current_version():
+    """現在のデータバージョン（変更ログの最新位置）"""
+    return _version_counter
+
+
+def get_changes(since, tables=None):
+    """指定バージョンより後の変更を取得
+
+    追跡対象のテーブルを読み込み（キャッシュ有効なら取得しない）、変更ログから返す。
+    変更ログに残っていない古いバージョンや、別プロセスのバージョンが指定された場合は
+    reset=True を返すので、呼び出し側は全データを取り直す。
+
+    Args:
+        since: 前回受け取ったバージョン
+        tables: 絞り込むテーブル名のリスト（Noneなら全テーブル）
+
+    Returns:
+        {'version': 現在のバージョン, 'reset': bool, 'changes': [{version, table, op, key, row}, ...]}
+    """
+    for key in CHANGE_TRACKED_KEYS:
+        _CACHE_LOADERS[key]()
+
+    if since < _change_log_floor or since > _version_counter:
+        return {'version': _version_counter, 'reset': True, 'changes': []}
+    changes = [c for c in _change_log
+               if c['version'] > since and (not tables or c['table'] in tables)]
+    return {'version': _version_counter, 'reset': False, 'changes': changes}
+
+# ============ 起動時のウォームアップ ============
+# コールドスタート直後の最初のリクエストが認証と全シートの取得を待たないよう、
+# サーバーがリクエストを受け付ける前に全シートと主な集計結果を読み込んでおく（WARMUP_ON_BOOT=1 のとき main で実行）。
+# 失敗した場合（起動時のSheets API・認証の一時的な障害など）は、リクエストのたびに retry_warmup_if_due で
+# 再試行の時刻を確認し、WARMUP_RETRY_INITIAL 秒から倍々に（最大 WARMUP_RETRY_MAX 秒）間隔を空けてバックグラウンドで再試行する。
+# gunicornのプリロード時はマスタープロセスでスレッドを作らないよう、再試行はワーカーのリクエストから始める。
+
+WARMUP_RETRY_INITIAL = 5  # 最初の再試行までの秒数
+WARMUP_RETRY_MAX = 300  # 再試行の間隔の上限（秒）
+
+# 読み込んでおく集計結果（シートのデータを読み込んだ後に実行）
+_WARMUP_DERIVED = (
+    get_player_index,
+    get_race_index,
+    _get_records_index,
+    get_ekiden_pace_statistics,
+    get_ekiden_temperature_model,
+    get_prediction_bases,
+    get_offline_snapshot,
+)
+
+_warmup_state = {'status': 'cold', 'seconds': None, 'keys': 0, 'finished_at': None, 'error': None,
+                 'attempts': 0, 'next_retry_at': None}
+_warmup_lock = threading.Lock()
+_warmup_retry = {'thread': None}
+
+def warm_up():
+    """全シートと主な集計結果をキャッシュに読み込む（失敗しても例外は投げず、状態と次の再試行の時刻を記録する）"""
+    _warmup_state['status'] = 'warming'
+    _warmup_state['attempts'] += 1
+    start = time.perf_counter()
+    try:
+        for loader in _CACHE_LOADERS.values():
+            loader()
+        for build in _WARMUP_DERIVED:
+            build()
+    except Exception as e:
+        delay = min(WARMUP_RETRY_MAX, WARMUP_RETRY_INITIAL * 2 ** (_warmup_state['attempts'] - 1))
+        _warmup_state.update(status='failed', error=str(e), next_retry_at=time.time() + delay)
+    else:
+        _warmup_state.update(status='warm', error=None, next_retry_at=None)
+    _warmup_state.update(seconds=round(time.perf_counter() - start, 2), keys=len(_cache),
+                         finished_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+    return get_warmup_status()
+
+def retry_warmup_if_due():
+    """before_requestフック: ウォームアップが失敗していて再試行の時刻を過ぎていれば、バックグラウンドで再試行する"""
+    if _warmup_state['status'] != 'failed' or time.time() < _warmup_state['next_retry_at']:
+        return
+    with _warmup_lock:
+        thread = _warmup_retry['thread']
+        if _warmup_state['status'] != 'failed' or (thread is not None and thread.is_alive()):
+            return
+        _warmup_state['status'] = 'warming'
+        _warmup_retry['thread'] = threading.Thread(target=warm_up, daemon=True)
+        _warmup_retry['thread'].start()
+
+def get_warmup_status():
+    """ウォームアップの状態（status: cold / warming / warm / failed、unconfirmed: スナップショットから読み込み未確認のキー数）"""
+    return dict(_warmup_state, unconfirmed=len(_restored_keys))
+
+def reset_connection():
+    """スプレッドシートへの接続を破棄する（fork後のワーカーで親プロセスのHTTP接続を共有しないため）
+
+    キャッシュしたデータはそのまま使う。
+    """
+    global _spreadsheet
+    _spreadsheet = None
+
+# ============ キャッシュのスナップショット ============
+# 再起動のたびにキャッシュが空になり全シートを取り直さないよう、キャッシュ（データ・バージョン・取得時の更新日時）を
+# CACHE_SNAPSHOT_PATH にpickle形式で定期的に保存し、起動時に読み込む（未設定なら無効。Cloud Runではボリュームを指定する）。
+# 読み込んだデータは確認が済むまでSheets APIを呼ばずにそのまま返し（結果は restored）、最初のリクエストで始まる
+# バックグラウンドの確認で、更新日時が保存時と同じなら有効期限を延長し、変わっていれば取り直す。
+
+CACHE_SNAPSHOT_PATH = os.environ.get('CACHE_SNAPSHOT_PATH', '')
+CACHE_SNAPSHOT_INTERVAL = int(os.environ.get('CACHE_SNAPSHOT_INTERVAL', 60))  # 保存する間隔（秒）
+SNAPSHOT_FORMAT = 1
+
+_restored_keys = set()  # スナップショットから読み込み、まだ確認していないキー
+_snapshot_lock = threading.Lock()
+_snapshot_state = {'saved_version': None, 'writer': None, 'refresher': None, 'refresh_at': 0.0, 'background': False}
+_refreshing = threading.local()  # バックグラウンドの確認中のスレッド（restoredを返さず取り直す）
+
+def save_snapshot():
+    """キャッシュをファイルに保存（前回の保存から変わっていなければ何もしない）。保存したらTrue"""
+    if not CACHE_SNAPSHOT_PATH:
+        return False
+    cache = dict(_cache)
+    if not cache or _snapshot_state['saved_version'] == (_version_counter, frozenset(cache)):
+        return False
+    snapshot = {
+        'format': SNAPSHOT_FORMAT,
+        'spreadsheet_id': SPREADSHEET_ID,
+        'saved_at': time.time(),
+        'version_counter': _version_counter,
+        'data': {key: data for key, (data, _) in cache.items()},
+        'versions': {key: _versions[key] for key in cache if key in _versions},
+        'fetched_modified': {key: _fetched_modified.get(key) for key in cache},
+    }
+    directory = os.path.dirname(os.path.abspath(CACHE_SNAPSHOT_PATH))
+    os.makedirs(directory, exist_ok=True)
+    # 書きかけのファイルを読まないよう、一時ファイルに書いてから置き換える
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, CACHE_SNAPSHOT_PATH)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    _snapshot_state['saved_version'] = (snapshot['version_counter'], frozenset(cache))
+    return True
+
+def load_snapshot():
+    """保存したキャッシュを読み込み、未確認のデータとして登録する。読み込んだキーの数を返す"""
+    global _version_counter, _change_log_floor
+    if not CACHE_SNAPSHOT_PATH or not os.path.exists(CACHE_SNAPSHOT_PATH):
+        return 0
+    try:
+        with open(CACHE_SNAPSHOT_PATH, 'rb') as f:
+            snapshot = pickle.load(f)
+    except Exception:
+        return 0  # 壊れたファイルは無視して通常どおり取得する
+    if snapshot.get('format') != SNAPSHOT_FORMAT or snapshot.get('spreadsheet_id') != SPREADSHEET_ID:
+        return 0
+
+    for key, data in snapshot['data'].items():
+        if key in _cache:
+            continue
+        # 取得日時を0にしておき、確認時は有効期限切れとして扱う
+        _cache[key] = (data, 0.0)
+        _fetched_modified[key] = snapshot['fetched_modified'].get(key)
+        _cache_sizes[key] = len(repr(data).encode('utf-8'))
+        if key in snapshot['versions']:
+            _versions[key] = snapshot['versions'][key]
+        if key in CHANGE_TRACKED_KEYS:
+            _tracked_rows[key] = data
+        _restored_keys.add(key)
+    # 以前のプロセスのバージョンからの差分は返せないため、変更ログはここから始める
+    _version_counter = max(_version_counter, snapshot['version_counter'])
+    _change_log_floor = _version_counter
+    _snapshot_state['saved_version'] = (_version_counter, frozenset(_cache))
+    return len(_restored_keys)
+
+def _refresh_restored():
+    """未確認のキーを確認する（更新日時が保存時と同じなら延長、変わっていれば取り直す）"""
+    _refreshing.active = True
+    try:
+        modified = get_spreadsheet_modified_time()
+        _modified_time.update(value=modified, checked_at=time.time())
+        for key in list(_restored_keys):
+            entry = _cache.get(key)
+            if entry is not None and modified is not None and modified == _fetched_modified.get(key):
+                _cache[key] = (entry[0], time.time())
+                _restored_keys.discard(key)
+                continue
+            try:
+                _CACHE_LOADERS[key]()  # 取得できれば _set_cache で確認済みになる
+            except Exception:
+                pass  # 次の確認で再試行し、それまでは読み込んだデータを返す
+    finally:
+        _refreshing.active = False
+
+def _schedule_refresh():
+    """未確認のキーのバックグラウンドの確認を始める（実行中・CHANGE_CHECK_INTERVAL秒以内に実行済みなら何もしない）"""
+    if not _snapshot_state['background']:
+        return
+    with _snapshot_lock:
+        refresher = _snapshot_state['refresher']
+        now = time.time()
+        if (refresher is not None and refresher.is_alive()) or now - _snapshot_state['refresh_at'] < CHANGE_CHECK_INTERVAL:
+            return
+        _snapshot_state['refresh_at'] = now
+        _snapshot_state['refresher'] = threading.Thread(target=_refresh_restored, daemon=True)
+        _snapshot_state['refresher'].start()
+
+def _write_snapshots():
+    """CACHE_SNAPSHOT_INTERVAL 秒ごとにスナップショットを保存"""
+    while True:
+        time.sleep(CACHE_SNAPSHOT_INTERVAL)
+        try:
+            save_snapshot()
+        except Exception:
+            pass
+
+def start_snapshot_threads():
+    """before_requestフック: 定期保存を開始し、未確認データの確認を許可する
+
+    gunicornのプリロード時はマスタープロセスでスレッドを作らないよう、各ワーカーの最初のリクエストで開始する
+    （フォーク後は親のスレッドが動いていないため作り直す）。
+    """
+    if not CACHE_SNAPSHOT_PATH:
+        return
+    writer = _snapshot_state['writer']
+    if writer is not None and writer.is_alive():
+        return
+    with _snapshot_lock:
+        writer = _snapshot_state['writer']
+        if writer is None or not writer.is_alive():
+            _snapshot_state['background'] = True
+            _snapshot_state['refresher'] = None
+            _snapshot_state['writer'] = threading.Thread(target=_write_snapshots, daemon=True)
+            _snapshot_state['writer'].start()
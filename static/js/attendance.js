@@ -0,0 +1,112 @@
+function selectStatus(btn, playerId, status) {
+    btn.parentElement.querySelectorAll('.status-btn').forEach(b => b.classList.remove('active'));
+    btn.classList.add('active');
+    document.getElementById('status_' + playerId).value = status;
+    updateSummary();
+}
+
+function selectGuestStatus(btn, index, status) {
+    btn.parentElement.querySelectorAll('.status-btn').forEach(b => b.classList.remove('active'));
+    btn.classList.add('active');
+    document.getElementById('guest_status_' + index).value = status;
+    updateSummary();
+}
+
+function setAllStatus(status) {
+    document.querySelectorAll('.player-row .status-btns').forEach(btns => {
+        btns.querySelectorAll('.status-btn').forEach(btn => {
+            btn.classList.remove('active');
+            if (btn.textContent.trim() === status) {
+                btn.classList.add('active');
+            }
+        });
+    });
+    document.querySelectorAll('input[id^="status_"]:not([id^="guest_status_"])').forEach(input => {
+        input.value = status;
+    });
+    updateSummary();
+}
+
+function clearAllStatus() {
+    document.querySelectorAll('.player-row .status-btn').forEach(btn => btn.classList.remove('active'));
+    document.querySelectorAll('input[id^="status_"]:not([id^="guest_status_"])').forEach(input => input.value = '');
+    updateSummary();
+}
+
+function updateSummary() {
+    let present = 0, absent = 0;
+    // Player status
+    document.querySelectorAll('input[id^="status_"]:not([id^="guest_status_"])').forEach(input => {
+        if (input.value === '出席') present++;
+        else if (input.value === '欠席') absent++;
+    });
+    // Guest status
+    document.querySelectorAll('.guest-row').forEach(row => {
+        const nameInput = row.querySelector('.guest-name-input');
+        const statusInput = row.querySelector('input[id^="guest_status_"]');
+        if (nameInput && nameInput.value.trim() && statusInput) {
+            if (statusInput.value === '出席') present++;
+            else if (statusInput.value === '欠席') absent++;
+        }
+    });
+    document.getElementById('presentCount').textContent = present;
+    document.getElementById('absentCount').textContent = absent;
+}
+
+function addGuest() {
+    const guestList = document.getElementById('guestList');
+    const html = `
+        <div class="guest-row" data-guest-index="${guestIndex}">
+            <input type="text" class="form-control form-control-sm guest-name-input"
+                   name="guest_name_${guestIndex}" placeholder="名前">
+            <div class="status-btns">
+                <button type="button" class="status-btn present active"
+                        onclick="selectGuestStatus(this, ${guestIndex}, '出席')">出席</button>
+                <button type="button" class="status-btn absent"
+                        onclick="selectGuestStatus(this, ${guestIndex}, '欠席')">欠席</button>
+                <button type="button" class="status-btn clear"
+                        onclick="selectGuestStatus(this, ${guestIndex}, '')">クリア</button>
+            </div>
+            <input type="hidden" name="guest_status_${guestIndex}" id="guest_status_${guestIndex}" value="出席">
+            <button type="button" class="btn btn-outline-danger btn-remove-guest" onclick="removeGuest(this)">
+                <i class="bi bi-x"></i>
+            </button>
+        </div>
+    `;
+    guestList.insertAdjacentHTML('beforeend', html);
+    guestIndex++;
+    document.getElementById('guestCount').value = document.querySelectorAll('.guest-row').length;
+    updateSummary();
+}
+
+function removeGuest(btn) {
+    btn.closest('.guest-row').remove();
+    document.getElementById('guestCount').value = document.querySelectorAll('.guest-row').length;
+    updateSummary();
+}
+
+// Date navigation
+document.getElementById('dateInput').addEventListener('change', function() {
+    window.location.href = '/attendance?date=' + this.value;
+});
+
+document.getElementById('prevDateBtn').addEventListener('click', function(e) {
+    e.preventDefault();
+    const dateInput = document.getElementById('dateInput');
+    const date = new Date(dateInput.value);
+    date.setDate(date.getDate() - 1);
+    dateInput.value = date.toISOString().split('T')[0];
+    window.location.href = '/attendance?date=' + dateInput.value;
+});
+
+document.getElementById('nextDateBtn').addEventListener('click', function(e) {
+    e.preventDefault();
+    const dateInput = document.getElementById('dateInput');
+    const date = new Date(dateInput.value);
+    date.setDate(date.getDate() + 1);
+    dateInput.value = date.toISOString().split('T')[0];
+    window.location.href = '/attendance?date=' + dateInput.value;
+});
+
+// Initial summary
+updateSummary();
@@ -0,0 +1,222 @@
+function toggleMobileMenu() {
+    document.getElementById('mobileMenu').classList.toggle('show');
+    document.getElementById('mobileMenuOverlay').classList.toggle('show');
+    document.body.style.overflow = document.getElementById('mobileMenu').classList.contains('show') ? 'hidden' : '';
+}
+
+// Highlight current page in bottom nav
+document.addEventListener('DOMContentLoaded', function() {
+    const path = window.location.pathname;
+    document.querySelectorAll('.bottom-nav-item').forEach(item => {
+        const href = item.getAttribute('href');
+        if (path === href || (href !== '/' && path.startsWith(href))) {
+            item.classList.add('active');
+        }
+    });
+});
+
+// Dark Mode Toggle
+function initTheme() {
+    const savedTheme = localStorage.getItem('theme');
+    const prefersDark = window.matchMedia('(prefers-color-scheme: dark)').matches;
+    const theme = savedTheme || (prefersDark ? 'dark' : 'light');
+    setTheme(theme);
+}
+
+function setTheme(theme) {
+    document.documentElement.setAttribute('data-theme', theme);
+    localStorage.setItem('theme', theme);
+    updateThemeUI(theme);
+    // Update meta theme-color for mobile browsers
+    const metaTheme = document.querySelector('meta[name="theme-color"]');
+    if (metaTheme) {
+        metaTheme.setAttribute('content', theme === 'dark' ? '#1e293b' : '#74b9ff');
+    }
+}
+
+function updateThemeUI(theme) {
+    const icon = document.getElementById('themeIcon');
+    const label = document.getElementById('themeLabel');
+    if (icon && label) {
+        if (theme === 'dark') {
+            icon.className = 'bi bi-sun-fill';
+            label.textContent = 'ライトモード';
+        } else {
+            icon.className = 'bi bi-moon-fill';
+            label.textContent = 'ダークモード';
+        }
+    }
+}
+
+function toggleTheme() {
+    const currentTheme = document.documentElement.getAttribute('data-theme') || 'light';
+    const newTheme = currentTheme === 'dark' ? 'light' : 'dark';
+    setTheme(newTheme);
+}
+
+// Initialize theme on page load
+initTheme();
+
+// Page Loading Overlay
+(function() {
+    const overlay = document.getElementById('pageLoadingOverlay');
+    if (!overlay) return;
+
+    // Show loading on page navigation
+    document.addEventListener('click', function(e) {
+        const link = e.target.closest('a');
+        if (link && link.href && !link.href.startsWith('javascript:') &&
+            !link.href.startsWith('#') && !link.target &&
+            !link.hasAttribute('download') &&
+            link.hostname === window.location.hostname) {
+            // Don't show for same page links
+            if (link.pathname === window.location.pathname && link.search === window.location.search) {
+                return;
+            }
+            overlay.classList.add('show');
+        }
+    });
+
+    // Show loading on form submit
+    document.addEventListener('submit', function(e) {
+        const form = e.target;
+        if (form.tagName === 'FORM' && !form.hasAttribute('data-no-loading')) {
+            overlay.classList.add('show');
+        }
+    });
+
+    // Hide loading when page is fully loaded (for back/forward navigation)
+    window.addEventListener('pageshow', function(e) {
+        overlay.classList.remove('show');
+    });
+
+    // Hide on initial load
+    window.addEventListener('load', function() {
+        overlay.classList.remove('show');
+    });
+})();
+
+// Service Worker Registration
+if ('serviceWorker' in navigator) {
+    window.addEventListener('load', () => {
+        navigator.serviceWorker.register('/sw.js')
+            .then(registration => {
+                console.log('SW registered:', registration.scope);
+            })
+            .catch(error => {
+                console.log('SW registration failed:', error);
+            });
+    });
+
+    // 表示中の画面より新しいデータをService Workerが取得した場合に通知
+    navigator.serviceWorker.addEventListener('message', event => {
+        if (event.data && event.data.type === 'page-updated' && event.data.url === location.href) {
+            showToast('新しいデータがあります（下に引いて更新）', 'info', 6000);
+        }
+    });
+}
+
+// Toast Notification System
+function showToast(message, type = 'info', duration = 4000) {
+    const container = document.getElementById('toastContainer');
+    const toast = document.createElement('div');
+    toast.className = `toast-item ${type}`;
+
+    const icons = {
+        success: 'bi-check-circle-fill',
+        danger: 'bi-exclamation-circle-fill',
+        error: 'bi-exclamation-circle-fill',
+        warning: 'bi-exclamation-triangle-fill',
+        info: 'bi-info-circle-fill'
+    };
+
+    toast.innerHTML = `
+        <i class="bi ${icons[type] || icons.info}"></i>
+        <span>${message}</span>
+        <button class="toast-close" onclick="closeToast(this)">
+            <i class="bi bi-x"></i>
+        </button>
+    `;
+
+    container.appendChild(toast);
+
+    // Auto dismiss
+    setTimeout(() => {
+        if (toast.parentElement) {
+            toast.style.animation = 'toastSlideOut 0.3s ease forwards';
+            setTimeout(() => toast.remove(), 300);
+        }
+    }, duration);
+}
+
+function closeToast(btn) {
+    const toast = btn.closest('.toast-item');
+    toast.style.animation = 'toastSlideOut 0.3s ease forwards';
+    setTimeout(() => toast.remove(), 300);
+}
+
+// Pull to Refresh
+(function() {
+    let startY = 0;
+    let pulling = false;
+    const threshold = 80;
+    const indicator = document.getElementById('pullIndicator');
+    const mainContent = document.getElementById('mainContent');
+
+    if (!indicator || !mainContent) return;
+
+    // Only enable on mobile
+    if (window.innerWidth >= 992) return;
+
+    mainContent.addEventListener('touchstart', function(e) {
+        if (window.scrollY === 0) {
+            startY = e.touches[0].clientY;
+            pulling = true;
+        }
+    }, { passive: true });
+
+    mainContent.addEventListener('touchmove', function(e) {
+        if (!pulling) return;
+
+        const currentY = e.touches[0].clientY;
+        const diff = currentY - startY;
+
+        if (diff > 0 && window.scrollY === 0) {
+            const pullDistance = Math.min(diff, threshold * 1.5);
+            indicator.classList.add('pulling');
+            indicator.querySelector('.pull-text').textContent =
+                diff > threshold ? '離して更新' : '下に引いて更新';
+
+            if (diff > threshold) {
+                indicator.classList.add('ready');
+            } else {
+                indicator.classList.remove('ready');
+            }
+        }
+    }, { passive: true });
+
+    mainContent.addEventListener('touchend', function(e) {
+        if (!pulling) return;
+
+        const endY = e.changedTouches[0].clientY;
+        const diff = endY - startY;
+
+        if (diff > threshold && window.scrollY === 0) {
+            // Trigger refresh
+            indicator.classList.remove('pulling', 'ready');
+            indicator.classList.add('refreshing');
+            indicator.querySelector('.arrow').style.display = 'none';
+            indicator.querySelector('.spinner').style.display = 'block';
+            indicator.querySelector('.pull-text').textContent = '更新中...';
+
+            setTimeout(() => {
+                location.reload();
+            }, 500);
+        } else {
+            indicator.classList.remove('pulling', 'ready');
+        }
+
+        pulling = false;
+        startY = 0;
+    }, { passive: true });
+})();
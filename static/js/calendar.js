@@ -0,0 +1,113 @@
+const typeColors = {
+    'practice': '#10b981',
+    'race': '#ef4444',
+    'camp': '#f59e0b',
+    'rest': '#6b7280',
+    'other': '#8b5cf6'
+};
+
+// メニュープレビューを生成
+function renderMenuPreview(log) {
+    if (!log.menu_data) return '';
+
+    let menuData;
+    try {
+        menuData = typeof log.menu_data === 'string' ? JSON.parse(log.menu_data) : log.menu_data;
+    } catch (e) {
+        return '';
+    }
+
+    if (!menuData.menus || menuData.menus.length === 0) {
+        return '';
+    }
+
+    let html = '<div class="menu-preview">';
+    html += '<div class="menu-preview-title"><i class="bi bi-list-check"></i> 練習メニュー</div>';
+
+    menuData.menus.forEach(menu => {
+        const typeLabel = menu.type === 'pace_run' ? 'ペース走' :
+                         menu.type === 'interval' ? 'インターバル' : 'TT';
+
+        let detail = '';
+        if (menu.type === 'pace_run') {
+            if (menu.total) detail = `total ${menu.total}`;
+        } else if (menu.type === 'interval') {
+            if (menu.pace) detail = `設定 ${menu.pace}`;
+            if (menu.rest) detail += detail ? ` / ${menu.rest}` : menu.rest;
+        } else if (menu.type === 'tt') {
+            if (menu.results && menu.results.length > 0) {
+                detail = `${menu.results.length}名参加`;
+            }
+        }
+
+        let groupInfo = '';
+        if (menu.group) {
+            groupInfo = `${menu.group}グループ`;
+            if (menu.members && menu.members.length > 0) {
+                groupInfo += ': ' + menu.members.map(m => m.name).slice(0, 3).join(', ');
+                if (menu.members.length > 3) groupInfo += '...';
+            }
+        }
+
+        html += `<div class="menu-preview-item">
+            <div class="menu-preview-type">${typeLabel}</div>
+            <div class="menu-preview-name">${menu.name}</div>
+            ${detail ? `<div class="menu-preview-detail">${detail}</div>` : ''}
+            ${groupInfo ? `<div class="menu-preview-group"><i class="bi bi-people-fill"></i> ${groupInfo}</div>` : ''}
+        </div>`;
+    });
+
+    html += '</div>';
+    return html;
+}
+
+function openDayMenu(dateStr) {
+    const modal = new bootstrap.Modal(document.getElementById('dayMenuModal'));
+    const date = new Date(dateStr);
+    const weekdays = ['日', '月', '火', '水', '木', '金', '土'];
+    const dateLabel = `${date.getFullYear()}年${date.getMonth()+1}月${date.getDate()}日(${weekdays[date.getDay()]})`;
+
+    document.getElementById('dayMenuDate').textContent = dateLabel;
+    document.getElementById('addEventBtn').href = `/event/add?date=${dateStr}`;
+    document.getElementById('addLogBtn').href = `/practice_log/add?date=${dateStr}`;
+    document.getElementById('attendanceBtn').href = `/attendance?date=${dateStr}`;
+
+    const eventsDiv = document.getElementById('dayMenuEvents');
+    const events = eventsData[dateStr] || [];
+    const log = logsData[dateStr];
+
+    let html = '';
+    if (events.length > 0) {
+        events.forEach(e => {
+            const typeColor = typeColors[e.event_type?.toLowerCase()] || typeColors.other;
+            html += `<div class="event-list-item">
+                <div>
+                    <span class="event-list-title">${e.title}</span>
+                    <span class="event-type-badge" style="background: ${typeColor}">${e.event_type || 'その他'}</span>
+                </div>
+                <a href="/event/${e.event_id}/edit" class="btn btn-sm btn-outline-secondary">編集</a>
+            </div>`;
+        });
+    }
+    if (log) {
+        html += `<div class="event-list-item">
+            <div>
+                <span class="event-list-title">${log.title}</span>
+                <span class="event-type-badge" style="background: #3b82f6">練習日誌</span>
+            </div>
+        </div>`;
+
+        // 練習日誌を直接開くボタン
+        html += `<div class="d-grid gap-2 mt-2 mb-2">
+            <a href="/practice_log/${log.log_id}" class="btn btn-primary">
+                <i class="bi bi-journal-text"></i> 練習日誌を開く
+            </a>
+        </div>`;
+    }
+    if (!events.length && !log) {
+        html = '<p class="text-muted text-center mb-0">この日の予定はありません</p>';
+    }
+    eventsDiv.innerHTML = html;
+
+    modal.show();
+}
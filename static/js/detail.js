@@ -0,0 +1,18 @@
+// タブ切り替え処理
+document.querySelectorAll('.record-tab').forEach(tab => {
+    tab.addEventListener('click', function() {
+        const type = this.dataset.type;
+
+        // タブのアクティブ状態を切り替え
+        document.querySelectorAll('.record-tab').forEach(t => t.classList.remove('active'));
+        this.classList.add('active');
+
+        // パネルの表示を切り替え
+        document.querySelectorAll('.record-panel').forEach(panel => {
+            panel.classList.remove('active');
+            if (panel.dataset.panel === type) {
+                panel.classList.add('active');
+            }
+        });
+    });
+});
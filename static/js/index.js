@@ -0,0 +1,35 @@
+document.getElementById('searchInput').addEventListener('input', filterPlayers);
+document.getElementById('categoryFilter').addEventListener('change', filterPlayers);
+
+function filterPlayers() {
+    const searchText = document.getElementById('searchInput').value.toLowerCase();
+    const categoryFilter = document.getElementById('categoryFilter').value;
+    const items = document.querySelectorAll('.player-item');
+    let visibleCount = 0;
+
+    items.forEach(item => {
+        const name = item.dataset.name.toLowerCase();
+        const category = item.dataset.category || '';
+        const status = item.dataset.status; // 'active' or 'inactive'
+        const matchName = name.includes(searchText);
+
+        let matchCategory = false;
+        if (categoryFilter === '---') {
+            // 「---」を選択した場合は非現役選手のみ表示
+            matchCategory = (status === 'inactive');
+        } else if (categoryFilter === '') {
+            // 区分未選択の場合は現役選手のみ表示
+            matchCategory = (status === 'active');
+        } else {
+            // 特定カテゴリを選択した場合は現役選手のみ
+            matchCategory = (status === 'active') && (category === categoryFilter);
+        }
+
+        const shouldShow = matchName && matchCategory;
+        item.style.display = shouldShow ? '' : 'none';
+        if (shouldShow) visibleCount++;
+    });
+
+    // 表示件数を更新
+    document.getElementById('playerCount').textContent = visibleCount + '名';
+}
@@ -0,0 +1,335 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // タブ切り替え
+    const tabs = document.querySelectorAll('.analysis-tab');
+    const paceTab = document.getElementById('paceTab');
+    const teamTab = document.getElementById('teamTab');
+    const sectionTab = document.getElementById('sectionTab');
+
+    tabs.forEach(tab => {
+        tab.addEventListener('click', function() {
+            tabs.forEach(t => t.classList.remove('active'));
+            this.classList.add('active');
+
+            const tabName = this.getAttribute('data-tab');
+            paceTab.classList.remove('active');
+            teamTab.classList.remove('active');
+            sectionTab.classList.remove('active');
+
+            if (tabName === 'pace') {
+                paceTab.classList.add('active');
+            } else if (tabName === 'team') {
+                teamTab.classList.add('active');
+                fetchTeamData();
+            } else if (tabName === 'section') {
+                sectionTab.classList.add('active');
+                fetchSectionData();
+            }
+        });
+    });
+
+    // ========== ペース分析 ==========
+    const legSelect = document.getElementById('legSelect');
+    const positionSelect = document.getElementById('positionSelect');
+    const paceLoading = document.getElementById('paceLoading');
+    const paceError = document.getElementById('paceError');
+    const paceResults = document.getElementById('paceResults');
+    const avgPaceInfo = document.getElementById('avgPaceInfo');
+    const avgPaceValue = document.getElementById('avgPaceValue');
+
+    legSelect.addEventListener('change', fetchPaceData);
+    positionSelect.addEventListener('change', fetchPaceData);
+
+    fetchPaceData();
+
+    function fetchPaceData() {
+        const leg = legSelect.value;
+        const position = positionSelect.value;
+
+        paceLoading.style.display = 'block';
+        paceError.style.display = 'none';
+        paceResults.style.display = 'none';
+        avgPaceInfo.style.display = 'none';
+
+        fetch(`/api/pace_analysis?leg=${encodeURIComponent(leg)}&position=${encodeURIComponent(position)}`)
+            .then(response => response.json())
+            .then(data => {
+                if (data.error) {
+                    showPaceError(data.error);
+                } else {
+                    showPaceResults(data.data);
+                }
+            })
+            .catch(error => {
+                showPaceError('データの取得に失敗しました: ' + error.message);
+            });
+    }
+
+    function showPaceError(message) {
+        paceLoading.style.display = 'none';
+        paceError.style.display = 'block';
+        paceError.textContent = message;
+        paceResults.style.display = 'none';
+        avgPaceInfo.style.display = 'none';
+    }
+
+    function showPaceResults(data) {
+        paceLoading.style.display = 'none';
+        paceError.style.display = 'none';
+
+        if (!data || data.length === 0) {
+            showPaceError('該当するデータがありません');
+            return;
+        }
+
+        // 最速タイムを探す
+        let fastestAvgTimeSeconds = Infinity;
+        let fastestIndex = -1;
+        data.forEach((item, index) => {
+            const seconds = convertTimeToSeconds(item.avg_time);
+            if (seconds > 0 && seconds < fastestAvgTimeSeconds) {
+                fastestAvgTimeSeconds = seconds;
+                fastestIndex = index;
+            }
+        });
+
+        // 平均ペース計算
+        let totalSeconds = 0;
+        let validCount = 0;
+        data.forEach(item => {
+            const seconds = convertTimeToSeconds(item.avg_time);
+            if (seconds > 0) {
+                totalSeconds += seconds;
+                validCount++;
+            }
+        });
+
+        if (validCount > 0) {
+            const avgSeconds = totalSeconds / validCount;
+            const avgMinutes = Math.floor(avgSeconds / 60);
+            const avgSecs = Math.round(avgSeconds % 60);
+            avgPaceValue.textContent = avgMinutes + ':' + (avgSecs < 10 ? '0' : '') + avgSecs;
+            avgPaceInfo.style.display = 'block';
+        } else {
+            avgPaceInfo.style.display = 'none';
+        }
+
+        // カード生成
+        paceResults.innerHTML = '';
+        data.forEach((item, index) => {
+            const card = document.createElement('div');
+            const teamClass = 'team-' + item.team.replace(/\s+/g, '');
+            const isFastest = index === fastestIndex;
+            card.className = 'result-card' + (isFastest ? ' fastest' : '');
+            card.innerHTML = `
+                <div class="result-card-header">
+                    <span class="result-card-team ${teamClass}">${item.team}</span>
+                    <span class="result-card-edition">第${item.edition}回</span>
+                </div>
+                <div class="result-card-main">
+                    <span class="result-card-name">${item.name}</span>
+                    <span class="result-card-time">${item.time}</span>
+                </div>
+                <div class="result-card-details">
+                    <span>${item.year_of_birth}生</span>
+                    <span>${item.affiliation}</span>
+                    <span>${item.rank}位</span>
+                    <span>${item.distance}km</span>
+                    <span class="${getTemperatureClass(item.temperature)}" style="padding:1px 4px;border-radius:3px;">${item.temperature}℃</span>
+                    <span class="result-card-avg">${item.avg_time}/km</span>
+                </div>
+            `;
+            paceResults.appendChild(card);
+        });
+
+        paceResults.style.display = 'flex';
+    }
+
+    // ========== チーム別区間一覧 ==========
+    const teamSelect = document.getElementById('teamSelect');
+    const editionSelect = document.getElementById('editionSelect');
+    const teamLoading = document.getElementById('teamLoading');
+    const teamError = document.getElementById('teamError');
+    const teamResults = document.getElementById('teamResults');
+
+    teamSelect.addEventListener('change', fetchTeamData);
+    editionSelect.addEventListener('change', fetchTeamData);
+
+    function fetchTeamData() {
+        const team = teamSelect.value;
+        const edition = editionSelect.value;
+
+        teamLoading.style.display = 'block';
+        teamError.style.display = 'none';
+        teamResults.style.display = 'none';
+
+        fetch(`/api/team_sections?team=${encodeURIComponent(team)}&edition=${encodeURIComponent(edition)}`)
+            .then(response => response.json())
+            .then(data => {
+                if (data.error) {
+                    showTeamError(data.error);
+                } else {
+                    showTeamResults(data.data);
+                }
+            })
+            .catch(error => {
+                showTeamError('データの取得に失敗しました: ' + error.message);
+            });
+    }
+
+    function showTeamError(message) {
+        teamLoading.style.display = 'none';
+        teamError.style.display = 'block';
+        teamError.textContent = message;
+        teamResults.style.display = 'none';
+    }
+
+    function showTeamResults(data) {
+        teamLoading.style.display = 'none';
+        teamError.style.display = 'none';
+
+        if (!data || data.length === 0) {
+            showTeamError('該当するデータがありません');
+            return;
+        }
+
+        // カード生成
+        teamResults.innerHTML = '';
+        data.forEach(item => {
+            const card = document.createElement('div');
+            card.className = 'result-card';
+            // 区間番号を抽出して色分け
+            const sectionNum = item.section.match(/第(\d+)区/);
+            const sectionColor = sectionNum ? `hsl(${(parseInt(sectionNum[1]) * 12) % 360}, 60%, 50%)` : '#667eea';
+            card.style.borderLeftColor = sectionColor;
+            card.innerHTML = `
+                <div class="result-card-header">
+                    <span class="result-card-edition" style="font-size:0.85rem;color:var(--text-color);font-weight:600;">${item.section}</span>
+                    <span class="result-card-edition">${item.rank}位</span>
+                </div>
+                <div class="result-card-main">
+                    <span class="result-card-name">${item.name}</span>
+                    <span class="result-card-time">${item.time}</span>
+                </div>
+                <div class="result-card-details">
+                    <span>${item.year_of_birth}生</span>
+                    <span>${item.affiliation}</span>
+                </div>
+            `;
+            teamResults.appendChild(card);
+        });
+
+        teamResults.style.display = 'flex';
+    }
+
+    // ========== チーム区間記録推移 ==========
+    const sectionTeamSelect = document.getElementById('sectionTeamSelect');
+    const sectionLegSelect = document.getElementById('sectionLegSelect');
+    const sectionLoading = document.getElementById('sectionLoading');
+    const sectionError = document.getElementById('sectionError');
+    const sectionResults = document.getElementById('sectionResults');
+
+    sectionTeamSelect.addEventListener('change', fetchSectionData);
+    sectionLegSelect.addEventListener('change', fetchSectionData);
+
+    function fetchSectionData() {
+        const team = sectionTeamSelect.value;
+        const leg = sectionLegSelect.value;
+
+        sectionLoading.style.display = 'block';
+        sectionError.style.display = 'none';
+        sectionResults.style.display = 'none';
+
+        fetch(`/api/team_section_all_editions?team=${encodeURIComponent(team)}&leg=${encodeURIComponent(leg)}`)
+            .then(response => response.json())
+            .then(data => {
+                if (data.error) {
+                    showSectionError(data.error);
+                } else {
+                    showSectionResults(data.data);
+                }
+            })
+            .catch(error => {
+                showSectionError('データの取得に失敗しました: ' + error.message);
+            });
+    }
+
+    function showSectionError(message) {
+        sectionLoading.style.display = 'none';
+        sectionError.style.display = 'block';
+        sectionError.textContent = message;
+        sectionResults.style.display = 'none';
+    }
+
+    function showSectionResults(data) {
+        sectionLoading.style.display = 'none';
+        sectionError.style.display = 'none';
+
+        if (!data || data.length === 0) {
+            showSectionError('該当するデータがありません');
+            return;
+        }
+
+        // 最速タイムを探す
+        let fastestAvgTimeSeconds = Infinity;
+        let fastestIndex = -1;
+        data.forEach((item, index) => {
+            const seconds = convertTimeToSeconds(item.avg_time);
+            if (seconds > 0 && seconds < fastestAvgTimeSeconds) {
+                fastestAvgTimeSeconds = seconds;
+                fastestIndex = index;
+            }
+        });
+
+        // カード生成
+        sectionResults.innerHTML = '';
+        data.forEach((item, index) => {
+            const card = document.createElement('div');
+            const isFastest = index === fastestIndex;
+            card.className = 'result-card' + (isFastest ? ' fastest' : '');
+            card.innerHTML = `
+                <div class="result-card-header">
+                    <span class="result-card-edition" style="font-size:0.9rem;color:var(--text-color);font-weight:600;">第${item.edition}回</span>
+                    <span class="result-card-edition">${item.rank}位</span>
+                </div>
+                <div class="result-card-main">
+                    <span class="result-card-name">${item.name}</span>
+                    <span class="result-card-time">${item.time}</span>
+                </div>
+                <div class="result-card-details">
+                    <span>${item.year_of_birth}生</span>
+                    <span>${item.affiliation}</span>
+                    <span>${item.distance}km</span>
+                    <span class="${getTemperatureClass(item.temperature)}" style="padding:1px 4px;border-radius:3px;">${item.temperature}℃</span>
+                    <span class="result-card-avg">${item.avg_time}/km</span>
+                </div>
+            `;
+            sectionResults.appendChild(card);
+        });
+
+        sectionResults.style.display = 'flex';
+    }
+
+    // ========== ユーティリティ関数 ==========
+    function convertTimeToSeconds(timeStr) {
+        if (!timeStr || timeStr === 'N/A') return 0;
+        const parts = timeStr.split(':').map(Number);
+        if (parts.length === 3) {
+            return parts[0] * 3600 + parts[1] * 60 + parts[2];
+        } else if (parts.length === 2) {
+            return parts[0] * 60 + parts[1];
+        }
+        return 0;
+    }
+
+    function getTemperatureClass(temp) {
+        const t = parseFloat(temp);
+        if (isNaN(t)) return '';
+        if (t <= 5) return 'temp-very-cold';
+        if (t <= 10) return 'temp-cold';
+        if (t <= 15) return 'temp-cool';
+        if (t <= 20) return 'temp-warm';
+        if (t <= 25) return 'temp-hot';
+        if (t <= 30) return 'temp-very-hot';
+        return 'temp-extreme';
+    }
+});
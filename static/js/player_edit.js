@@ -0,0 +1,12 @@
+// 写真URLプレビュー
+const photoUrlInput = document.getElementById('photoUrlInput');
+const photoPreview = document.getElementById('photoPreview');
+
+photoUrlInput.addEventListener('input', function() {
+    const url = this.value.trim();
+    if (url) {
+        photoPreview.innerHTML = `<img src="${url}" alt="プロフィール写真" onerror="this.parentElement.innerHTML='<i class=\\'bi bi-person-fill\\'></i>'">`;
+    } else {
+        photoPreview.innerHTML = '<i class="bi bi-person-fill"></i>';
+    }
+});
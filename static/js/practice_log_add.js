@@ -0,0 +1,955 @@
+// メニューデータ
+let menus = [];
+let guestIndex = 0;
+let ttResultIndex = 0;
+let currentGroup = '';
+
+// グループ選択
+function selectGroup(group) {
+    currentGroup = group;
+    document.querySelectorAll('.group-btn').forEach(btn => btn.classList.remove('active'));
+    event.target.classList.add('active');
+
+    const memberSelector = document.getElementById('memberSelector');
+    if (group) {
+        memberSelector.classList.add('active');
+        updateMemberCheckboxes();
+    } else {
+        memberSelector.classList.remove('active');
+    }
+}
+
+// 出席者からメンバー選択肢を更新
+function updateMemberCheckboxes() {
+    const container = document.getElementById('memberCheckboxes');
+    const noAttendeeMsg = document.getElementById('noAttendeeMsg');
+    const attendees = getAttendees();
+
+    if (attendees.length === 0) {
+        container.innerHTML = '';
+        noAttendeeMsg.style.display = 'block';
+        return;
+    }
+
+    noAttendeeMsg.style.display = 'none';
+    let html = '';
+    attendees.forEach(attendee => {
+        html += `
+            <label class="member-check" onclick="toggleMember(this)">
+                <input type="checkbox" value="${attendee.id}" data-name="${attendee.name}">
+                ${attendee.name}
+            </label>
+        `;
+    });
+    container.innerHTML = html;
+}
+
+// 出席者を取得
+function getAttendees() {
+    const attendees = [];
+    // 選手の出席者
+    document.querySelectorAll('.player-row').forEach(row => {
+        const nameEl = row.querySelector('.player-name');
+        const statusInput = row.querySelector('input[id^="status_"]');
+        if (nameEl && statusInput && statusInput.value === '出席') {
+            const id = statusInput.id.replace('status_', '');
+            attendees.push({ id: id, name: nameEl.textContent.trim() });
+        }
+    });
+    // ゲストの出席者
+    document.querySelectorAll('.guest-row').forEach(row => {
+        const nameInput = row.querySelector('.guest-name-input');
+        const statusInput = row.querySelector('input[id^="guest_status_"]');
+        if (nameInput && nameInput.value.trim() && statusInput && statusInput.value === '出席') {
+            const guestId = 'GUEST_' + row.dataset.guestIndex;
+            attendees.push({ id: guestId, name: nameInput.value.trim() });
+        }
+    });
+    return attendees;
+}
+
+function toggleMember(label) {
+    const checkbox = label.querySelector('input');
+    checkbox.checked = !checkbox.checked;
+    if (checkbox.checked) {
+        label.classList.add('selected');
+    } else {
+        label.classList.remove('selected');
+    }
+}
+
+function getSelectedMembers() {
+    const members = [];
+    document.querySelectorAll('.member-check input:checked').forEach(input => {
+        members.push({
+            id: input.value,
+            name: input.dataset.name
+        });
+    });
+    return members;
+}
+
+function resetGroupSelection() {
+    currentGroup = '';
+    document.querySelectorAll('.group-btn').forEach(btn => btn.classList.remove('active'));
+    document.querySelectorAll('.group-btn')[3].classList.add('active'); // 「なし」を選択（4番目）
+    document.getElementById('memberSelector').classList.remove('active');
+}
+
+// メニュータイプ切り替え
+function switchMenuType(type) {
+    document.querySelectorAll('.menu-type-tab').forEach(t => t.classList.remove('active'));
+    document.querySelectorAll('.menu-form').forEach(f => f.classList.remove('active'));
+    event.target.classList.add('active');
+    if (type === 'pace') document.getElementById('menuFormPace').classList.add('active');
+    else if (type === 'interval') document.getElementById('menuFormInterval').classList.add('active');
+    else if (type === 'tt') document.getElementById('menuFormTT').classList.add('active');
+}
+
+// タイム自動フォーマット（335→3:35、70→70）
+function formatTimeInput(input) {
+    let val = input.value.replace(/[^0-9]/g, '');
+    if (val.length >= 3) {
+        // 3桁以上なら分:秒に変換
+        const sec = val.slice(-2);
+        const min = val.slice(0, -2);
+        input.value = min + ':' + sec;
+    }
+    // 入力済みスタイル
+    if (input.value.trim()) {
+        input.classList.add('filled');
+    } else {
+        input.classList.remove('filled');
+    }
+}
+
+// 次の入力欄にフォーカス移動
+function moveToNextInput(currentInput, e) {
+    if (e.key === 'Enter') {
+        e.preventDefault();
+        const allInputs = Array.from(document.querySelectorAll('.time-input, .lap-input'));
+        const idx = allInputs.indexOf(currentInput);
+        if (idx >= 0 && idx < allInputs.length - 1) {
+            allInputs[idx + 1].focus();
+            allInputs[idx + 1].select();
+        }
+    }
+}
+
+// ============ 数字キーパッド ============
+let numpadTarget = null;
+let numpadInputs = [];
+let numpadCurrentIndex = 0;
+let numpadRawValue = '';
+
+function openNumpad(input, label) {
+    numpadTarget = input;
+    numpadInputs = Array.from(document.querySelectorAll('.time-input, .lap-input'));
+    numpadCurrentIndex = numpadInputs.indexOf(input);
+    numpadRawValue = input.value.replace(/[^0-9]/g, '');
+
+    document.getElementById('numpadLabel').textContent = label || '';
+    updateNumpadDisplay();
+    document.getElementById('numpadOverlay').classList.add('active');
+    document.body.style.overflow = 'hidden';
+}
+
+function closeNumpad() {
+    document.getElementById('numpadOverlay').classList.remove('active');
+    document.body.style.overflow = '';
+    if (numpadTarget) {
+        formatTimeInput(numpadTarget);
+        calculatePaceTotal();
+    }
+    numpadTarget = null;
+}
+
+function updateNumpadDisplay() {
+    let display = '--:--';
+    if (numpadRawValue.length > 0) {
+        if (numpadRawValue.length <= 2) {
+            display = numpadRawValue;
+        } else {
+            const sec = numpadRawValue.slice(-2);
+            const min = numpadRawValue.slice(0, -2);
+            display = min + ':' + sec;
+        }
+    }
+    document.getElementById('numpadValue').textContent = display;
+
+    if (numpadTarget) {
+        numpadTarget.value = display === '--:--' ? '' : display;
+    }
+}
+
+function numpadInput(digit) {
+    if (numpadRawValue.length < 5) {
+        numpadRawValue += digit;
+        updateNumpadDisplay();
+    }
+}
+
+function numpadClear() {
+    numpadRawValue = '';
+    updateNumpadDisplay();
+}
+
+function numpadNext() {
+    if (numpadTarget) {
+        formatTimeInput(numpadTarget);
+        numpadTarget.classList.add('filled');
+    }
+
+    if (numpadCurrentIndex < numpadInputs.length - 1) {
+        numpadCurrentIndex++;
+        numpadTarget = numpadInputs[numpadCurrentIndex];
+        numpadRawValue = numpadTarget.value.replace(/[^0-9]/g, '');
+
+        // ラベルを更新
+        const labelEl = numpadTarget.closest('.lap-row')?.querySelector('.lap-label') ||
+                        numpadTarget.closest('.time-cell')?.querySelector('.time-cell-label');
+        document.getElementById('numpadLabel').textContent = labelEl?.textContent || '';
+        updateNumpadDisplay();
+        numpadTarget.focus();
+    } else {
+        closeNumpad();
+    }
+    calculatePaceTotal();
+}
+
+function numpadConfirm() {
+    closeNumpad();
+}
+
+// ペース走ラップ生成
+function generatePaceLaps() {
+    const total = parseInt(document.getElementById('paceDistance').value) || 0;
+    const interval = parseInt(document.getElementById('paceLapInterval').value) || 1000;
+    const container = document.getElementById('paceLapsContainer');
+    container.innerHTML = '';
+
+    if (total <= 0) return;
+
+    let html = '<div class="time-hint">💡 タップでキーパッド表示 / 直接入力も可</div>';
+    for (let d = interval; d <= total; d += interval) {
+        html += `
+            <div class="lap-row">
+                <span class="lap-label">${d}m</span>
+                <input type="text" class="lap-input time-input" id="paceLap_${d}"
+                       inputmode="numeric" placeholder="3:35" readonly
+                       onclick="openNumpad(this, '${d}m')"
+                       onkeydown="moveToNextInput(this, event)">
+            </div>
+        `;
+    }
+    container.innerHTML = html;
+
+    // 最初の入力欄でキーパッド起動
+    setTimeout(() => {
+        const firstInput = container.querySelector('.lap-input');
+        if (firstInput) {
+            const d = firstInput.id.replace('paceLap_', '');
+            openNumpad(firstInput, d + 'm');
+        }
+    }, 100);
+}
+
+// ペース走トータル計算
+function calculatePaceTotal() {
+    let totalSeconds = 0;
+    document.querySelectorAll('#paceLapsContainer input').forEach(input => {
+        const time = input.value.trim();
+        if (time) {
+            const parts = time.split(':');
+            if (parts.length === 2) {
+                totalSeconds += parseInt(parts[0]) * 60 + parseInt(parts[1]);
+            }
+        }
+    });
+    if (totalSeconds > 0) {
+        const min = Math.floor(totalSeconds / 60);
+        const sec = totalSeconds % 60;
+        document.getElementById('paceTotalTime').value = `${min}:${sec.toString().padStart(2, '0')}`;
+    }
+}
+
+// ペース走追加
+function addPaceMenu() {
+    const distance = document.getElementById('paceDistance').value;
+    const totalTime = document.getElementById('paceTotalTime').value;
+
+    if (!distance) { alert('距離を入力してください'); return; }
+
+    const laps = [];
+    document.querySelectorAll('#paceLapsContainer .lap-input').forEach(input => {
+        const d = input.id.replace('paceLap_', '');
+        if (input.value.trim()) {
+            laps.push({ distance: d + 'm', time: input.value.trim() });
+        }
+    });
+
+    const menu = {
+        type: 'pace_run',
+        name: `${distance}mペース走`,
+        distance: distance + 'm',
+        laps: laps,
+        total: totalTime,
+        group: currentGroup,
+        members: getSelectedMembers()
+    };
+    menus.push(menu);
+    renderAddedMenus();
+
+    // フォームリセット
+    document.getElementById('paceDistance').value = '';
+    document.getElementById('paceLapsContainer').innerHTML = '';
+    document.getElementById('paceTotalTime').value = '';
+    resetGroupSelection();
+}
+
+// インターバルタイム入力欄生成
+function generateIntervalTimes() {
+    const reps = parseInt(document.getElementById('intervalReps').value) || 0;
+    const distance = parseInt(document.getElementById('intervalDistance').value) || 0;
+    const container = document.getElementById('intervalTimesContainer');
+    container.innerHTML = '';
+
+    if (reps <= 0 || reps > 30) return;
+
+    // 距離に応じたプレースホルダー
+    let placeholder = '70';
+    if (distance >= 1000) placeholder = '3:20';
+    else if (distance >= 600) placeholder = '1:50';
+    else if (distance >= 300) placeholder = '50';
+
+    let html = '<label class="form-label" style="font-size:12px;">各本タイム</label>';
+    html += '<div class="time-hint">💡 タップでキーパッド表示 / 直接入力も可</div>';
+    html += '<div class="time-grid">';
+    for (let i = 1; i <= reps; i++) {
+        html += `
+            <div class="time-cell">
+                <span class="time-cell-label">${i}本目</span>
+                <input type="text" class="time-input" id="intervalTime_${i}"
+                       inputmode="numeric" placeholder="${placeholder}" readonly
+                       onclick="openNumpad(this, '${i}本目')"
+                       onkeydown="moveToNextInput(this, event)">
+            </div>
+        `;
+    }
+    html += '</div>';
+    container.innerHTML = html;
+
+    // 最初の入力欄でキーパッド起動
+    setTimeout(() => {
+        const firstInput = container.querySelector('.time-input');
+        if (firstInput) openNumpad(firstInput, '1本目');
+    }, 100);
+}
+
+// インターバル追加
+function addIntervalMenu() {
+    const distance = document.getElementById('intervalDistance').value;
+    const reps = document.getElementById('intervalReps').value;
+    const pace = document.getElementById('intervalPace').value;
+    const rest = document.getElementById('intervalRest').value;
+
+    if (!distance || !reps) { alert('距離と本数を入力してください'); return; }
+
+    // 各本のタイムを収集
+    const times = [];
+    for (let i = 1; i <= parseInt(reps); i++) {
+        const timeInput = document.getElementById('intervalTime_' + i);
+        if (timeInput && timeInput.value.trim()) {
+            times.push({ rep: i, time: timeInput.value.trim() });
+        }
+    }
+
+    const menu = {
+        type: 'interval',
+        name: `${distance}m×${reps}`,
+        distance: distance + 'm',
+        reps: parseInt(reps),
+        pace: pace,
+        rest: rest,
+        times: times,
+        group: currentGroup,
+        members: getSelectedMembers()
+    };
+    menus.push(menu);
+    renderAddedMenus();
+
+    // フォームリセット
+    document.getElementById('intervalDistance').value = '';
+    document.getElementById('intervalReps').value = '';
+    document.getElementById('intervalPace').value = '';
+    document.getElementById('intervalRest').value = '';
+    document.getElementById('intervalTimesContainer').innerHTML = '';
+    resetGroupSelection();
+}
+
+// TT結果行追加
+function addTTResult() {
+    const container = document.getElementById('ttResultsContainer');
+    const html = `
+        <div class="result-row" id="ttResult_${ttResultIndex}">
+            <input type="number" class="form-control result-rank" placeholder="#" id="ttRank_${ttResultIndex}">
+            <input type="text" class="form-control result-player" placeholder="選手名" id="ttPlayer_${ttResultIndex}">
+            <input type="text" class="form-control result-time" placeholder="2:52.7" id="ttTime_${ttResultIndex}">
+            <button type="button" class="btn btn-outline-danger btn-sm" onclick="removeTTResult(${ttResultIndex})">
+                <i class="bi bi-x"></i>
+            </button>
+        </div>
+    `;
+    container.insertAdjacentHTML('beforeend', html);
+    ttResultIndex++;
+}
+
+function removeTTResult(idx) {
+    document.getElementById('ttResult_' + idx)?.remove();
+}
+
+// TT追加
+function addTTMenu() {
+    const name = document.getElementById('ttName').value || 'TT';
+    const distance = document.getElementById('ttDistance').value;
+
+    const results = [];
+    document.querySelectorAll('#ttResultsContainer .result-row').forEach(row => {
+        const idx = row.id.replace('ttResult_', '');
+        const rank = document.getElementById('ttRank_' + idx)?.value;
+        const player = document.getElementById('ttPlayer_' + idx)?.value;
+        const time = document.getElementById('ttTime_' + idx)?.value;
+        if (player && time) {
+            results.push({ rank: parseInt(rank) || 0, player: player, time: time });
+        }
+    });
+
+    const menu = {
+        type: 'tt',
+        name: name,
+        distance: distance ? distance + 'm' : '',
+        results: results,
+        group: currentGroup,
+        members: getSelectedMembers()
+    };
+    menus.push(menu);
+    renderAddedMenus();
+
+    // フォームリセット
+    document.getElementById('ttName').value = '';
+    document.getElementById('ttDistance').value = '';
+    document.getElementById('ttResultsContainer').innerHTML = '<label class="form-label" style="font-size:12px;">個人タイム</label>';
+    ttResultIndex = 0;
+    resetGroupSelection();
+}
+
+// 追加済みメニュー表示
+function renderAddedMenus() {
+    const container = document.getElementById('addedMenus');
+    if (menus.length === 0) {
+        container.innerHTML = '';
+        return;
+    }
+
+    let html = '<div style="font-size:12px;color:var(--text-muted);margin-bottom:8px;">追加済みメニュー:</div>';
+    menus.forEach((menu, idx) => {
+        let detail = '';
+        if (menu.type === 'pace_run') {
+            detail = menu.laps.length + '本ラップ';
+            if (menu.total) detail += ' / total ' + menu.total;
+        } else if (menu.type === 'interval') {
+            if (menu.times && menu.times.length > 0) {
+                detail = menu.times.length + '本記録';
+            } else {
+                detail = menu.pace || '';
+            }
+            if (menu.rest) detail += (detail ? ' / ' : '') + 'レスト ' + menu.rest;
+        } else if (menu.type === 'tt') {
+            detail = menu.results.length + '名参加';
+            if (menu.results.length > 0 && menu.results[0].player) {
+                detail += ' / 1位 ' + menu.results[0].player + ' ' + menu.results[0].time;
+            }
+        }
+
+        const typeLabel = menu.type === 'pace_run' ? 'ペース走' : menu.type === 'interval' ? 'インターバル' : 'TT';
+        let groupInfo = '';
+        if (menu.group) {
+            groupInfo = `${menu.group}グループ`;
+            if (menu.members && menu.members.length > 0) {
+                groupInfo += ': ' + menu.members.map(m => m.name).join(', ');
+            }
+        }
+        html += `
+            <div class="added-menu-item">
+                <div class="added-menu-content">
+                    <div class="added-menu-type">${typeLabel}</div>
+                    <div class="added-menu-name">${menu.name}</div>
+                    <div class="added-menu-detail">${detail}</div>
+                    ${groupInfo ? `<div class="added-menu-group"><i class="bi bi-people-fill"></i> ${groupInfo}</div>` : ''}
+                </div>
+                <button type="button" class="btn btn-outline-danger btn-sm" onclick="removeMenu(${idx})">
+                    <i class="bi bi-trash"></i>
+                </button>
+            </div>
+        `;
+    });
+    container.innerHTML = html;
+}
+
+function removeMenu(idx) {
+    menus.splice(idx, 1);
+    renderAddedMenus();
+}
+
+// 出欠関連
+function selectStatus(btn, playerId, status) {
+    btn.parentElement.querySelectorAll('.status-btn').forEach(b => b.classList.remove('active'));
+    btn.classList.add('active');
+    document.getElementById('status_' + playerId).value = status;
+    updateSummary();
+}
+
+function selectGuestStatus(btn, index, status) {
+    btn.parentElement.querySelectorAll('.status-btn').forEach(b => b.classList.remove('active'));
+    btn.classList.add('active');
+    document.getElementById('guest_status_' + index).value = status;
+    updateSummary();
+}
+
+function setAllStatus(status) {
+    document.querySelectorAll('.player-row .status-btns').forEach(btns => {
+        btns.querySelectorAll('.status-btn').forEach(btn => {
+            btn.classList.remove('active');
+            if (btn.textContent.trim() === status) btn.classList.add('active');
+        });
+    });
+    document.querySelectorAll('input[id^="status_"]:not([id^="guest_status_"])').forEach(input => {
+        input.value = status;
+    });
+    updateSummary();
+}
+
+function clearAllStatus() {
+    document.querySelectorAll('.player-row .status-btns').forEach(btns => {
+        btns.querySelectorAll('.status-btn').forEach(btn => {
+            btn.classList.remove('active');
+            if (btn.textContent.trim() === 'クリア') btn.classList.add('active');
+        });
+    });
+    document.querySelectorAll('input[id^="status_"]:not([id^="guest_status_"])').forEach(input => input.value = '');
+    updateSummary();
+}
+
+function updateSummary() {
+    let present = 0, absent = 0;
+    document.querySelectorAll('input[id^="status_"]:not([id^="guest_status_"])').forEach(input => {
+        if (input.value === '出席') present++;
+        else if (input.value === '欠席') absent++;
+    });
+    document.querySelectorAll('.guest-row').forEach(row => {
+        const nameInput = row.querySelector('.guest-name-input');
+        const statusInput = row.querySelector('input[id^="guest_status_"]');
+        if (nameInput && nameInput.value.trim() && statusInput) {
+            if (statusInput.value === '出席') present++;
+            else if (statusInput.value === '欠席') absent++;
+        }
+    });
+    document.getElementById('presentCount').textContent = present;
+    document.getElementById('absentCount').textContent = absent;
+    document.getElementById('participantsInput').value = present > 0 ? present : '';
+}
+
+function addGuest() {
+    const guestList = document.getElementById('guestList');
+    const html = `
+        <div class="guest-row" data-guest-index="${guestIndex}">
+            <input type="text" class="form-control form-control-sm guest-name-input"
+                   name="guest_name_${guestIndex}" placeholder="名前" oninput="updateSummary()">
+            <div class="status-btns">
+                <button type="button" class="status-btn present active" onclick="selectGuestStatus(this, ${guestIndex}, '出席')">出席</button>
+                <button type="button" class="status-btn absent" onclick="selectGuestStatus(this, ${guestIndex}, '欠席')">欠席</button>
+                <button type="button" class="status-btn clear" onclick="selectGuestStatus(this, ${guestIndex}, '')">クリア</button>
+            </div>
+            <input type="hidden" name="guest_status_${guestIndex}" id="guest_status_${guestIndex}" value="出席">
+            <button type="button" class="btn btn-outline-danger btn-remove-guest" onclick="removeGuest(this)">
+                <i class="bi bi-x"></i>
+            </button>
+        </div>
+    `;
+    guestList.insertAdjacentHTML('beforeend', html);
+    guestIndex++;
+    document.getElementById('guestCount').value = document.querySelectorAll('.guest-row').length;
+    updateSummary();
+}
+
+function removeGuest(btn) {
+    btn.closest('.guest-row').remove();
+    document.getElementById('guestCount').value = document.querySelectorAll('.guest-row').length;
+    updateSummary();
+}
+
+// 送信前処理
+function prepareSubmit() {
+    // メニューデータをJSONに
+    document.getElementById('menuDataInput').value = JSON.stringify({ menus: menus });
+
+    // contentフィールドにテキスト形式も生成
+    let content = '';
+    menus.forEach(menu => {
+        // グループ情報
+        if (menu.group) {
+            content += `【${menu.group}グループ】`;
+            if (menu.members && menu.members.length > 0) {
+                content += ' ' + menu.members.map(m => m.name).join(', ');
+            }
+            content += '\n';
+        }
+
+        if (menu.type === 'pace_run') {
+            content += menu.name + '\n';
+            menu.laps.forEach(lap => {
+                content += `${lap.distance} ${lap.time}\n`;
+            });
+            if (menu.total) content += `total ${menu.total}\n`;
+            content += '\n';
+        } else if (menu.type === 'interval') {
+            content += `${menu.name}`;
+            if (menu.pace) content += ` 設定${menu.pace}`;
+            if (menu.rest) content += ` レスト${menu.rest}`;
+            content += '\n';
+            if (menu.times && menu.times.length > 0) {
+                menu.times.forEach(t => {
+                    content += `${t.rep}本目 ${t.time}\n`;
+                });
+            }
+            content += '\n';
+        } else if (menu.type === 'tt') {
+            content += menu.name + '\n';
+            menu.results.forEach(r => {
+                content += `${r.rank ? r.rank + '位 ' : ''}${r.player} ${r.time}\n`;
+            });
+            content += '\n';
+        }
+    });
+    document.getElementById('contentInput').value = content.trim();
+    return true; // フォーム送信を続行
+}
+
+// 初期化
+updateSummary();
+
+// ============ 一時保存（ローカルストレージ） ============
+const DRAFT_STORAGE_KEY = 'practice_log_draft';
+let autoSaveTimer = null;
+let isRestoring = false;
+
+// ドラフトデータを収集
+function collectDraftData() {
+    const form = document.getElementById('mainForm');
+    const data = {
+        // 基本情報
+        date: form.querySelector('[name="date"]').value,
+        title: form.querySelector('[name="title"]').value,
+        weather: form.querySelector('[name="weather"]').value,
+        temperature: form.querySelector('[name="temperature"]').value,
+        memo: form.querySelector('[name="memo"]').value,
+        // 出欠状態
+        attendance: {},
+        // ゲスト
+        guests: [],
+        // メニューデータ
+        menus: menus,
+        // グループ選択
+        currentGroup: currentGroup,
+        // 保存日時
+        savedAt: new Date().toISOString()
+    };
+
+    // 選手の出欠状態を収集
+    document.querySelectorAll('input[id^="status_"]:not([id^="guest_status_"])').forEach(input => {
+        const playerId = input.id.replace('status_', '');
+        if (input.value) {
+            data.attendance[playerId] = input.value;
+        }
+    });
+
+    // ゲスト情報を収集
+    document.querySelectorAll('.guest-row').forEach(row => {
+        const nameInput = row.querySelector('.guest-name-input');
+        const statusInput = row.querySelector('input[id^="guest_status_"]');
+        if (nameInput && statusInput) {
+            data.guests.push({
+                name: nameInput.value,
+                status: statusInput.value
+            });
+        }
+    });
+
+    return data;
+}
+
+// ドラフトをローカルストレージに保存
+function saveDraft() {
+    if (isRestoring) return;
+
+    try {
+        const data = collectDraftData();
+        // 何も入力されていない場合は保存しない
+        const hasData = data.title !== '練習会' ||
+                       Object.keys(data.attendance).length > 0 ||
+                       data.guests.length > 0 ||
+                       data.menus.length > 0 ||
+                       data.memo ||
+                       data.temperature;
+
+        if (!hasData) {
+            return;
+        }
+
+        localStorage.setItem(DRAFT_STORAGE_KEY, JSON.stringify(data));
+        showAutoSaveIndicator('saved');
+    } catch (e) {
+        console.error('ドラフト保存エラー:', e);
+    }
+}
+
+// 自動保存インジケーター表示
+function showAutoSaveIndicator(type) {
+    const indicator = document.getElementById('autosaveIndicator');
+    const textEl = document.getElementById('autosaveText');
+
+    indicator.classList.remove('saving', 'saved');
+    indicator.classList.add(type, 'show');
+
+    if (type === 'saving') {
+        textEl.textContent = '保存中...';
+    } else {
+        textEl.textContent = '一時保存しました';
+    }
+
+    // 2秒後に非表示
+    setTimeout(() => {
+        indicator.classList.remove('show');
+    }, 2000);
+}
+
+// ドラフトをクリア
+function clearDraft() {
+    try {
+        localStorage.removeItem(DRAFT_STORAGE_KEY);
+    } catch (e) {
+        console.error('ドラフトクリアエラー:', e);
+    }
+}
+
+// ドラフトを読み込み
+function loadDraft() {
+    try {
+        const saved = localStorage.getItem(DRAFT_STORAGE_KEY);
+        if (saved) {
+            return JSON.parse(saved);
+        }
+    } catch (e) {
+        console.error('ドラフト読み込みエラー:', e);
+    }
+    return null;
+}
+
+// 復元確認モーダルを表示
+function showRestoreModal(draft) {
+    const savedDate = new Date(draft.savedAt);
+    const dateStr = savedDate.toLocaleDateString('ja-JP', {
+        month: 'numeric',
+        day: 'numeric',
+        hour: '2-digit',
+        minute: '2-digit'
+    });
+
+    let infoHtml = `<strong>${dateStr}</strong> に保存されたデータがあります。<br>`;
+    if (draft.date) {
+        infoHtml += `日付: ${draft.date}<br>`;
+    }
+    if (draft.menus && draft.menus.length > 0) {
+        infoHtml += `メニュー: ${draft.menus.length}件<br>`;
+    }
+    const attendeeCount = Object.values(draft.attendance || {}).filter(s => s === '出席').length;
+    if (attendeeCount > 0) {
+        infoHtml += `出席者: ${attendeeCount}名`;
+    }
+
+    document.getElementById('restoreInfo').innerHTML = infoHtml;
+    document.getElementById('restoreModal').classList.add('active');
+}
+
+// ドラフトを破棄
+function discardDraft() {
+    clearDraft();
+    document.getElementById('restoreModal').classList.remove('active');
+}
+
+// ドラフトを復元
+function restoreDraft() {
+    const draft = loadDraft();
+    if (!draft) {
+        document.getElementById('restoreModal').classList.remove('active');
+        return;
+    }
+
+    isRestoring = true;
+
+    try {
+        const form = document.getElementById('mainForm');
+
+        // 基本情報を復元
+        if (draft.date) form.querySelector('[name="date"]').value = draft.date;
+        if (draft.title) form.querySelector('[name="title"]').value = draft.title;
+        if (draft.weather) form.querySelector('[name="weather"]').value = draft.weather;
+        if (draft.temperature) form.querySelector('[name="temperature"]').value = draft.temperature;
+        if (draft.memo) form.querySelector('[name="memo"]').value = draft.memo;
+
+        // 出欠状態を復元
+        if (draft.attendance) {
+            Object.entries(draft.attendance).forEach(([playerId, status]) => {
+                const statusInput = document.getElementById('status_' + playerId);
+                if (statusInput) {
+                    statusInput.value = status;
+                    // ボタンのactive状態を更新
+                    const row = statusInput.closest('.player-row');
+                    if (row) {
+                        row.querySelectorAll('.status-btn').forEach(btn => {
+                            btn.classList.remove('active');
+                            if ((status === '出席' && btn.classList.contains('present')) ||
+                                (status === '欠席' && btn.classList.contains('absent')) ||
+                                (status === '' && btn.classList.contains('clear'))) {
+                                btn.classList.add('active');
+                            }
+                        });
+                    }
+                }
+            });
+        }
+
+        // ゲストを復元
+        if (draft.guests && draft.guests.length > 0) {
+            draft.guests.forEach(guest => {
+                addGuest();
+                const rows = document.querySelectorAll('.guest-row');
+                const lastRow = rows[rows.length - 1];
+                if (lastRow) {
+                    const nameInput = lastRow.querySelector('.guest-name-input');
+                    const statusInput = lastRow.querySelector('input[id^="guest_status_"]');
+                    if (nameInput) nameInput.value = guest.name;
+                    if (statusInput) {
+                        statusInput.value = guest.status;
+                        // ボタンのactive状態を更新
+                        lastRow.querySelectorAll('.status-btn').forEach(btn => {
+                            btn.classList.remove('active');
+                            if ((guest.status === '出席' && btn.classList.contains('present')) ||
+                                (guest.status === '欠席' && btn.classList.contains('absent')) ||
+                                (guest.status === '' && btn.classList.contains('clear'))) {
+                                btn.classList.add('active');
+                            }
+                        });
+                    }
+                }
+            });
+        }
+
+        // メニューデータを復元
+        if (draft.menus && draft.menus.length > 0) {
+            menus = draft.menus;
+            renderAddedMenus();
+        }
+
+        // グループ選択を復元
+        if (draft.currentGroup) {
+            selectGroup(draft.currentGroup);
+        }
+
+        updateSummary();
+
+    } catch (e) {
+        console.error('ドラフト復元エラー:', e);
+    }
+
+    isRestoring = false;
+    document.getElementById('restoreModal').classList.remove('active');
+}
+
+// 入力変更時の自動保存をセットアップ
+function setupAutoSave() {
+    const form = document.getElementById('mainForm');
+
+    // 入力変更イベントをリッスン
+    form.addEventListener('input', () => {
+        if (autoSaveTimer) clearTimeout(autoSaveTimer);
+        autoSaveTimer = setTimeout(saveDraft, 1000); // 1秒後に保存
+    });
+
+    form.addEventListener('change', () => {
+        if (autoSaveTimer) clearTimeout(autoSaveTimer);
+        autoSaveTimer = setTimeout(saveDraft, 500);
+    });
+
+    // 定期的な自動保存（30秒ごと）
+    setInterval(() => {
+        saveDraft();
+    }, 30000);
+}
+
+// メニュー追加時も保存
+const originalAddPaceMenu = addPaceMenu;
+addPaceMenu = function() {
+    originalAddPaceMenu();
+    saveDraft();
+};
+
+const originalAddIntervalMenu = addIntervalMenu;
+addIntervalMenu = function() {
+    originalAddIntervalMenu();
+    saveDraft();
+};
+
+const originalAddTTMenu = addTTMenu;
+addTTMenu = function() {
+    originalAddTTMenu();
+    saveDraft();
+};
+
+const originalRemoveMenu = removeMenu;
+removeMenu = function(idx) {
+    originalRemoveMenu(idx);
+    saveDraft();
+};
+
+// 出欠変更時も保存
+const originalSelectStatus = selectStatus;
+selectStatus = function(btn, playerId, status) {
+    originalSelectStatus(btn, playerId, status);
+    if (autoSaveTimer) clearTimeout(autoSaveTimer);
+    autoSaveTimer = setTimeout(saveDraft, 500);
+    updateMemberCheckboxes();
+};
+
+const originalSelectGuestStatus = selectGuestStatus;
+selectGuestStatus = function(btn, index, status) {
+    originalSelectGuestStatus(btn, index, status);
+    if (autoSaveTimer) clearTimeout(autoSaveTimer);
+    autoSaveTimer = setTimeout(saveDraft, 500);
+};
+
+// 送信前にドラフトをクリア
+const originalPrepareSubmit = prepareSubmit;
+prepareSubmit = function() {
+    clearDraft();
+    return originalPrepareSubmit();
+};
+
+// ページ読み込み時の初期化
+document.addEventListener('DOMContentLoaded', () => {
+    const draft = loadDraft();
+    if (draft) {
+        showRestoreModal(draft);
+    }
+    setupAutoSave();
+});
@@ -0,0 +1,301 @@
+function selectStatus(btn, playerId, status) {
+    btn.parentElement.querySelectorAll('.status-btn').forEach(b => b.classList.remove('active'));
+    btn.classList.add('active');
+    document.getElementById('status_' + playerId).value = status;
+    updateSummary();
+}
+
+function selectGuestStatus(btn, index, status) {
+    btn.parentElement.querySelectorAll('.status-btn').forEach(b => b.classList.remove('active'));
+    btn.classList.add('active');
+    document.getElementById('guest_status_' + index).value = status;
+    updateSummary();
+}
+
+function updateSummary() {
+    let present = 0, absent = 0;
+    document.querySelectorAll('input[id^="status_"]:not([id^="guest_status_"])').forEach(input => {
+        if (input.value === '出席') present++;
+        else if (input.value === '欠席') absent++;
+    });
+    document.querySelectorAll('.guest-row').forEach(row => {
+        const nameInput = row.querySelector('.guest-name-input');
+        const statusInput = row.querySelector('input[id^="guest_status_"]');
+        if (nameInput && nameInput.value.trim() && statusInput) {
+            if (statusInput.value === '出席') present++;
+            else if (statusInput.value === '欠席') absent++;
+        }
+    });
+    document.getElementById('presentCount').textContent = present;
+    document.getElementById('absentCount').textContent = absent;
+    // Update participant count in info grid
+    const total = present;
+    document.getElementById('participantCount').textContent = total > 0 ? total + '名' : '-';
+}
+
+function addGuest() {
+    const guestList = document.getElementById('guestList');
+    const html = `
+        <div class="guest-row" data-guest-index="${guestIndex}">
+            <input type="text" class="form-control form-control-sm guest-name-input"
+                   name="guest_name_${guestIndex}" placeholder="名前">
+            <div class="status-btns">
+                <button type="button" class="status-btn present active"
+                        onclick="selectGuestStatus(this, ${guestIndex}, '出席')">出席</button>
+                <button type="button" class="status-btn absent"
+                        onclick="selectGuestStatus(this, ${guestIndex}, '欠席')">欠席</button>
+                <button type="button" class="status-btn clear"
+                        onclick="selectGuestStatus(this, ${guestIndex}, '')">クリア</button>
+            </div>
+            <input type="hidden" name="guest_status_${guestIndex}" id="guest_status_${guestIndex}" value="出席">
+            <button type="button" class="btn btn-outline-danger btn-remove-guest" onclick="removeGuest(this)">
+                <i class="bi bi-x"></i>
+            </button>
+        </div>
+    `;
+    guestList.insertAdjacentHTML('beforeend', html);
+    guestIndex++;
+    document.getElementById('guestCount').value = document.querySelectorAll('.guest-row').length;
+    updateSummary();
+}
+
+function removeGuest(btn) {
+    btn.closest('.guest-row').remove();
+    document.getElementById('guestCount').value = document.querySelectorAll('.guest-row').length;
+    updateSummary();
+}
+
+// Initial summary
+updateSummary();
+
+// 出席者をクリップボードにコピー
+function copyAttendees() {
+    const attendees = [];
+
+    // 選手の出席者を収集
+    document.querySelectorAll('.player-row').forEach(row => {
+        const statusInput = row.querySelector('input[id^="status_"]');
+        if (statusInput && statusInput.value === '出席') {
+            const name = row.querySelector('.player-name').textContent.trim();
+            const category = row.querySelector('.player-category');
+            if (category) {
+                attendees.push(`${category.textContent.trim()} ${name}`);
+            } else {
+                attendees.push(name);
+            }
+        }
+    });
+
+    // ゲストの出席者を収集
+    document.querySelectorAll('.guest-row').forEach(row => {
+        const nameInput = row.querySelector('.guest-name-input');
+        const statusInput = row.querySelector('input[id^="guest_status_"]');
+        if (nameInput && nameInput.value.trim() && statusInput && statusInput.value === '出席') {
+            attendees.push(`(ゲスト) ${nameInput.value.trim()}`);
+        }
+    });
+
+    if (attendees.length === 0) {
+        alert('出席者がいません');
+        return;
+    }
+
+    const text = attendees.join('\n');
+    navigator.clipboard.writeText(text).then(() => {
+        const btn = document.getElementById('copyBtn');
+        const originalHtml = btn.innerHTML;
+        btn.innerHTML = '<i class="bi bi-check"></i> コピー完了';
+        btn.classList.remove('btn-outline-secondary');
+        btn.classList.add('btn-success');
+        setTimeout(() => {
+            btn.innerHTML = originalHtml;
+            btn.classList.remove('btn-success');
+            btn.classList.add('btn-outline-secondary');
+        }, 2000);
+    }).catch(err => {
+        console.error('Copy failed:', err);
+        alert('コピーに失敗しました');
+    });
+}
+
+// Menu data display
+if (menuDataRaw) {
+    try {
+        const menuData = typeof menuDataRaw === 'string' ? JSON.parse(menuDataRaw) : menuDataRaw;
+        if (menuData && menuData.menus && menuData.menus.length > 0) {
+            renderMenus(menuData.menus);
+        }
+    } catch (e) {
+        console.error('Menu data parse error:', e);
+    }
+}
+
+function renderMenus(menus) {
+    const container = document.getElementById('menuDisplay');
+    let html = '';
+
+    menus.forEach(menu => {
+        if (menu.type === 'pace_run') {
+            html += renderPaceRun(menu);
+        } else if (menu.type === 'interval') {
+            html += renderInterval(menu);
+        } else if (menu.type === 'tt') {
+            html += renderTT(menu);
+        }
+    });
+
+    container.innerHTML = html;
+}
+
+function renderGroupInfo(menu) {
+    if (!menu.group) return '';
+
+    let groupClass = 'group-c';
+    if (menu.group === 'A') groupClass = 'group-a';
+    else if (menu.group === 'B') groupClass = 'group-b';
+    else if (menu.group === 'C') groupClass = 'group-c';
+
+    let members = '';
+    if (menu.members && menu.members.length > 0) {
+        members = menu.members.map(m => m.name).join(', ');
+    }
+
+    return `
+        <div class="menu-group-info">
+            <span class="menu-group-badge ${groupClass}">${escapeHtml(menu.group)}グループ</span>
+            ${members ? `<span class="menu-group-members">${escapeHtml(members)}</span>` : ''}
+        </div>
+    `;
+}
+
+function renderPaceRun(menu) {
+    let html = `
+        <div class="menu-item">
+            ${renderGroupInfo(menu)}
+            <span class="menu-type-badge">ペース走</span>
+            <div class="menu-name">${escapeHtml(menu.name)}</div>
+    `;
+
+    if (menu.lap_distance) {
+        html += `<div class="menu-detail">周回距離: ${escapeHtml(menu.lap_distance)}</div>`;
+    }
+
+    if (menu.laps && menu.laps.length > 0) {
+        html += `
+            <table class="lap-table">
+                <thead>
+                    <tr>
+                        <th>距離</th>
+                        <th>タイム</th>
+                    </tr>
+                </thead>
+                <tbody>
+        `;
+        menu.laps.forEach(lap => {
+            html += `
+                <tr>
+                    <td>${escapeHtml(lap.distance)}</td>
+                    <td>${escapeHtml(lap.time)}</td>
+                </tr>
+            `;
+        });
+
+        if (menu.total) {
+            html += `
+                <tr class="total-row">
+                    <td>Total</td>
+                    <td>${escapeHtml(menu.total)}</td>
+                </tr>
+            `;
+        }
+        html += '</tbody></table>';
+    }
+
+    html += '</div>';
+    return html;
+}
+
+function renderInterval(menu) {
+    let detail = '';
+    if (menu.pace) detail += `設定: ${escapeHtml(menu.pace)}`;
+    if (menu.rest) detail += (detail ? ' / ' : '') + `レスト: ${escapeHtml(menu.rest)}`;
+
+    let html = `
+        <div class="menu-item">
+            ${renderGroupInfo(menu)}
+            <span class="menu-type-badge interval">インターバル</span>
+            <div class="menu-name">${escapeHtml(menu.name)}</div>
+            ${detail ? `<div class="menu-detail">${detail}</div>` : ''}
+    `;
+
+    if (menu.times && menu.times.length > 0) {
+        html += `
+            <table class="lap-table">
+                <thead>
+                    <tr>
+                        <th>本数</th>
+                        <th>タイム</th>
+                    </tr>
+                </thead>
+                <tbody>
+        `;
+        menu.times.forEach(t => {
+            html += `
+                <tr>
+                    <td>${t.rep}本目</td>
+                    <td>${escapeHtml(t.time)}</td>
+                </tr>
+            `;
+        });
+        html += '</tbody></table>';
+    }
+
+    html += '</div>';
+    return html;
+}
+
+function renderTT(menu) {
+    let html = `
+        <div class="menu-item">
+            ${renderGroupInfo(menu)}
+            <span class="menu-type-badge tt">TT</span>
+            <div class="menu-name">${escapeHtml(menu.name)}</div>
+    `;
+
+    if (menu.distance) {
+        html += `<div class="menu-detail">距離: ${escapeHtml(menu.distance)}</div>`;
+    }
+
+    if (menu.results && menu.results.length > 0) {
+        // Sort by rank if available
+        const sortedResults = [...menu.results].sort((a, b) => (a.rank || 999) - (b.rank || 999));
+
+        html += '<div class="result-list">';
+        sortedResults.forEach((result, idx) => {
+            const rank = result.rank || (idx + 1);
+            let rankClass = '';
+            if (rank === 1) rankClass = 'gold';
+            else if (rank === 2) rankClass = 'silver';
+            else if (rank === 3) rankClass = 'bronze';
+
+            html += `
+                <div class="result-item">
+                    <div class="result-rank ${rankClass}">${rank}</div>
+                    <div class="result-player">${escapeHtml(result.player)}</div>
+                    <div class="result-time">${escapeHtml(result.time)}</div>
+                </div>
+            `;
+        });
+        html += '</div>';
+    }
+
+    html += '</div>';
+    return html;
+}
+
+function escapeHtml(text) {
+    if (!text) return '';
+    const div = document.createElement('div');
+    div.textContent = text;
+    return div.innerHTML;
+}
@@ -0,0 +1,486 @@
+// 既存のメニューデータを読み込み
+let menus = [];
+let ttResultIndex = 0;
+let currentGroup = '';
+
+// 初期化時に既存メニューを読み込み
+document.addEventListener('DOMContentLoaded', () => {
+    loadExistingMenus();
+});
+
+function loadExistingMenus() {
+    if (existingMenuData && existingMenuData.menus && Array.isArray(existingMenuData.menus)) {
+        menus = existingMenuData.menus;
+        renderAddedMenus();
+    }
+}
+
+// グループ選択
+function selectGroup(group) {
+    currentGroup = group;
+    document.querySelectorAll('.group-btn').forEach(btn => btn.classList.remove('active'));
+    event.target.classList.add('active');
+
+    const memberSelector = document.getElementById('memberSelector');
+    if (group) {
+        memberSelector.classList.add('active');
+    } else {
+        memberSelector.classList.remove('active');
+    }
+}
+
+function toggleMember(label) {
+    const checkbox = label.querySelector('input');
+    checkbox.checked = !checkbox.checked;
+    if (checkbox.checked) {
+        label.classList.add('selected');
+    } else {
+        label.classList.remove('selected');
+    }
+}
+
+function getSelectedMembers() {
+    const members = [];
+    document.querySelectorAll('.member-check input:checked').forEach(input => {
+        members.push({
+            id: input.value,
+            name: input.dataset.name
+        });
+    });
+    return members;
+}
+
+function resetGroupSelection() {
+    currentGroup = '';
+    document.querySelectorAll('.group-btn').forEach(btn => btn.classList.remove('active'));
+    document.querySelectorAll('.group-btn')[3].classList.add('active');
+    document.getElementById('memberSelector').classList.remove('active');
+    document.querySelectorAll('.member-check').forEach(label => {
+        label.classList.remove('selected');
+        label.querySelector('input').checked = false;
+    });
+}
+
+// メニュータイプ切り替え
+function switchMenuType(type) {
+    document.querySelectorAll('.menu-type-tab').forEach(t => t.classList.remove('active'));
+    document.querySelectorAll('.menu-form').forEach(f => f.classList.remove('active'));
+    event.target.classList.add('active');
+    if (type === 'pace') document.getElementById('menuFormPace').classList.add('active');
+    else if (type === 'interval') document.getElementById('menuFormInterval').classList.add('active');
+    else if (type === 'tt') document.getElementById('menuFormTT').classList.add('active');
+}
+
+// タイム自動フォーマット
+function formatTimeInput(input) {
+    let val = input.value.replace(/[^0-9]/g, '');
+    if (val.length >= 3) {
+        const sec = val.slice(-2);
+        const min = val.slice(0, -2);
+        input.value = min + ':' + sec;
+    }
+    if (input.value.trim()) {
+        input.classList.add('filled');
+    } else {
+        input.classList.remove('filled');
+    }
+}
+
+// ============ 数字キーパッド ============
+let numpadTarget = null;
+let numpadInputs = [];
+let numpadCurrentIndex = 0;
+let numpadRawValue = '';
+
+function openNumpad(input, label) {
+    numpadTarget = input;
+    numpadInputs = Array.from(document.querySelectorAll('.time-input, .lap-input'));
+    numpadCurrentIndex = numpadInputs.indexOf(input);
+    numpadRawValue = input.value.replace(/[^0-9]/g, '');
+
+    document.getElementById('numpadLabel').textContent = label || '';
+    updateNumpadDisplay();
+    document.getElementById('numpadOverlay').classList.add('active');
+    document.body.style.overflow = 'hidden';
+}
+
+function closeNumpad() {
+    document.getElementById('numpadOverlay').classList.remove('active');
+    document.body.style.overflow = '';
+    if (numpadTarget) {
+        formatTimeInput(numpadTarget);
+        calculatePaceTotal();
+    }
+    numpadTarget = null;
+}
+
+function updateNumpadDisplay() {
+    let display = '--:--';
+    if (numpadRawValue.length > 0) {
+        if (numpadRawValue.length <= 2) {
+            display = numpadRawValue;
+        } else {
+            const sec = numpadRawValue.slice(-2);
+            const min = numpadRawValue.slice(0, -2);
+            display = min + ':' + sec;
+        }
+    }
+    document.getElementById('numpadValue').textContent = display;
+    if (numpadTarget) {
+        numpadTarget.value = display === '--:--' ? '' : display;
+    }
+}
+
+function numpadInput(digit) {
+    if (numpadRawValue.length < 5) {
+        numpadRawValue += digit;
+        updateNumpadDisplay();
+    }
+}
+
+function numpadClear() {
+    numpadRawValue = '';
+    updateNumpadDisplay();
+}
+
+function numpadNext() {
+    if (numpadTarget) {
+        formatTimeInput(numpadTarget);
+        numpadTarget.classList.add('filled');
+    }
+
+    if (numpadCurrentIndex < numpadInputs.length - 1) {
+        numpadCurrentIndex++;
+        numpadTarget = numpadInputs[numpadCurrentIndex];
+        numpadRawValue = numpadTarget.value.replace(/[^0-9]/g, '');
+
+        const labelEl = numpadTarget.closest('.lap-row')?.querySelector('.lap-label') ||
+                        numpadTarget.closest('.time-cell')?.querySelector('.time-cell-label');
+        document.getElementById('numpadLabel').textContent = labelEl?.textContent || '';
+        updateNumpadDisplay();
+        numpadTarget.focus();
+    } else {
+        closeNumpad();
+    }
+    calculatePaceTotal();
+}
+
+function numpadConfirm() {
+    closeNumpad();
+}
+
+// ペース走ラップ生成
+function generatePaceLaps() {
+    const total = parseInt(document.getElementById('paceDistance').value) || 0;
+    const interval = parseInt(document.getElementById('paceLapInterval').value) || 1000;
+    const container = document.getElementById('paceLapsContainer');
+    container.innerHTML = '';
+
+    if (total <= 0) return;
+
+    let html = '<div class="time-hint">タップでキーパッド表示</div>';
+    for (let d = interval; d <= total; d += interval) {
+        html += `
+            <div class="lap-row">
+                <span class="lap-label">${d}m</span>
+                <input type="text" class="lap-input time-input" id="paceLap_${d}"
+                       inputmode="numeric" placeholder="3:35" readonly
+                       onclick="openNumpad(this, '${d}m')">
+            </div>
+        `;
+    }
+    container.innerHTML = html;
+
+    setTimeout(() => {
+        const firstInput = container.querySelector('.lap-input');
+        if (firstInput) {
+            const d = firstInput.id.replace('paceLap_', '');
+            openNumpad(firstInput, d + 'm');
+        }
+    }, 100);
+}
+
+function calculatePaceTotal() {
+    let totalSeconds = 0;
+    document.querySelectorAll('#paceLapsContainer input').forEach(input => {
+        const time = input.value.trim();
+        if (time) {
+            const parts = time.split(':');
+            if (parts.length === 2) {
+                totalSeconds += parseInt(parts[0]) * 60 + parseInt(parts[1]);
+            }
+        }
+    });
+    if (totalSeconds > 0) {
+        const min = Math.floor(totalSeconds / 60);
+        const sec = totalSeconds % 60;
+        document.getElementById('paceTotalTime').value = `${min}:${sec.toString().padStart(2, '0')}`;
+    }
+}
+
+// ペース走追加
+function addPaceMenu() {
+    const distance = document.getElementById('paceDistance').value;
+    const totalTime = document.getElementById('paceTotalTime').value;
+
+    if (!distance) { alert('距離を入力してください'); return; }
+
+    const laps = [];
+    document.querySelectorAll('#paceLapsContainer .lap-input').forEach(input => {
+        const d = input.id.replace('paceLap_', '');
+        if (input.value.trim()) {
+            laps.push({ distance: d + 'm', time: input.value.trim() });
+        }
+    });
+
+    const menu = {
+        type: 'pace_run',
+        name: `${distance}mペース走`,
+        distance: distance + 'm',
+        laps: laps,
+        total: totalTime,
+        group: currentGroup,
+        members: getSelectedMembers()
+    };
+    menus.push(menu);
+    renderAddedMenus();
+
+    document.getElementById('paceDistance').value = '';
+    document.getElementById('paceLapsContainer').innerHTML = '';
+    document.getElementById('paceTotalTime').value = '';
+    resetGroupSelection();
+}
+
+// インターバルタイム入力欄生成
+function generateIntervalTimes() {
+    const reps = parseInt(document.getElementById('intervalReps').value) || 0;
+    const distance = parseInt(document.getElementById('intervalDistance').value) || 0;
+    const container = document.getElementById('intervalTimesContainer');
+    container.innerHTML = '';
+
+    if (reps <= 0 || reps > 30) return;
+
+    let placeholder = '70';
+    if (distance >= 1000) placeholder = '3:20';
+    else if (distance >= 600) placeholder = '1:50';
+    else if (distance >= 300) placeholder = '50';
+
+    let html = '<label class="form-label" style="font-size:12px;">各本タイム</label>';
+    html += '<div class="time-hint">タップでキーパッド表示</div>';
+    html += '<div class="time-grid">';
+    for (let i = 1; i <= reps; i++) {
+        html += `
+            <div class="time-cell">
+                <span class="time-cell-label">${i}本目</span>
+                <input type="text" class="time-input" id="intervalTime_${i}"
+                       inputmode="numeric" placeholder="${placeholder}" readonly
+                       onclick="openNumpad(this, '${i}本目')">
+            </div>
+        `;
+    }
+    html += '</div>';
+    container.innerHTML = html;
+
+    setTimeout(() => {
+        const firstInput = container.querySelector('.time-input');
+        if (firstInput) openNumpad(firstInput, '1本目');
+    }, 100);
+}
+
+// インターバル追加
+function addIntervalMenu() {
+    const distance = document.getElementById('intervalDistance').value;
+    const reps = document.getElementById('intervalReps').value;
+    const pace = document.getElementById('intervalPace').value;
+    const rest = document.getElementById('intervalRest').value;
+
+    if (!distance || !reps) { alert('距離と本数を入力してください'); return; }
+
+    const times = [];
+    for (let i = 1; i <= parseInt(reps); i++) {
+        const timeInput = document.getElementById('intervalTime_' + i);
+        if (timeInput && timeInput.value.trim()) {
+            times.push({ rep: i, time: timeInput.value.trim() });
+        }
+    }
+
+    const menu = {
+        type: 'interval',
+        name: `${distance}m×${reps}`,
+        distance: distance + 'm',
+        reps: parseInt(reps),
+        pace: pace,
+        rest: rest,
+        times: times,
+        group: currentGroup,
+        members: getSelectedMembers()
+    };
+    menus.push(menu);
+    renderAddedMenus();
+
+    document.getElementById('intervalDistance').value = '';
+    document.getElementById('intervalReps').value = '';
+    document.getElementById('intervalPace').value = '';
+    document.getElementById('intervalRest').value = '';
+    document.getElementById('intervalTimesContainer').innerHTML = '';
+    resetGroupSelection();
+}
+
+// TT結果行追加
+function addTTResult() {
+    const container = document.getElementById('ttResultsContainer');
+    const html = `
+        <div class="result-row" id="ttResult_${ttResultIndex}">
+            <input type="number" class="form-control result-rank" placeholder="#" id="ttRank_${ttResultIndex}">
+            <input type="text" class="form-control result-player" placeholder="選手名" id="ttPlayer_${ttResultIndex}">
+            <input type="text" class="form-control result-time" placeholder="2:52.7" id="ttTime_${ttResultIndex}">
+            <button type="button" class="btn btn-outline-danger btn-sm" onclick="removeTTResult(${ttResultIndex})">
+                <i class="bi bi-x"></i>
+            </button>
+        </div>
+    `;
+    container.insertAdjacentHTML('beforeend', html);
+    ttResultIndex++;
+}
+
+function removeTTResult(idx) {
+    document.getElementById('ttResult_' + idx)?.remove();
+}
+
+// TT追加
+function addTTMenu() {
+    const name = document.getElementById('ttName').value || 'TT';
+    const distance = document.getElementById('ttDistance').value;
+
+    const results = [];
+    document.querySelectorAll('#ttResultsContainer .result-row').forEach(row => {
+        const idx = row.id.replace('ttResult_', '');
+        const rank = document.getElementById('ttRank_' + idx)?.value;
+        const player = document.getElementById('ttPlayer_' + idx)?.value;
+        const time = document.getElementById('ttTime_' + idx)?.value;
+        if (player && time) {
+            results.push({ rank: parseInt(rank) || 0, player: player, time: time });
+        }
+    });
+
+    const menu = {
+        type: 'tt',
+        name: name,
+        distance: distance ? distance + 'm' : '',
+        results: results,
+        group: currentGroup,
+        members: getSelectedMembers()
+    };
+    menus.push(menu);
+    renderAddedMenus();
+
+    document.getElementById('ttName').value = '';
+    document.getElementById('ttDistance').value = '';
+    document.getElementById('ttResultsContainer').innerHTML = '<label class="form-label" style="font-size:12px;">個人タイム</label>';
+    ttResultIndex = 0;
+    resetGroupSelection();
+}
+
+// 追加済みメニュー表示
+function renderAddedMenus() {
+    const container = document.getElementById('addedMenus');
+    if (menus.length === 0) {
+        container.innerHTML = '<div class="text-muted text-center py-2" style="font-size:12px;">メニューがありません</div>';
+        return;
+    }
+
+    let html = '<div style="font-size:12px;color:var(--text-muted);margin-bottom:8px;">登録済みメニュー:</div>';
+    menus.forEach((menu, idx) => {
+        let detail = '';
+        if (menu.type === 'pace_run') {
+            detail = menu.laps.length + '本ラップ';
+            if (menu.total) detail += ' / total ' + menu.total;
+        } else if (menu.type === 'interval') {
+            if (menu.times && menu.times.length > 0) {
+                detail = menu.times.length + '本記録';
+            } else {
+                detail = menu.pace || '';
+            }
+            if (menu.rest) detail += (detail ? ' / ' : '') + 'レスト ' + menu.rest;
+        } else if (menu.type === 'tt') {
+            detail = menu.results.length + '名参加';
+            if (menu.results.length > 0 && menu.results[0].player) {
+                detail += ' / 1位 ' + menu.results[0].player + ' ' + menu.results[0].time;
+            }
+        }
+
+        const typeLabel = menu.type === 'pace_run' ? 'ペース走' : menu.type === 'interval' ? 'インターバル' : 'TT';
+        let groupInfo = '';
+        if (menu.group) {
+            groupInfo = `${menu.group}グループ`;
+            if (menu.members && menu.members.length > 0) {
+                groupInfo += ': ' + menu.members.map(m => m.name).join(', ');
+            }
+        }
+        html += `
+            <div class="added-menu-item">
+                <div class="added-menu-content">
+                    <div class="added-menu-type">${typeLabel}</div>
+                    <div class="added-menu-name">${menu.name}</div>
+                    <div class="added-menu-detail">${detail}</div>
+                    ${groupInfo ? `<div class="added-menu-group"><i class="bi bi-people-fill"></i> ${groupInfo}</div>` : ''}
+                </div>
+                <button type="button" class="btn btn-outline-danger btn-sm" onclick="removeMenu(${idx})">
+                    <i class="bi bi-trash"></i>
+                </button>
+            </div>
+        `;
+    });
+    container.innerHTML = html;
+}
+
+function removeMenu(idx) {
+    menus.splice(idx, 1);
+    renderAddedMenus();
+}
+
+// 送信前処理
+function prepareSubmit() {
+    // メニューデータをJSONに
+    document.getElementById('menuDataInput').value = JSON.stringify({ menus: menus });
+
+    // contentフィールドにテキスト形式も生成
+    let content = '';
+    menus.forEach(menu => {
+        if (menu.group) {
+            content += `【${menu.group}グループ】`;
+            if (menu.members && menu.members.length > 0) {
+                content += ' ' + menu.members.map(m => m.name).join(', ');
+            }
+            content += '\n';
+        }
+
+        if (menu.type === 'pace_run') {
+            content += menu.name + '\n';
+            menu.laps.forEach(lap => {
+                content += `${lap.distance} ${lap.time}\n`;
+            });
+            if (menu.total) content += `total ${menu.total}\n`;
+            content += '\n';
+        } else if (menu.type === 'interval') {
+            content += `${menu.name}`;
+            if (menu.pace) content += ` 設定${menu.pace}`;
+            if (menu.rest) content += ` レスト${menu.rest}`;
+            content += '\n';
+            if (menu.times && menu.times.length > 0) {
+                menu.times.forEach(t => {
+                    content += `${t.rep}本目 ${t.time}\n`;
+                });
+            }
+            content += '\n';
+        } else if (menu.type === 'tt') {
+            content += menu.name + '\n';
+            menu.results.forEach(r => {
+                content += `${r.rank ? r.rank + '位 ' : ''}${r.player} ${r.time}\n`;
+            });
+            content += '\n';
+        }
+    });
+    document.getElementById('contentInput').value = content.trim();
+    return true;
+}
@@ -0,0 +1,18 @@
+// 大会タイプ選択
+document.querySelectorAll('.type-btn').forEach(btn => {
+    btn.addEventListener('click', function() {
+        document.querySelectorAll('.type-btn').forEach(b => b.classList.remove('selected'));
+        this.classList.add('selected');
+        document.getElementById('type').value = this.dataset.type;
+        document.getElementById('sectionCountDiv').style.display = this.dataset.type === 'ekiden' ? '' : 'none';
+    });
+});
+
+// 重要度選択
+document.querySelectorAll('.importance-btn').forEach(btn => {
+    btn.addEventListener('click', function() {
+        document.querySelectorAll('.importance-btn').forEach(b => b.classList.remove('selected'));
+        this.classList.add('selected');
+        document.getElementById('importance').value = this.dataset.value;
+    });
+});
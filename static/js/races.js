@@ -0,0 +1,19 @@
+// フィルター機能
+document.querySelectorAll('.filter-tab').forEach(tab => {
+    tab.addEventListener('click', function() {
+        const filter = this.dataset.filter;
+
+        // タブのアクティブ状態を切り替え
+        document.querySelectorAll('.filter-tab').forEach(t => t.classList.remove('active'));
+        this.classList.add('active');
+
+        // カードのフィルタリング
+        document.querySelectorAll('.race-card').forEach(card => {
+            if (filter === 'all' || card.dataset.type === filter) {
+                card.style.display = 'block';
+            } else {
+                card.style.display = 'none';
+            }
+        });
+    });
+});
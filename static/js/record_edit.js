@@ -0,0 +1,253 @@
+// 大会タイプ選択
+document.querySelectorAll('.type-btn').forEach(btn => {
+    btn.addEventListener('click', function() {
+        document.querySelectorAll('.type-btn').forEach(b => b.classList.remove('selected'));
+        this.classList.add('selected');
+        const type = this.dataset.type;
+        document.getElementById('race_type').value = type;
+
+        // 条件表示の切り替え
+        document.querySelectorAll('.conditional-section').forEach(s => s.classList.remove('active'));
+
+        if (type === '駅伝') {
+            document.getElementById('ekiden-section').classList.add('active');
+            document.getElementById('detail-section').classList.add('active');
+            document.getElementById('rank-label').textContent = '区間順位';
+        } else if (type === 'トラック') {
+            document.getElementById('track-section').classList.add('active');
+            document.getElementById('detail-section').classList.add('active');
+            document.getElementById('rank-label').textContent = '順位';
+        } else if (type === 'ロード') {
+            document.getElementById('road-section').classList.add('active');
+            document.getElementById('detail-section').classList.add('active');
+            document.getElementById('rank-label').textContent = '順位';
+        }
+    });
+});
+
+// 駅伝区間選択
+document.querySelectorAll('.section-btn').forEach(btn => {
+    btn.addEventListener('click', function() {
+        document.querySelectorAll('.section-btn').forEach(b => b.classList.remove('selected'));
+        this.classList.add('selected');
+        document.getElementById('section').value = this.dataset.section;
+        document.getElementById('event').value = this.dataset.section;
+    });
+});
+
+// トラック種目選択
+const trackDistances = {
+    '800m': 800,
+    '1500m': 1500,
+    '3000m': 3000,
+    '5000m': 5000,
+    '10000m': 10000,
+    '3000mSC': 3000
+};
+document.querySelectorAll('.track-event').forEach(btn => {
+    btn.addEventListener('click', function() {
+        document.querySelectorAll('.track-event').forEach(b => b.classList.remove('selected'));
+        this.classList.add('selected');
+        document.getElementById('event_track').value = this.dataset.event;
+        document.getElementById('event').value = this.dataset.event;
+        // 距離を自動入力
+        const dist = trackDistances[this.dataset.event];
+        if (dist) {
+            document.getElementById('distance_km').value = dist;
+            updateDistancePresets();
+            calculatePace();
+        }
+    });
+});
+
+// ロード種目選択
+const roadDistances = {
+    '5km': 5000,
+    '10km': 10000,
+    'ハーフ': 21097.5,
+    'フル': 42195
+};
+document.querySelectorAll('.road-event').forEach(btn => {
+    btn.addEventListener('click', function() {
+        document.querySelectorAll('.road-event').forEach(b => b.classList.remove('selected'));
+        this.classList.add('selected');
+        document.getElementById('event_road').value = this.dataset.event;
+        document.getElementById('event').value = this.dataset.event;
+        // 距離を自動入力
+        const dist = roadDistances[this.dataset.event];
+        if (dist) {
+            document.getElementById('distance_km').value = dist;
+            updateDistancePresets();
+            calculatePace();
+        }
+    });
+});
+
+// 距離プリセットの選択状態を更新
+function updateDistancePresets() {
+    const value = parseFloat(document.getElementById('distance_km').value);
+    document.querySelectorAll('.distance-preset-btn').forEach(btn => {
+        btn.classList.toggle('selected', parseFloat(btn.dataset.distance) === value);
+    });
+}
+
+// 距離プリセット選択
+document.querySelectorAll('.distance-preset-btn').forEach(btn => {
+    btn.addEventListener('click', function() {
+        document.querySelectorAll('.distance-preset-btn').forEach(b => b.classList.remove('selected'));
+        this.classList.add('selected');
+        document.getElementById('distance_km').value = this.dataset.distance;
+        calculatePace();
+    });
+});
+
+// 距離入力時もペース計算
+document.getElementById('distance_km').addEventListener('input', function() {
+    updateDistancePresets();
+    calculatePace();
+});
+
+// タイム入力フィールドの処理
+const timeFields = ['time_h', 'time_m', 'time_s'];
+timeFields.forEach((fieldId, index) => {
+    const field = document.getElementById(fieldId);
+
+    field.addEventListener('input', function() {
+        if (this.value.length >= 2 && index < timeFields.length - 1) {
+            document.getElementById(timeFields[index + 1]).focus();
+            document.getElementById(timeFields[index + 1]).select();
+        }
+        const max = parseInt(this.getAttribute('max'));
+        if (parseInt(this.value) > max) {
+            this.value = max;
+        }
+        updateTimeValue();
+        calculatePace();
+    });
+
+    field.addEventListener('focus', function() {
+        this.select();
+    });
+
+    field.addEventListener('keydown', function(e) {
+        if (e.key === 'ArrowUp') {
+            e.preventDefault();
+            const max = parseInt(this.getAttribute('max'));
+            let val = parseInt(this.value) || 0;
+            if (val < max) {
+                this.value = val + 1;
+                updateTimeValue();
+                calculatePace();
+            }
+        } else if (e.key === 'ArrowDown') {
+            e.preventDefault();
+            let val = parseInt(this.value) || 0;
+            if (val > 0) {
+                this.value = val - 1;
+                updateTimeValue();
+                calculatePace();
+            }
+        } else if (e.key === ':') {
+            e.preventDefault();
+            if (index < timeFields.length - 1) {
+                document.getElementById(timeFields[index + 1]).focus();
+            }
+        }
+    });
+});
+
+// タイム値を統合フィールドに反映
+function updateTimeValue() {
+    const h = parseInt(document.getElementById('time_h').value) || 0;
+    const m = parseInt(document.getElementById('time_m').value) || 0;
+    const s = parseInt(document.getElementById('time_s').value) || 0;
+
+    let timeStr = '';
+    if (h > 0) {
+        timeStr = `${h}:${m.toString().padStart(2, '0')}:${s.toString().padStart(2, '0')}`;
+    } else {
+        timeStr = `${m}:${s.toString().padStart(2, '0')}`;
+    }
+    document.getElementById('time').value = timeStr;
+}
+
+// ペース計算
+function calculatePace() {
+    const distanceM = parseFloat(document.getElementById('distance_km').value);
+    const h = parseInt(document.getElementById('time_h').value) || 0;
+    const m = parseInt(document.getElementById('time_m').value) || 0;
+    const s = parseInt(document.getElementById('time_s').value) || 0;
+
+    const totalSeconds = h * 3600 + m * 60 + s;
+    const distanceKm = distanceM / 1000;
+
+    if (distanceKm > 0 && totalSeconds > 0) {
+        const paceSeconds = totalSeconds / distanceKm;
+        const paceMin = Math.floor(paceSeconds / 60);
+        const paceSec = Math.round(paceSeconds % 60);
+
+        document.getElementById('pace-value').textContent =
+            `${paceMin}:${paceSec.toString().padStart(2, '0')}`;
+        document.getElementById('pace-display').classList.add('active');
+    } else {
+        document.getElementById('pace-display').classList.remove('active');
+    }
+}
+
+// 初期値をパースしてタイムフィールドに設定
+function parseInitialTime() {
+    const timeValue = document.getElementById('time').value;
+    if (timeValue) {
+        const parts = timeValue.split(':');
+        if (parts.length === 3) {
+            document.getElementById('time_h').value = parseInt(parts[0]) || 0;
+            document.getElementById('time_m').value = parseInt(parts[1]) || 0;
+            document.getElementById('time_s').value = parseInt(parts[2]) || 0;
+        } else if (parts.length === 2) {
+            document.getElementById('time_h').value = 0;
+            document.getElementById('time_m').value = parseInt(parts[0]) || 0;
+            document.getElementById('time_s').value = parseInt(parts[1]) || 0;
+        }
+    }
+}
+
+// 初期距離プリセットをチェック
+function checkInitialDistance() {
+    updateDistancePresets();
+}
+
+// ページロード時の初期化
+parseInitialTime();
+checkInitialDistance();
+calculatePace();
+
+// フォーム送信前のバリデーション
+document.getElementById('recordForm').addEventListener('submit', function(e) {
+    const raceType = document.getElementById('race_type').value;
+    const event = document.getElementById('event').value;
+
+    updateTimeValue();
+    const time = document.getElementById('time').value;
+
+    if (!raceType) {
+        e.preventDefault();
+        alert('大会タイプを選択してください');
+        return;
+    }
+
+    if (!event) {
+        e.preventDefault();
+        if (raceType === '駅伝') {
+            alert('区間を選択してください');
+        } else {
+            alert('種目を選択してください');
+        }
+        return;
+    }
+
+    if (!time || time === '0:00') {
+        e.preventDefault();
+        alert('タイムを入力してください');
+        return;
+    }
+});
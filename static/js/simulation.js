@@ -0,0 +1,169 @@
+let currentSection = null;
+const assignments = {}; // section -> {id, name, time}
+
+function openPlayerModal(section) {
+    currentSection = section;
+    document.getElementById('modalSectionLabel').textContent = section;
+    document.getElementById('playerModal').classList.add('show');
+    document.getElementById('playerSearchInput').value = '';
+    filterPlayers();
+    updatePlayerListStatus();
+    document.body.style.overflow = 'hidden';
+}
+
+function closePlayerModal() {
+    document.getElementById('playerModal').classList.remove('show');
+    document.body.style.overflow = '';
+    currentSection = null;
+}
+
+function updatePlayerListStatus() {
+    const assignedIds = Object.values(assignments).map(a => a.id);
+    document.querySelectorAll('.player-item').forEach(item => {
+        const playerId = item.dataset.playerId;
+        if (assignedIds.includes(playerId)) {
+            item.classList.add('assigned');
+        } else {
+            item.classList.remove('assigned');
+        }
+    });
+}
+
+function filterPlayers() {
+    const query = document.getElementById('playerSearchInput').value.toLowerCase();
+    document.querySelectorAll('.player-item').forEach(item => {
+        const name = item.dataset.playerName.toLowerCase();
+        item.style.display = name.includes(query) ? '' : 'none';
+    });
+}
+
+function selectPlayer(element) {
+    const playerId = element.dataset.playerId;
+    const playerName = element.dataset.playerName;
+    const playerTime = element.dataset.playerTime;
+
+    // 配置を保存
+    assignments[currentSection] = {
+        id: playerId,
+        name: playerName,
+        time: playerTime
+    };
+
+    // スロットを更新
+    updateSlot(currentSection, playerName, playerTime);
+
+    closePlayerModal();
+}
+
+function updateSlot(section, name, time) {
+    const slot = document.querySelector(`.section-slot[data-section="${section}"]`);
+    slot.classList.add('has-player');
+    slot.innerHTML = `
+        <div class="selected-player">
+            <div class="selected-player-info">
+                <i class="bi bi-person-fill" style="color: #6366f1;"></i>
+                <div>
+                    <div class="selected-player-name">${name}</div>
+                    ${time ? `<div class="selected-player-time">${time}</div>` : ''}
+                </div>
+            </div>
+            <button class="remove-player" onclick="event.stopPropagation(); removePlayer(${section})">
+                <i class="bi bi-x"></i>
+            </button>
+        </div>
+    `;
+}
+
+function removePlayer(section) {
+    delete assignments[section];
+    const slot = document.querySelector(`.section-slot[data-section="${section}"]`);
+    slot.classList.remove('has-player');
+    slot.innerHTML = `
+        <div class="placeholder">
+            <i class="bi bi-person-plus"></i>
+            タップして選手を選択
+        </div>
+    `;
+}
+
+function saveSimulation() {
+    const title = document.getElementById('simTitle').value;
+    if (!title) {
+        alert('シミュレーション名を入力してください');
+        return;
+    }
+
+    if (Object.keys(assignments).length === 0) {
+        alert('少なくとも1人の選手を配置してください');
+        return;
+    }
+
+    const orderData = {};
+    for (const [section, player] of Object.entries(assignments)) {
+        orderData[section + '区'] = player.name;
+    }
+
+    fetch('/simulation/save', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({title: title, order_data: orderData})
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            alert('保存しました');
+            location.reload();
+        } else {
+            alert('保存に失敗しました');
+        }
+    })
+    .catch(() => {
+        alert('通信エラーが発生しました');
+    });
+}
+
+function openSimulation(rowIndex) {
+    fetch(`/api/simulation/${rowIndex}`)
+        .then(response => response.json())
+        .then(data => {
+            if (data.data) {
+                loadSimulation(data.data.title, data.data.order_data);
+            } else {
+                alert('読み込みに失敗しました');
+            }
+        })
+        .catch(() => {
+            alert('通信エラーが発生しました');
+        });
+}
+
+function loadSimulation(title, orderData) {
+    document.getElementById('simTitle').value = title;
+
+    // 全スロットをリセット
+    for (let i = 1; i <= 7; i++) {
+        removePlayer(i);
+    }
+
+    // オーダーを復元
+    for (const [section, playerName] of Object.entries(orderData)) {
+        const sectionNum = parseInt(section.replace('区', ''));
+        const playerItem = document.querySelector(`.player-item[data-player-name="${playerName}"]`);
+
+        if (playerItem) {
+            assignments[sectionNum] = {
+                id: playerItem.dataset.playerId,
+                name: playerName,
+                time: playerItem.dataset.playerTime
+            };
+            updateSlot(sectionNum, playerName, playerItem.dataset.playerTime);
+        }
+    }
+}
+
+// モーダル外タップで閉じる
+document.getElementById('playerModal').addEventListener('click', function(e) {
+    if (e.target === this) {
+        closePlayerModal();
+    }
+});
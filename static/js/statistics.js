@@ -0,0 +1,63 @@
+// グループ別人数（ドーナツ）
+const groupCtx = document.getElementById('groupChart').getContext('2d');
+new Chart(groupCtx, {
+    type: 'doughnut',
+    data: {
+        labels: Object.keys(groupData),
+        datasets: [{
+            data: Object.values(groupData),
+            backgroundColor: [
+                '#3B82F6', '#10B981', '#F59E0B', '#EF4444', '#8B5CF6', '#EC4899'
+            ],
+            borderWidth: 0
+        }]
+    },
+    options: {
+        responsive: true,
+        maintainAspectRatio: false,
+        plugins: {
+            legend: {
+                position: 'bottom',
+                labels: {
+                    boxWidth: 12,
+                    padding: 8,
+                    font: { size: 11 }
+                }
+            }
+        },
+        cutout: '60%'
+    }
+});
+
+// 種目別記録数（横棒）
+const eventCtx = document.getElementById('eventChart').getContext('2d');
+new Chart(eventCtx, {
+    type: 'bar',
+    data: {
+        labels: Object.keys(eventData),
+        datasets: [{
+            label: '記録数',
+            data: Object.values(eventData),
+            backgroundColor: '#3B82F6',
+            borderRadius: 4
+        }]
+    },
+    options: {
+        indexAxis: 'y',
+        responsive: true,
+        maintainAspectRatio: false,
+        plugins: {
+            legend: { display: false }
+        },
+        scales: {
+            x: {
+                beginAtZero: true,
+                grid: { display: false }
+            },
+            y: {
+                grid: { display: false },
+                ticks: { font: { size: 11 } }
+            }
+        }
+    }
+});
@@ -0,0 +1,31 @@
+// タイム入力の自動フォーマット
+const timeInputs = ['time_h', 'time_m', 'time_s'];
+timeInputs.forEach((id, index) => {
+    const input = document.getElementById(id);
+    input.addEventListener('input', function() {
+        // 数字以外を除去
+        this.value = this.value.replace(/[^0-9]/g, '');
+        // 2桁になったら次へ
+        if (this.value.length >= 2 && index < timeInputs.length - 1) {
+            document.getElementById(timeInputs[index + 1]).focus();
+        }
+        updateTotalTime();
+    });
+});
+
+function updateTotalTime() {
+    const h = document.getElementById('time_h').value.padStart(2, '0');
+    const m = document.getElementById('time_m').value.padStart(2, '0');
+    const s = document.getElementById('time_s').value.padStart(2, '0');
+    document.getElementById('total_time').value = `${h}:${m}:${s}`;
+}
+
+// フォーム送信前にタイム確認
+document.getElementById('addForm').addEventListener('submit', function(e) {
+    const totalTime = document.getElementById('total_time').value;
+    if (!totalTime || totalTime === '00:00:00') {
+        e.preventDefault();
+        alert('総合タイムを入力してください');
+        document.getElementById('time_h').focus();
+    }
+});
@@ -1,14 +1,24 @@
+// ASSET_VERSION・PRECACHE_ASSETS は /sw.js の配信時にサーバーが埋め込む
 const CACHE_NAME = 'ekiden-app-v1';
-const STATIC_CACHE = 'ekiden-static-v1';
+const STATIC_CACHE = 'ekiden-static-' + (self.ASSET_VERSION || 'v1');
 
-// 静的ファイルのキャッシュリスト
+// 静的ファイルのキャッシュリスト（CSS/JSのバンドルは内容ハッシュ付きURL）
 const STATIC_ASSETS = [
     '/',
     '/static/manifest.json',
     'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css',
     'https://cdn.jsdelivr.net/npm/bootstrap-icons@1.10.0/font/bootstrap-icons.css',
     'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js'
-];
+].concat(self.PRECACHE_ASSETS || []);
+
+// オフライン用データ（/api/snapshot）をIndexedDBに保存する
+const SNAPSHOT_URL = '/api/snapshot';
+const DB_NAME = 'ekiden-offline';
+const DB_STORE = 'snapshot';
+const SNAPSHOT_REFRESH_INTERVAL = 5 * 60 * 1000;  // バックグラウンド更新の最短間隔（ミリ秒）
+
+// 表示直後はキャッシュを返し、裏で最新を取得する画面
+const KEY_VIEW_PATTERNS = [/^\/$/, /^\/player\/[^/]+$/, /^\/calendar$/];
 
 // インストール時にキャッシュ
 self.addEventListener('install', event => {
@@ -18,6 +28,7 @@ self.addEventListener('install', event => {
                 console.log('Caching static assets');
                 return cache.addAll(STATIC_ASSETS);
             })
+            .then(() => refreshSnapshot().catch(() => null))
             .then(() => self.skipWaiting())
     );
 });
@@ -40,8 +51,17 @@ self.addEventListener('fetch', event => {
     const { request } = event;
     const url = new URL(request.url);
 
-    // POSTリクエストはキャッシュしない
+    // POSTリクエストはキャッシュしない（更新後に古い画面を出さないよう、主要画面のキャッシュを捨てる）
     if (request.method !== 'GET') {
+        if (url.origin === self.location.origin) {
+            event.waitUntil(invalidateKeyViews());
+        }
+        return;
+    }
+
+    // オフライン用データはIndexedDBから即座に返し、裏で更新
+    if (url.origin === self.location.origin && url.pathname === SNAPSHOT_URL) {
+        event.respondWith(snapshotResponse(event));
         return;
     }
 
@@ -62,6 +82,13 @@ self.addEventListener('fetch', event => {
         return;
     }
 
+    // 主要画面はキャッシュを即座に返し、裏で再検証
+    if (request.mode === 'navigate' && url.origin === self.location.origin &&
+        KEY_VIEW_PATTERNS.some(pattern => pattern.test(url.pathname))) {
+        event.respondWith(staleWhileRevalidate(event));
+        return;
+    }
+
     // その他はネットワーク優先（オフライン時はキャッシュ）
     event.respondWith(networkFirst(request));
 });
@@ -98,10 +125,205 @@ async function networkFirst(request) {
         if (cached) {
             return cached;
         }
-        // オフラインページを返す
-        return caches.match('/') || new Response(
-            '<html><body><h1>オフラインです</h1><p>ネットワーク接続を確認してください。</p></body></html>',
-            { headers: { 'Content-Type': 'text/html; charset=utf-8' } }
-        );
+        return offlineResponse(request);
+    }
+}
+
+// キャッシュを返しつつ裏で再検証（内容が変わっていたら画面に通知）
+async function staleWhileRevalidate(event) {
+    const { request } = event;
+    const cache = await caches.open(CACHE_NAME);
+    const cached = await cache.match(request);
+
+    const revalidate = fetch(request).then(async response => {
+        // ETagのないレスポンス（フラッシュメッセージ表示中など）は保存しない
+        if (response.ok && response.headers.get('ETag')) {
+            await cache.put(request, response.clone());
+            if (cached && cached.headers.get('ETag') !== response.headers.get('ETag')) {
+                notifyClients({ type: 'page-updated', url: request.url });
+            }
+        }
+        return response;
+    });
+    event.waitUntil(revalidate.catch(() => null).then(() => refreshSnapshotIfStale()));
+
+    if (cached) {
+        return cached;
+    }
+    try {
+        return await revalidate;
+    } catch (error) {
+        return offlineResponse(request);
+    }
+}
+
+async function invalidateKeyViews() {
+    const cache = await caches.open(CACHE_NAME);
+    const keys = await cache.keys();
+    await Promise.all(keys
+        .filter(key => KEY_VIEW_PATTERNS.some(pattern => pattern.test(new URL(key.url).pathname)))
+        .map(key => cache.delete(key)));
+}
+
+async function notifyClients(message) {
+    const clientList = await self.clients.matchAll({ type: 'window' });
+    clientList.forEach(client => client.postMessage(message));
+}
+
+// ============ IndexedDB（オフライン用データ） ============
+
+function openDb() {
+    return new Promise((resolve, reject) => {
+        const req = indexedDB.open(DB_NAME, 1);
+        req.onupgradeneeded = () => req.result.createObjectStore(DB_STORE);
+        req.onsuccess = () => resolve(req.result);
+        req.onerror = () => reject(req.error);
+    });
+}
+
+async function idbGet(key) {
+    const db = await openDb();
+    return new Promise((resolve, reject) => {
+        const req = db.transaction(DB_STORE, 'readonly').objectStore(DB_STORE).get(key);
+        req.onsuccess = () => resolve(req.result);
+        req.onerror = () => reject(req.error);
+    });
+}
+
+async function idbPut(key, value) {
+    const db = await openDb();
+    return new Promise((resolve, reject) => {
+        const tx = db.transaction(DB_STORE, 'readwrite');
+        tx.objectStore(DB_STORE).put(value, key);
+        tx.oncomplete = () => resolve();
+        tx.onerror = () => reject(tx.error);
+    });
+}
+
+// スナップショットを取得してIndexedDBに保存（ETagが同じなら本文は取得しない）
+async function refreshSnapshot() {
+    const stored = await idbGet('latest');
+    const headers = stored && stored.etag ? { 'If-None-Match': stored.etag } : {};
+    const response = await fetch(SNAPSHOT_URL, { headers, cache: 'no-store' });
+    if (response.status === 304 && stored) {
+        stored.checkedAt = Date.now();
+        await idbPut('latest', stored);
+        return stored;
+    }
+    if (!response.ok) {
+        throw new Error('snapshot fetch failed: ' + response.status);
+    }
+    const body = await response.json();
+    const entry = { etag: response.headers.get('ETag'), data: body.data, checkedAt: Date.now() };
+    await idbPut('latest', entry);
+    return entry;
+}
+
+async function refreshSnapshotIfStale() {
+    try {
+        const stored = await idbGet('latest');
+        if (!stored || Date.now() - stored.checkedAt > SNAPSHOT_REFRESH_INTERVAL) {
+            await refreshSnapshot();
+        }
+    } catch (error) {
+        // オフライン時は次の機会に更新
+    }
+}
+
+async function snapshotResponse(event) {
+    let stored = null;
+    try {
+        stored = await idbGet('latest');
+    } catch (error) {
+        stored = null;
+    }
+    if (stored) {
+        event.waitUntil(refreshSnapshotIfStale());
+        return jsonResponse({ data: stored.data, cached_at: stored.checkedAt });
+    }
+    try {
+        const entry = await refreshSnapshot();
+        return jsonResponse({ data: entry.data });
+    } catch (error) {
+        return jsonResponse({ error: 'オフラインのためデータがありません' }, 503);
+    }
+}
+
+function jsonResponse(body, status = 200) {
+    return new Response(JSON.stringify(body), {
+        status,
+        headers: { 'Content-Type': 'application/json; charset=utf-8' }
+    });
+}
+
+// ============ オフライン画面（IndexedDBのデータから生成） ============
+
+function escapeHtml(value) {
+    return String(value == null ? '' : value).replace(/[&<>"']/g, c => ({
+        '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+    }[c]));
+}
+
+function offlinePage(title, body, checkedAt) {
+    const updated = checkedAt ? new Date(checkedAt).toLocaleString('ja-JP') : '-';
+    return new Response(`<!DOCTYPE html>
+<html lang="ja"><head><meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>${escapeHtml(title)}（オフライン）</title>
+<link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
+</head><body class="bg-light"><div class="container py-3">
+<div class="alert alert-warning py-2 small">オフライン表示中（${escapeHtml(updated)} 時点のデータ）</div>
+<h5 class="mb-3">${escapeHtml(title)}</h5>
+${body}
+<p class="mt-3"><a href="/">選手一覧</a> / <a href="/calendar">カレンダー</a></p>
+</div></body></html>`, { headers: { 'Content-Type': 'text/html; charset=utf-8' } });
+}
+
+async function offlineResponse(request) {
+    const url = new URL(request.url);
+    let stored = null;
+    try {
+        stored = await idbGet('latest');
+    } catch (error) {
+        stored = null;
+    }
+
+    if (stored && request.mode === 'navigate') {
+        const data = stored.data;
+        const playerMatch = url.pathname.match(/^\/player\/([^/]+)$/);
+        if (url.pathname === '/') {
+            const rows = data.players.map(p => `<a class="list-group-item list-group-item-action" href="/player/${encodeURIComponent(p.id)}">
+                ${escapeHtml(p.name)} <small class="text-muted">${escapeHtml(p.grade)} ${escapeHtml(p.affiliation)}</small>
+                ${p.pb_5000m ? `<span class="float-end">5000m ${escapeHtml(p.pb_5000m)}</span>` : ''}</a>`).join('');
+            return offlinePage('選手一覧', `<div class="list-group">${rows}</div>`, stored.checkedAt);
+        }
+        if (playerMatch) {
+            const playerId = decodeURIComponent(playerMatch[1]);
+            const player = data.players.find(p => String(p.id) === playerId);
+            if (player) {
+                const rows = data.records.filter(r => String(r.player_id) === playerId).map(r => `<tr>
+                    <td>${escapeHtml(r.date)}</td><td>${escapeHtml(r.race_name || r.event)}</td>
+                    <td>${escapeHtml(r.section ? r.section + '区' : r.event)}</td><td class="text-end">${escapeHtml(r.time)}</td></tr>`).join('');
+                const pbs = ['1500m', '3000m', '5000m', '10000m', 'half', 'full']
+                    .filter(k => player['pb_' + k])
+                    .map(k => `<span class="badge bg-secondary me-1">${k} ${escapeHtml(player['pb_' + k])}</span>`).join('');
+                return offlinePage(player.name, `<p>${pbs}</p>
+                    <table class="table table-sm bg-white"><tbody>${rows || '<tr><td>直近の記録はありません</td></tr>'}</tbody></table>`,
+                    stored.checkedAt);
+            }
+        }
+        if (url.pathname === '/calendar') {
+            const rows = data.events.map(e => `<li class="list-group-item">
+                <strong>${escapeHtml(e.date)}</strong> ${escapeHtml(e.start_time)} ${escapeHtml(e.title)}
+                <small class="text-muted">${escapeHtml(e.location)}</small></li>`).join('');
+            return offlinePage(`${data.month} の予定`, `<ul class="list-group">${rows || '<li class="list-group-item">予定はありません</li>'}</ul>`,
+                stored.checkedAt);
+        }
     }
+
+    // オフラインページを返す
+    return (await caches.match('/')) || new Response(
+        '<html><body><h1>オフラインです</h1><p>ネットワーク接続を確認してください。</p></body></html>',
+        { headers: { 'Content-Type': 'text/html; charset=utf-8' } }
+    );
 }
@@ -0,0 +1,210 @@
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+import gspread
+from services import sheet_api, render_cache, compression, metrics
+
+# ============ Sheets APIのフェイク（メモリ上） ============
+# sheet_api が使う gspread の Spreadsheet / Worksheet と同じメソッドをメモリ上で実装する。
+# 認証情報なしでアプリを動かし、ルートごとのAPI呼び出し回数を数えるために使う。
+# 呼び出しごとに遅延を入れられるので、本番のレイテンシを模した計測もできる。
+
+# 書き込みのメソッド（呼び出すとスプレッドシートの更新日時が進む）
+WRITE_METHODS = {'append_row', 'append_rows', 'update', 'update_acell', 'delete_rows', 'add_worksheet'}
+
+_A1_PATTERN = re.compile(r'^([A-Z]+)(\d+)')
+
+
+def _column_index(letters):
+    """A1形式の列名（A, B, ..., AA）を0始まりの列番号に変換"""
+    index = 0
+    for ch in letters:
+        index = index * 26 + (ord(ch) - ord('A') + 1)
+    return index - 1
+
+
+def _parse_a1(cell):
+    """'B5' → (行番号(1始まり), 列番号(0始まり))"""
+    m = _A1_PATTERN.match(cell)
+    if not m:
+        raise ValueError(f'A1形式ではありません: {cell}')
+    return int(m.group(2)), _column_index(m.group(1))
+
+
+class CallLog:
+    """API呼び出し回数の記録（(メソッド名, シート名) ごと、スレッドセーフ）"""
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, method, title=None):
+        with self._lock:
+            self._counts[(method, title)] += 1
+
+    def total(self):
+        """呼び出し回数の合計"""
+        with self._lock:
+            return sum(self._counts.values())
+
+    def snapshot(self):
+        """現在の回数のコピー"""
+        with self._lock:
+            return Counter(self._counts)
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+
+class FakeWorksheet:
+    """gspread.Worksheet のフェイク"""
+
+    def __init__(self, spreadsheet, title, values=None):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self._values = [[str(c) for c in row] for row in (values or [])]
+
+    def _call(self, method):
+        self.spreadsheet._call(method, self.title)
+
+    def get_all_values(self, **kwargs):
+        self._call('get_all_values')
+        with self.spreadsheet.lock:
+            return [list(row) for row in self._values]
+
+    def row_values(self, row, **kwargs):
+        self._call('row_values')
+        with self.spreadsheet.lock:
+            return list(self._values[row - 1]) if row <= len(self._values) else []
+
+    def col_values(self, col, **kwargs):
+        self._call('col_values')
+        with self.spreadsheet.lock:
+            values = [row[col - 1] if len(row) >= col else '' for row in self._values]
+        # 実際のAPIと同じく末尾の空セルは返さない
+        while values and values[-1] == '':
+            values.pop()
+        return values
+
+    def append_row(self, values, **kwargs):
+        self._call('append_row')
+        with self.spreadsheet.lock:
+            self._values.append(['' if v is None else str(v) for v in values])
+
+    def append_rows(self, values, **kwargs):
+        self._call('append_rows')
+        with self.spreadsheet.lock:
+            for row in values:
+                self._values.append(['' if v is None else str(v) for v in row])
+
+    def update(self, *args, **kwargs):
+        """update('A2:V2', [[...]]) と update([[...]], 'A2:V2') の両方の引数順に対応"""
+        self._call('update')
+        if args and isinstance(args[0], str):
+            range_name, values = args[0], args[1]
+        else:
+            values, range_name = args[0], args[1] if len(args) > 1 else kwargs.get('range_name', 'A1')
+        start_row, start_col = _parse_a1(range_name.split(':')[0])
+        with self.spreadsheet.lock:
+            for offset, row in enumerate(values):
+                self._set_row(start_row + offset, start_col, row)
+
+    def update_acell(self, label, value):
+        self._call('update_acell')
+        row, col = _parse_a1(label)
+        with self.spreadsheet.lock:
+            self._set_row(row, col, [value])
+
+    def delete_rows(self, start_index, end_index=None):
+        self._call('delete_rows')
+        with self.spreadsheet.lock:
+            del self._values[start_index - 1:(end_index or start_index)]
+
+    def _set_row(self, row, col, values):
+        """row行目のcol列目から値を書き込む（足りない行・列は空セルで埋める）"""
+        while len(self._values) < row:
+            self._values.append([])
+        target = self._values[row - 1]
+        if len(target) < col + len(values):
+            target.extend([''] * (col + len(values) - len(target)))
+        for i, value in enumerate(values):
+            target[col + i] = '' if value is None else str(value)
+
+
+class FakeSpreadsheet:
+    """gspread.Spreadsheet のフェイク
+
+    Args:
+        latency: 1回のAPI呼び出しにかける秒数、または (メソッド名, シート名) を受け取り秒数を返す関数
+    """
+
+    def __init__(self, latency=0.0):
+        self.calls = CallLog()
+        self.latency = latency
+        self.lock = threading.RLock()
+        self._worksheets = {}
+        self._modified = datetime(2025, 1, 1)
+
+    def _call(self, method, title=None):
+        self.calls.add(method, title)
+        delay = self.latency(method, title) if callable(self.latency) else self.latency
+        if delay:
+            time.sleep(delay)
+        if method in WRITE_METHODS:
+            with self.lock:
+                self._modified += timedelta(seconds=1)
+
+    def load(self, title, values):
+        """シートを丸ごと置き換える（API呼び出しとして数えない）"""
+        with self.lock:
+            self._worksheets[title] = FakeWorksheet(self, title, values)
+            self._modified += timedelta(seconds=1)
+        return self._worksheets[title]
+
+    def worksheet(self, title):
+        # 実際のgspreadはシート名の解決にメタデータを取得する（1回のAPI呼び出し）
+        self._call('worksheet', title)
+        with self.lock:
+            if title not in self._worksheets:
+                raise gspread.exceptions.WorksheetNotFound(title)
+            return self._worksheets[title]
+
+    def add_worksheet(self, title, rows=0, cols=0, **kwargs):
+        self._call('add_worksheet', title)
+        with self.lock:
+            self._worksheets[title] = FakeWorksheet(self, title)
+            return self._worksheets[title]
+
+    def worksheets(self, **kwargs):
+        self._call('worksheets')
+        with self.lock:
+            return list(self._worksheets.values())
+
+    def get_lastUpdateTime(self):
+        self._call('get_lastUpdateTime')
+        with self.lock:
+            return self._modified.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+
+def install(spreadsheet):
+    """sheet_api がフェイクのスプレッドシートを使うようにし、キャッシュを空にする"""
+    sheet_api._spreadsheet = metrics.instrument_spreadsheet(spreadsheet)
+    reset_caches()
+    return spreadsheet
+
+
+def reset_caches():
+    """sheet_api・描画結果・圧縮のキャッシュをすべて空にする（初回アクセスの状態に戻す）"""
+    sheet_api.clear_cache()
+    sheet_api._derived_cache.clear()
+    sheet_api._fetched_modified.clear()
+    sheet_api._pending_modified.clear()
+    sheet_api._modified_time.update(value=None, checked_at=0.0)
+    sheet_api._restored_keys.clear()
+    render_cache.pages.clear()
+    render_cache.fragments.clear()
+    compression.clear()
+
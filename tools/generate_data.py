@@ -0,0 +1,348 @@
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+from datetime import date, datetime, timedelta
+from services import sheet_api
+from tools import fake_sheets
+
+# ============ 大規模データの生成 ============
+# 規模を指定して、sheet_api が読むのと同じレイアウト（1行目=物理名, 2行目=論理名, 3行目以降=データ）の
+# Players・Records・Races・TeamRecords・Attendance・PracticeLogs・Events・Masters・Simulations と
+# 縦断駅伝の 個人・区間距離・区間気温 シートを作る。フェイクのSheets APIに読み込むか、CSVに書き出す。
+# 使い方: python -m tools.generate_data --players 5000 --records 1000000 --editions 60 --out data/
+
+# 既定の規模（現在のスプレッドシートと同程度）
+DEFAULTS = {
+    'players': 60,
+    'records': 200,
+    'editions': 9,
+    'attendance_days': 30,
+    'practice_logs': 30,
+    'events': 30,
+}
+
+LATEST_EDITION = 68
+LATEST_EDITION_YEAR = 2025
+
+LOGICAL_HEADERS = {
+    'Players': ['システムID', '登録番号', '姓', '名', '生年月日', '学年', '所属', '区分', '状態', '役職', '出場回数',
+                'PB 1500m', 'PB 3000m', 'PB 5000m', 'PB 10000m', 'PB ハーフ', 'PB フル',
+                '備考', '写真URL', '削除フラグ', '作成日時', '更新日時'],
+    'Records': ['記録ID', '選手ID', '大会ID', '日付', '種目', '区間', '距離(m)', 'タイム', 'タイム(秒)',
+                'PBフラグ', '区間記録フラグ', 'スプリット', '区間順位', 'メモ', '作成日時', '更新日時',
+                '選手名', '大会名', '大会タイプ', 'チーム記録ID'],
+    'Races': ['大会ID', '大会名', '略称', '開催地', '大会タイプ', '区間数', '重要度', '備考', '作成日時', '更新日時'],
+    'TeamRecords': ['チーム記録ID', '大会ID', '回数', '開催日', '総合タイム', '総合タイム(秒)', '総合順位', '出場チーム数',
+                    '出場カテゴリ', 'チーム名', 'メモ', '作成日時', '更新日時'],
+    'Masters': ['マスタ種別', 'コード値', '表示名', '表示順', 'メモ'],
+    'Events': ['予定ID', '日付', '種別', 'タイトル', '開始時刻', '終了時刻', '場所', 'メモ', '作成日時', '更新日時'],
+    'PracticeLogs': ['日誌ID', '日付', 'タイトル', '内容', 'メニューデータ', '天候', '気温', '参加人数', 'メモ', '作成日時', '更新日時'],
+    'Attendance': ['出欠ID', '日付', '選手ID', '出欠', '備考', '作成日時'],
+}
+
+SURNAMES = ['佐藤', '鈴木', '高橋', '田中', '伊藤', '渡辺', '山本', '中村', '小林', '加藤', '吉田', '山田', '佐々木', '斎藤', '阿部']
+GIVEN_NAMES = ['翔', '蓮', '大輝', '陸', '悠斗', '健太', '拓海', '颯', '優', '美咲', '結衣', '葵', '陽菜', '彩花', '真央']
+
+# 種目 → 距離（km）
+TRACK_EVENTS = {'1500m': 1.5, '3000m': 3.0, '5000m': 5.0, '10000m': 10.0, 'ハーフ': 21.0975}
+
+# (大会ID, 大会名, 略称, 開催地, 大会タイプ, 区間数, 重要度)
+RACES = [
+    ('RAC001', '山形県縦断駅伝競走大会', '縦断', '山形', '駅伝', 29, 'A'),
+    ('RAC002', '記録会', '記録会', 'NDソフトスタジアム', 'トラック', 0, 'C'),
+    ('RAC003', '山形県陸上競技選手権大会', '県選手権', 'NDソフトスタジアム', 'トラック', 0, 'A'),
+    ('RAC004', 'さくらんぼマラソン', 'さくらんぼ', '東根', 'ロード', 0, 'B'),
+    ('RAC005', '郡市対抗駅伝', '郡市駅伝', '天童', '駅伝', 7, 'B'),
+]
+
+MASTERS = [
+    ('category_list', ['大学生', '社会人', '高校生', '中学生']),
+    ('status_list', ['現役', '引退', '休部']),
+    ('grade_list', ['1年', '2年', '3年', '4年']),
+    ('affiliation_list', ['山形大学', '東北芸工大', '県庁', '市役所', '山形中央高']),
+    ('role_list', ['主将', '副主将', 'マネージャー']),
+    ('race_type_list', ['トラック', 'ロード', '駅伝']),
+    ('importance_list', ['A', 'B', 'C']),
+    ('event_type_list', ['練習', '大会', '合宿', 'ミーティング']),
+    ('weather_list', ['晴', '曇', '雨', '雪']),
+]
+
+ATTENDANCE_STATUSES = ['出席', '出席', '出席', '欠席', '遅刻', '早退']
+
+
+def format_time(seconds):
+    """秒数を M:SS（1時間以上は H:MM:SS）に変換"""
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f'{hours}:{minutes:02d}:{secs:02d}'
+    return f'{minutes}:{secs:02d}'
+
+
+def predict_seconds(base_pace, distance_km):
+    """5kmのペース（秒/km）から距離に応じたタイムを求める（Riegelの式）"""
+    return base_pace * 5.0 * (distance_km / 5.0) ** 1.06
+
+
+def _table(title, rows):
+    """物理名・論理名の2行のヘッダーを付ける"""
+    headers = {
+        'Players': sheet_api.PLAYER_EXPECTED_HEADERS,
+        'Records': sheet_api.RECORD_EXPECTED_HEADERS,
+        'Races': sheet_api.RACES_EXPECTED_HEADERS,
+        'TeamRecords': sheet_api.TEAM_RECORDS_EXPECTED_HEADERS,
+        'Masters': sheet_api.MASTERS_EXPECTED_HEADERS,
+        'Events': sheet_api.EVENTS_EXPECTED_HEADERS,
+        'PracticeLogs': sheet_api.PRACTICE_LOGS_EXPECTED_HEADERS,
+        'Attendance': sheet_api.ATTENDANCE_EXPECTED_HEADERS,
+    }[title]
+    yield list(headers)
+    yield list(LOGICAL_HEADERS[title])
+    for row in rows:
+        yield [str(row.get(h, '')) for h in headers]
+
+
+def _players(rng, count, now):
+    """選手（能力=5kmのペース を合わせて返す）"""
+    players = []
+    for i in range(1, count + 1):
+        base_pace = rng.uniform(168, 240)
+        category = rng.choice(['大学生', '社会人', '社会人', '高校生'])
+        status = '現役' if rng.random() < 0.7 else rng.choice(['引退', '休部'])
+        player = {
+            'id': f'P{i:03d}', 'registration_number': f'{rng.randint(10000000, 99999999)}',
+            'name_sei': rng.choice(SURNAMES), 'name_mei': f'{rng.choice(GIVEN_NAMES)}{i}',
+            'birth_date': f'{rng.randint(1960, 2010)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}',
+            'grade': rng.choice(['1年', '2年', '3年', '4年']) if category in ('大学生', '高校生') else '',
+            'affiliation': rng.choice(['山形大学', '東北芸工大', '県庁', '市役所', '山形中央高']),
+            'category': category, 'status': status, 'race_count': '0',
+            'is_deleted': 'TRUE' if rng.random() < 0.02 else 'FALSE',
+            'created_at': now, 'updated_at': now,
+        }
+        for event in ('1500m', '5000m', '10000m'):
+            if rng.random() < 0.8:
+                player[f'pb_{event}'] = format_time(predict_seconds(base_pace, TRACK_EVENTS[event]) * rng.uniform(0.97, 1.0))
+        players.append((player, base_pace))
+    return players
+
+
+def _team_records(editions, now):
+    """駅伝大会ごと・年ごとのチーム記録"""
+    records = []
+    first_year = LATEST_EDITION_YEAR - editions + 1
+    for race_id, race_name, _, _, race_type, sections, _ in RACES:
+        if race_type != '駅伝':
+            continue
+        for year in range(first_year, LATEST_EDITION_YEAR + 1):
+            edition = LATEST_EDITION - (LATEST_EDITION_YEAR - year)
+            records.append({
+                'team_record_id': '', 'race_id': race_id, 'edition': str(edition), 'date': f'{year}-11-0{1 + year % 3}',
+                'total_teams': '11', 'team_name': '南陽東置賜', 'category': '一般',
+                'created_at': now, 'updated_at': now, '_sections': sections, '_race_name': race_name,
+            })
+    # 縦断駅伝の最新回を TR001 にする（計測ツールの既定URLで使う）
+    records.sort(key=lambda r: (r['race_id'] != 'RAC001', -int(r['edition'])))
+    for i, record in enumerate(records, 1):
+        record['team_record_id'] = f'TR{i:03d}'
+    return records
+
+
+def _records(rng, count, players, team_records, first_year, now):
+    """記録（新しいチーム記録から順に区間記録を件数の半分まで + 残りはトラック・ロードの記録）"""
+    active = [(p, pace) for p, pace in players if p['is_deleted'] != 'TRUE']
+    record_id = 0
+    for team_record in team_records:
+        total = 0
+        for section in range(1, team_record['_sections'] + 1):
+            if record_id >= count // 2:
+                break
+            player, pace = rng.choice(active)
+            distance = round(rng.uniform(3, 12), 1)
+            seconds = predict_seconds(pace, distance) * rng.uniform(0.98, 1.08)
+            total += seconds
+            record_id += 1
+            yield {
+                'record_id': f'R{record_id:03d}', 'player_id': player['id'], 'race_id': team_record['race_id'],
+                'date': team_record['date'], 'event': '駅伝', 'section': str(section),
+                'distance_m': str(distance * 1000), 'time': format_time(seconds), 'is_pb': 'FALSE',
+                'is_section_record': 'FALSE', 'rank_in_section': str(rng.randint(1, 11)),
+                'created_at': now, 'updated_at': now, 'player_name': f"{player['name_sei']} {player['name_mei']}",
+                'race_name': team_record['_race_name'], 'race_type': '駅伝',
+                'team_record_id': team_record['team_record_id'],
+            }
+        team_record['total_time'] = format_time(total)
+        team_record['total_time_sec'] = str(int(total))
+        team_record['rank'] = str(rng.randint(1, 11))
+
+    individual_races = [r for r in RACES if r[4] != '駅伝']
+    days = (date(LATEST_EDITION_YEAR, 12, 31) - date(first_year, 1, 1)).days
+    while record_id < count:
+        player, pace = rng.choice(active)
+        race_id, race_name, _, _, race_type, _, _ = rng.choice(individual_races)
+        event = 'ハーフ' if race_type == 'ロード' else rng.choice(['1500m', '3000m', '5000m', '10000m'])
+        seconds = predict_seconds(pace, TRACK_EVENTS[event]) * rng.uniform(0.98, 1.1)
+        record_id += 1
+        yield {
+            'record_id': f'R{record_id:03d}', 'player_id': player['id'], 'race_id': race_id,
+            'date': (date(first_year, 1, 1) + timedelta(days=rng.randint(0, days))).isoformat(),
+            'event': event, 'time': format_time(seconds), 'is_pb': 'FALSE', 'is_section_record': 'FALSE',
+            'created_at': now, 'updated_at': now, 'player_name': f"{player['name_sei']} {player['name_mei']}",
+            'race_name': race_name, 'race_type': race_type,
+        }
+
+
+def _attendance(rng, days, players, today, now):
+    """直近の練習日ごとの出欠（現役選手の一部）"""
+    active = [p for p, _ in players if p['status'] == '現役' and p['is_deleted'] != 'TRUE']
+    attendance_id = 0
+    for offset in range(days - 1, -1, -1):
+        day = (today - timedelta(days=offset)).isoformat()
+        for player in rng.sample(active, int(len(active) * 0.6)):
+            attendance_id += 1
+            yield {'attendance_id': f'ATT{attendance_id:03d}', 'date': day, 'player_id': player['id'],
+                   'status': rng.choice(ATTENDANCE_STATUSES), 'created_at': now}
+
+
+def _ekiden_sheets(rng, editions):
+    """縦断駅伝の 個人・区間距離・区間気温 シート（区間ごとにタイム順で順位を付ける）"""
+    legs = sheet_api.get_ekiden_legs()
+    teams = sheet_api.get_ekiden_teams()
+    individual = [['チーム', '回数'] + legs]
+    distance = [['回数'] + legs]
+    temperature = [['回数'] + legs]
+    for edition in range(LATEST_EDITION - editions + 1, LATEST_EDITION + 1):
+        year = LATEST_EDITION_YEAR - (LATEST_EDITION - edition)
+        distances = [round(rng.uniform(5, 12), 1) for _ in legs]
+        distance.append([str(edition)] + [str(d) for d in distances])
+        temperature.append([str(edition)] + [str(round(rng.uniform(5, 25), 1)) for _ in legs])
+        strengths = [rng.uniform(0.95, 1.08) for _ in teams]
+        times = [[d * 180 * strength * rng.uniform(0.96, 1.06) for d in distances] for strength in strengths]
+        for ti, team in enumerate(teams):
+            row = [team, str(edition)]
+            for li in range(len(legs)):
+                seconds = times[ti][li]
+                rank = 1 + sum(1 for other in times if other[li] < seconds)
+                name = f'{rng.choice(SURNAMES)}{rng.choice(GIVEN_NAMES)}'
+                row.append(f'{name}_{year - rng.randint(16, 45)}_Runner{ti}{li}_{team}_{rank}_{format_time(seconds)}')
+            individual.append(row)
+    return individual, distance, temperature
+
+
+def generate(players=DEFAULTS['players'], records=DEFAULTS['records'], editions=DEFAULTS['editions'],
+             attendance_days=DEFAULTS['attendance_days'], practice_logs=DEFAULTS['practice_logs'],
+             events=DEFAULTS['events'], seed=1):
+    """シート名 → 行のイテレータ の辞書を返す（Records・Attendanceは読み出し時に生成する）"""
+    rng = random.Random(seed)
+    today = date.today()
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    first_year = LATEST_EDITION_YEAR - editions + 1
+
+    player_rows = _players(rng, players, now)
+    team_records = _team_records(editions, now)
+    # 区間記録の生成で総合タイムを埋めるため、Recordsを先に読み切ってからTeamRecordsを出す
+    record_rows = list(_records(rng, records, player_rows, team_records, first_year, now))
+    individual, distance, temperature = _ekiden_sheets(rng, editions)
+
+    race_rows = [dict(zip(('race_id', 'race_name', 'short_name', 'location', 'type', 'section_count', 'importance'),
+                          race), created_at=now, updated_at=now) for race in RACES]
+    master_rows = [{'type': master_type, 'code': f'{i:02d}', 'name': name, 'sort_order': str(i)}
+                   for master_type, names in MASTERS for i, name in enumerate(names, 1)]
+    event_rows = []
+    for i in range(1, events + 1):
+        # EVT001 は今日の予定にする（計測ツールの既定URLで使う）
+        day = today if i == 1 else today + timedelta(days=rng.randint(-60, 60))
+        event_type = rng.choice(['練習', '練習', '大会', '合宿', 'ミーティング'])
+        event_rows.append({'event_id': f'EVT{i:03d}', 'date': day.isoformat(), 'event_type': event_type,
+                           'title': f'{event_type}{i}', 'start_time': '18:00', 'end_time': '20:00',
+                           'location': '陸上競技場', 'created_at': now, 'updated_at': now})
+    log_rows = []
+    for i in range(1, practice_logs + 1):
+        day = today - timedelta(days=i - 1)
+        log_rows.append({'log_id': f'LOG{i:03d}', 'date': day.isoformat(), 'title': rng.choice(['ポイント練', 'ジョグ', '距離走']),
+                         'content': '1000m×5 (3:00)', 'weather': rng.choice(['晴', '曇', '雨']),
+                         'temperature': str(rng.randint(0, 30)), 'participants': str(rng.randint(5, 30)),
+                         'created_at': now, 'updated_at': now})
+    simulations = [['created_at', 'title', 'order_data'],
+                   ['2025/01/01 10:00:00', '案1', json.dumps({sheet_api.get_ekiden_legs()[0]: 'P001'}, ensure_ascii=False)]]
+
+    return {
+        'Players': _table('Players', (p for p, _ in player_rows)),
+        'Records': _table('Records', record_rows),
+        'Races': _table('Races', race_rows),
+        'TeamRecords': _table('TeamRecords', team_records),
+        'Masters': _table('Masters', master_rows),
+        'Events': _table('Events', event_rows),
+        'PracticeLogs': _table('PracticeLogs', log_rows),
+        'Attendance': _table('Attendance', _attendance(rng, attendance_days, player_rows, today, now)),
+        'Simulations': iter(simulations),
+        '個人': iter(individual),
+        '区間距離': iter(distance),
+        '区間気温': iter(temperature),
+    }
+
+
+def build_spreadsheet(latency=0.0, scale=1, seed=1, **params):
+    """生成したデータを読み込んだフェイクのスプレッドシートを作る
+
+    Args:
+        latency: フェイクのAPI呼び出し1回あたりの遅延（秒、または関数）
+        scale: 選手・記録・出欠・練習日誌・予定の件数に掛ける倍率（大会回数は editions で指定）
+        params: generate() の引数（指定した値は scale より優先）
+    """
+    sizes = {k: v * scale for k, v in DEFAULTS.items() if k not in ('editions', 'attendance_days')}
+    sizes['editions'] = DEFAULTS['editions']
+    sizes['attendance_days'] = DEFAULTS['attendance_days']
+    sizes.update(params)
+    sh = fake_sheets.FakeSpreadsheet(latency)
+    for title, rows in generate(seed=seed, **sizes).items():
+        sh.load(title, rows)
+    return sh
+
+
+def write_csv(tables, out_dir):
+    """シートごとのCSV（<シート名>.csv、UTF-8 BOM付き）に書き出し、シート名 → 行数 を返す"""
+    os.makedirs(out_dir, exist_ok=True)
+    counts = {}
+    for title, rows in tables.items():
+        with open(os.path.join(out_dir, f'{title}.csv'), 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            count = 0
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        counts[title] = count
+    return counts
+
+
+def load_csv(out_dir, latency=0.0):
+    """write_csv で書き出したCSVからフェイクのスプレッドシートを作る"""
+    sh = fake_sheets.FakeSpreadsheet(latency)
+    for filename in sorted(os.listdir(out_dir)):
+        if filename.endswith('.csv'):
+            with open(os.path.join(out_dir, filename), encoding='utf-8-sig', newline='') as f:
+                sh.load(filename[:-4], csv.reader(f))
+    return sh
+
+
+def main(argv=None):
+    """コマンドラインからデータを生成してCSVに書き出す"""
+    parser = argparse.ArgumentParser(description='規模を指定してスプレッドシートと同じレイアウトのデータを生成')
+    for name, default in DEFAULTS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=default, help=f'件数（既定 {default}）')
+    parser.add_argument('--seed', type=int, default=1, help='乱数シード')
+    parser.add_argument('--out', required=True, help='CSVを書き出すディレクトリ')
+    args = parser.parse_args(argv)
+
+    params = {name: getattr(args, name) for name in DEFAULTS}
+    counts = write_csv(generate(seed=args.seed, **params), args.out)
+    for title, count in counts.items():
+        print(f'{title}: {count}行')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
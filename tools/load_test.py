@@ -0,0 +1,229 @@
+import argparse
+import math
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from datetime import date
+from services import sheet_api, render_cache
+from tools import fake_sheets, generate_data
+
+# ============ 同時アクセスの負荷試験 ============
+# 指導者・選手が同時にアクセスした状況を、重み付きのルートの組み合わせで再現する。
+# 既定ではフェイクのSheets API（遅延を注入）でアプリをプロセス内で動かし、gunicornの --threads と
+# 同じ数のスレッドから Flask のテストクライアントで呼び出す。--url を指定すると起動中のサーバーに送る。
+# スループット、ルートごとの p50/p95/p99、キャッシュのヒット率、Sheets APIの消費量を表示する。
+# 使い方: python -m tools.load_test [--threads 8] [--duration 20] [--latency 0.15] [--scale 10] [--url http://localhost:8080]
+
+LEGS = sheet_api.get_ekiden_legs()
+ATTENDANCE_STATUSES = ['出席', '欠席', '遅刻', '早退']
+
+# Sheets APIの読み込みの上限（1ユーザーあたり/分）
+SHEETS_QUOTA_PER_MINUTE = 60
+
+# ルート名 → 重み（選手の閲覧が中心で、指導者の出欠入力が時々入る）
+ROUTE_MIX = {
+    'index': 30,
+    'player_detail': 30,
+    'pace_analysis': 10,
+    'api_pace_analysis': 20,
+    'attendance_save': 10,
+}
+
+
+def build_request(name, rng, player_ids):
+    """ルート名から (メソッド, パス, フォーム) を作る"""
+    if name == 'index':
+        return 'GET', '/', None
+    if name == 'player_detail':
+        return 'GET', f'/player/{rng.choice(player_ids)}', None
+    if name == 'pace_analysis':
+        return 'GET', '/pace_analysis', None
+    if name == 'api_pace_analysis':
+        query = urllib.parse.urlencode({'leg': rng.choice(LEGS), 'position': rng.randint(1, 11)})
+        return 'GET', f'/api/pace_analysis?{query}', None
+    if name == 'attendance_save':
+        form = {'date': date.today().isoformat(), 'redirect_to': '/attendance'}
+        for player_id in rng.sample(player_ids, min(len(player_ids), 20)):
+            form[f'status_{player_id}'] = rng.choice(ATTENDANCE_STATUSES)
+        return 'POST', '/attendance/save', form
+    raise ValueError(f'不明なルートです: {name}')
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """リダイレクト先を取得しない（保存後のリダイレクトは別のリクエストとして数えない）"""
+
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+def _http_sender(base_url):
+    """起動中のサーバーにリクエストを送る関数を返す"""
+    opener = urllib.request.build_opener(_NoRedirect)
+
+    def send(method, path, form):
+        data = urllib.parse.urlencode(form).encode('utf-8') if form else None
+        req = urllib.request.Request(base_url.rstrip('/') + path, data=data, method=method,
+                                     headers={'Accept-Encoding': 'gzip, br'})
+        try:
+            with opener.open(req, timeout=60) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+    return send
+
+
+def _client_sender(app):
+    """プロセス内のアプリにテストクライアントで送る関数を返す（スレッドごとに作る）"""
+    client = app.test_client()
+
+    def send(method, path, form):
+        response = client.open(path, method=method, data=form, headers={'Accept-Encoding': 'gzip, br'})
+        response.close()
+        return response.status_code
+    return send
+
+
+def _percentile(sorted_values, p):
+    """最近傍順位法のパーセンタイル"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values), math.ceil(p / 100 * len(sorted_values))) - 1)
+    return sorted_values[index]
+
+
+def run(make_sender, player_ids, threads=8, duration=20.0, max_requests=None, seed=1, mix=ROUTE_MIX):
+    """負荷をかけ、ルート名 → [(ミリ秒, ステータス), ...] と経過秒数を返す"""
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    results = defaultdict(list)
+    lock = threading.Lock()
+    sent = [0]
+    deadline = time.perf_counter() + duration
+
+    def worker(index):
+        rng = random.Random(seed * 1000 + index)
+        send = make_sender()
+        while time.perf_counter() < deadline:
+            with lock:
+                if max_requests is not None and sent[0] >= max_requests:
+                    return
+                sent[0] += 1
+            name = rng.choices(names, weights)[0]
+            method, path, form = build_request(name, rng, player_ids)
+            start = time.perf_counter()
+            try:
+                status = send(method, path, form)
+            except Exception:
+                status = 0
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                results[name].append((elapsed, status))
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return results, time.perf_counter() - started
+
+
+def _hit_rate(hits, misses):
+    total = hits + misses
+    return f'{hits / total * 100:5.1f}% ({hits}/{total})' if total else '    -'
+
+
+def report(results, elapsed, calls=None, cache_before=None, cache_after=None):
+    """結果を表示"""
+    total = sum(len(v) for v in results.values())
+    errors = sum(1 for v in results.values() for _, status in v if status == 0 or status >= 500)
+    print(f'リクエスト {total}件 / {elapsed:.1f}秒 = {total / elapsed if elapsed else 0:.1f} req/s（エラー {errors}件）')
+    print(f"{'ルート':<20} {'件数':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'最大':>9}")
+    everything = []
+    for name in sorted(results):
+        values = sorted(ms for ms, _ in results[name])
+        everything.extend(values)
+        print(f'{name:<20} {len(values):>6} {_percentile(values, 50):>7.1f}ms {_percentile(values, 95):>7.1f}ms '
+              f'{_percentile(values, 99):>7.1f}ms {values[-1]:>7.1f}ms')
+    everything.sort()
+    if everything:
+        print(f"{'全体':<20} {len(everything):>6} {_percentile(everything, 50):>7.1f}ms "
+              f'{_percentile(everything, 95):>7.1f}ms {_percentile(everything, 99):>7.1f}ms {everything[-1]:>7.1f}ms')
+
+    if cache_before is not None:
+        print('キャッシュのヒット率:')
+        for label, key in (('データ', 'data'), ('集計結果', 'derived'), ('描画結果', 'pages')):
+            before, after = cache_before[key], cache_after[key]
+            delta = {result: after.get(result, 0) - before.get(result, 0) for result in after}
+            misses = delta.get('miss', 0) + delta.get('expired', 0)
+            hits = sum(n for result, n in delta.items() if result not in ('miss', 'expired', 'evicted'))
+            print(f'  {label:<8} {_hit_rate(hits, misses)}')
+
+    if calls is not None:
+        writes = sum(n for (method, _), n in calls.items() if method in fake_sheets.WRITE_METHODS)
+        reads = sum(calls.values()) - writes
+        per_minute = reads / elapsed * 60 if elapsed else 0
+        print(f'Sheets API: 読み込み {reads}回・書き込み {writes}回 '
+              f'（読み込み {per_minute:.0f}回/分、上限 {SHEETS_QUOTA_PER_MINUTE}回/分の {per_minute / SHEETS_QUOTA_PER_MINUTE * 100:.0f}%）')
+        for (method, title), n in calls.most_common(8):
+            print(f"  {n:>6}  {method} {title or ''}")
+
+
+def _cache_counts():
+    """sheet_api・描画結果キャッシュのヒット・ミス回数"""
+    stats = sheet_api.get_cache_stats()
+    stats['pages'] = {'hit': render_cache.pages.hits, 'miss': render_cache.pages.misses}
+    return stats
+
+
+def main(argv=None):
+    """コマンドラインから負荷試験を実行"""
+    parser = argparse.ArgumentParser(description='ルートの組み合わせで同時アクセスの負荷をかける')
+    parser.add_argument('--threads', type=int, default=8, help='同時に送るスレッド数（gunicornの--threadsに合わせる）')
+    parser.add_argument('--duration', type=float, default=20.0, help='実行する秒数')
+    parser.add_argument('--requests', type=int, help='送るリクエストの最大件数')
+    parser.add_argument('--latency', type=float, default=0.15, help='フェイクのAPI呼び出し1回あたりの遅延（秒）')
+    parser.add_argument('--scale', type=int, default=1, help='フェイクのデータ量の倍率（tools.generate_data）')
+    parser.add_argument('--url', help='起動中のサーバーのURL（指定時はフェイクを使わずHTTPで送る）')
+    parser.add_argument('--players', type=int, default=60, help='--url指定時に使う選手IDの数（P001〜）')
+    parser.add_argument('--warm', action='store_true', help='計測前に各ルートを1回呼び出してキャッシュを作る')
+    parser.add_argument('--seed', type=int, default=1, help='ルート選択の乱数シード')
+    args = parser.parse_args(argv)
+
+    if args.url:
+        player_ids = [f'P{i:03d}' for i in range(1, args.players + 1)]
+        make_sender = lambda: _http_sender(args.url)
+        sheet = None
+    else:
+        from main import app
+        sheet = fake_sheets.install(generate_data.build_spreadsheet(args.latency, args.scale))
+        player_ids = [str(p['id']) for p in sheet_api.get_all_players()]
+        fake_sheets.reset_caches()
+        make_sender = lambda: _client_sender(app)
+
+    if args.warm:
+        send = make_sender()
+        rng = random.Random(args.seed)
+        for name in ROUTE_MIX:
+            if name != 'attendance_save':
+                send(*build_request(name, rng, player_ids))
+
+    cache_before = None if sheet is None else _cache_counts()
+    if sheet is not None:
+        sheet.calls.reset()
+    results, elapsed = run(make_sender, player_ids, args.threads, args.duration, args.requests, args.seed)
+    if sheet is None:
+        report(results, elapsed)
+    else:
+        report(results, elapsed, sheet.calls.snapshot(), cache_before, _cache_counts())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
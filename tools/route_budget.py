@@ -0,0 +1,379 @@
+import argparse
+import io
+import sys
+import time
+from urllib.parse import quote
+from tools import fake_sheets, generate_data
+
+# ============ ルートごとのAPI呼び出し回数・応答時間の予算 ============
+# フェイクのSheets APIでアプリを動かし、main.py の全ルートを Flask のテストクライアントで呼び出す。
+# 初回（キャッシュなし）と2回目（キャッシュあり）のAPI呼び出し回数と応答時間を測り、予算を超えたら失敗にする。
+# 使い方: python -m tools.route_budget [--latency 0.05] [--scale 10] [--route /player/<player_id>]
+
+LEG = '第１区遊佐～酒田'
+
+# GETのルール → 計測に使うURL（GETを受け付けるルールはすべて載せる。載っていなければ失敗）
+SAMPLE_URLS = {
+    '/': '/',
+    '/player/<player_id>': '/player/P001',
+    '/player/add': '/player/add',
+    '/player/<player_id>/edit': '/player/P001/edit',
+    '/record/add': '/record/add',
+    '/record/<int:row_index>/edit': '/record/3/edit',
+    '/api/records': '/api/records?player_id=P001',
+    '/api/snapshot': '/api/snapshot',
+    '/api/changes': '/api/changes?since=0',
+    '/simulation': '/simulation',
+    '/api/simulation/<int:row_index>': '/api/simulation/2',
+    '/api/predictions': '/api/predictions?leg=' + quote(LEG),
+    '/statistics': '/statistics',
+    '/export/<profile>': '/export/records',
+    '/import': '/import',
+    '/races': '/races',
+    '/race/detail/<path:race_name>': '/race/detail/' + quote('記録会'),
+    '/race/section/<path:race_name>/<section>': '/race/section/' + quote('山形県縦断駅伝競走大会') + '/1',
+    '/ekiden/section/<int:edition>/<path:leg>': '/ekiden/section/68/' + quote(LEG),
+    '/race/add': '/race/add',
+    '/race/<race_id>/edit': '/race/RAC001/edit',
+    '/ekiden': '/ekiden',
+    '/ekiden/<race_id>': '/ekiden/RAC001',
+    '/team_records': '/team_records',
+    '/team_record/add': '/team_record/add',
+    '/team_record/<team_record_id>': '/team_record/TR001',
+    '/team_record/<team_record_id>/sections': '/team_record/TR001/sections',
+    '/masters': '/masters',
+    '/calendar': '/calendar',
+    '/event/add': '/event/add',
+    '/event/<event_id>/edit': '/event/EVT001/edit',
+    '/practice_logs': '/practice_logs',
+    '/practice_log/add': '/practice_log/add',
+    '/practice_log/<log_id>': '/practice_log/LOG001',
+    '/practice_log/<log_id>/edit': '/practice_log/LOG001/edit',
+    '/attendance': '/attendance',
+    '/attendance/player/<player_id>': '/attendance/player/P001',
+    '/analysis': '/analysis',
+    '/pace_analysis': '/pace_analysis',
+    '/api/pace_analysis': '/api/pace_analysis?leg=' + quote(LEG) + '&position=1',
+    '/api/team_sections': '/api/team_sections',
+    '/api/team_section_all_editions': '/api/team_section_all_editions',
+    '/api/pace_statistics': '/api/pace_statistics',
+    '/api/pace_temperature': '/api/pace_temperature?leg=' + quote(LEG) + '&temperature=20',
+    '/static/dist/<filename>': None,  # 起動時に決まるハッシュ付きの名前を使う（_sample_url）
+    '/sw.js': '/sw.js',
+    '/metrics': '/metrics',
+    '/ready': '/ready',
+    '/admin/profiles': '/admin/profiles',
+    '/admin/profiles/<name>': '/admin/profiles/20250101-000000-000000',
+}
+
+# CSVインポートの計測に使うファイル（複数行でもまとめて1回で追記されることを確認する）
+IMPORT_CSV = (
+    'player_id,date,event,time\n'
+    'P001,2026-09-01,5000m,15:10\n'
+    'P003,2026-09-01,5000m,15:20\n'
+    'P004,2026-09-01,10000m,31:40\n'
+).encode('utf-8')
+
+# POSTのルール → (URL, フォーム, JSON, 先に開く画面)。先に画面を開いてキャッシュがある状態で測る
+# POSTを受け付けるルールはすべて載せる（載っていなければ失敗）。フォームの (バイト列, ファイル名) はアップロードとして送る
+WRITE_REQUESTS = {
+    '/player/add': ('/player/add', {'name_sei': '山田', 'name_mei': '太郎', 'status': '現役'}, None, '/player/add'),
+    '/player/<player_id>/edit': ('/player/P001/edit', {'name_sei': '山田', 'name_mei': '一郎', 'status': '現役'},
+                                 None, '/player/P001/edit'),
+    '/record/add': ('/record/add', {'player_id': 'P001', 'date': '2026-10-01', 'event': '5000m', 'time': '15:00'},
+                    None, '/record/add'),
+    '/record/<int:row_index>/edit': ('/record/3/edit', {'player_id': 'P001', 'date': '2026-10-01', 'event': '5000m',
+                                                        'time': '15:05'}, None, '/record/3/edit'),
+    '/record/<int:row_index>/delete': ('/record/3/delete', {}, None, '/player/P001'),
+    '/import': ('/import', {'kind': 'records', 'file': (IMPORT_CSV, 'records.csv')}, None, '/import'),
+    '/race/add': ('/race/add', {'race_name': '新人戦', 'type': 'トラック'}, None, '/races'),
+    '/race/<race_id>/edit': ('/race/RAC002/edit', {'race_name': '記録会', 'short_name': '記録会', 'type': 'トラック'},
+                             None, '/race/RAC002/edit'),
+    '/race/<race_id>/delete': ('/race/RAC004/delete', {}, None, '/races'),
+    '/team_record/add': ('/team_record/add', {'race_id': 'RAC005', 'edition': '70', 'date': '2026-10-01',
+                                              'total_time': '2:10:00', 'team_name': '山形'}, None, '/team_records'),
+    '/team_record/<team_record_id>/delete': ('/team_record/TR002/delete', {}, None, '/team_records'),
+    '/team_record/<team_record_id>/section/add': (
+        '/team_record/TR001/section/add', {'section': '30', 'player_id': 'P001', 'time': '15:00'},
+        None, '/team_record/TR001'),
+    '/team_record/<team_record_id>/sections': (
+        '/team_record/TR001/sections',
+        {'section[]': ['30', '31', '32'], 'player_id[]': ['P001', 'P003', 'P004'],
+         'time[]': ['15:00', '15:10', '15:20']},
+        None, '/team_record/TR001/sections'),
+    '/master/add': ('/master/add', {'type': 'category_list', 'code': 'h', 'name': '高校生', 'sort_order': '2'},
+                    None, '/masters'),
+    '/master/delete': ('/master/delete', {'type': 'weather_list', 'code': '04'}, None, '/masters'),
+    '/event/add': ('/event/add', {'date': '2026-10-01', 'event_type': '練習', 'title': '距離走'},
+                   None, '/calendar'),
+    '/event/<event_id>/edit': ('/event/EVT001/edit', {'date': '2026-10-01', 'event_type': '練習', 'title': 'ポイント練習'},
+                               None, '/event/EVT001/edit'),
+    '/event/<event_id>/delete': ('/event/EVT002/delete', {}, None, '/calendar'),
+    '/practice_log/add': ('/practice_log/add', {'date': '2000-01-01', 'title': '距離走', 'status_P001': '出席'},
+                          None, '/practice_log/add'),
+    '/practice_log/<log_id>/edit': ('/practice_log/LOG001/edit', {'date': '2026-10-01', 'title': 'ペース走'},
+                                    None, '/practice_log/LOG001/edit'),
+    '/practice_log/<log_id>/delete': ('/practice_log/LOG002/delete', {}, None, '/practice_logs'),
+    '/attendance/save': ('/attendance/save', {'date': '2000-01-01', 'status_P001': '出席', 'status_P002': '欠席'},
+                         None, '/attendance'),
+    '/simulation/save': ('/simulation/save', None, {'title': '案2', 'order_data': {LEG: 'P001'}}, '/simulation'),
+    '/api/simulation/optimize': ('/api/simulation/optimize', None, {'alternatives': 1}, '/simulation'),
+    '/admin/login': ('/admin/login', {'token': 'x'}, None, '/admin/profiles'),
+}
+
+# 失敗するのが正しいPOSTのルール（管理者が無効な環境でのログイン）
+EXPECTED_FAILURES = {'/admin/login'}
+
+# 成功時に画面を表示するPOSTのルール（それ以外のフォームは成功するとリダイレクト、JSONのAPIは2xx）
+RENDERS_ON_SUCCESS = {'/import'}
+
+# ルール → (初回のAPI呼び出し回数, 2回目のAPI呼び出し回数) の上限
+# 初回は「更新日時の確認 + 参照テーブルごとにシートを開く・全件取得」、2回目は0回（キャッシュ）が基本。
+# 現状の回数を上限にしているので、ルートの変更で回数が増えたら見直すこと。
+CALL_BUDGETS = {
+    '/': (3, 0),
+    '/player/<player_id>': (7, 0),
+    '/player/add': (3, 0),
+    '/player/<player_id>/edit': (5, 2),  # 編集画面は最新の行を直接読む（シートを開く + row_values）
+    '/record/add': (3, 0),
+    '/record/<int:row_index>/edit': (5, 2),
+    '/api/records': (3, 0),
+    '/api/snapshot': (9, 0),
+    '/api/changes': (19, 0),
+    '/simulation': (7, 0),
+    '/api/simulation/<int:row_index>': (3, 0),
+    '/api/predictions': (9, 0),
+    '/statistics': (5, 0),
+    '/export/<profile>': (5, 0),
+    '/import': (0, 0),
+    '/races': (5, 0),
+    '/race/detail/<path:race_name>': (5, 0),
+    '/race/section/<path:race_name>/<section>': (5, 0),
+    '/ekiden/section/<int:edition>/<path:leg>': (7, 0),
+    '/race/add': (3, 0),
+    '/race/<race_id>/edit': (5, 0),
+    '/ekiden': (3, 0),
+    '/ekiden/<race_id>': (5, 0),
+    '/team_records': (5, 0),
+    '/team_record/add': (3, 0),
+    '/team_record/<team_record_id>': (9, 0),
+    '/team_record/<team_record_id>/sections': (9, 0),
+    '/masters': (3, 0),
+    '/calendar': (7, 0),
+    '/event/add': (3, 0),
+    '/event/<event_id>/edit': (5, 0),
+    '/practice_logs': (3, 0),
+    '/practice_log/add': (5, 0),
+    '/practice_log/<log_id>': (7, 0),
+    '/practice_log/<log_id>/edit': (9, 0),
+    '/attendance': (5, 0),
+    '/attendance/player/<player_id>': (7, 0),
+    '/analysis': (0, 0),
+    '/pace_analysis': (0, 0),
+    '/api/pace_analysis': (7, 0),
+    '/api/team_sections': (3, 0),
+    '/api/team_section_all_editions': (7, 0),
+    '/api/pace_statistics': (5, 0),
+    '/api/pace_temperature': (7, 0),
+    '/static/dist/<filename>': (0, 0),
+    '/sw.js': (0, 0),
+    '/metrics': (0, 0),
+    '/ready': (0, 0),
+    '/admin/profiles': (0, 0),
+    '/admin/profiles/<name>': (0, 0),
+}
+
+# POSTのルール → 画面表示後のAPI呼び出し回数の上限
+# 複数行の書き込み（CSVインポート・区間のまとめ入力・出欠）は行数によらず append_rows 1回で書き込む
+WRITE_CALL_BUDGETS = {
+    '/player/add': 3,
+    '/player/<player_id>/edit': 5,
+    '/record/add': 5,
+    '/record/<int:row_index>/edit': 7,
+    '/record/<int:row_index>/delete': 4,
+    '/import': 10,  # 追記後に結果画面を表示するための再読み込みを含む
+    '/race/add': 3,
+    '/race/<race_id>/edit': 3,
+    '/race/<race_id>/delete': 3,
+    '/team_record/add': 3,
+    '/team_record/<team_record_id>/delete': 3,
+    '/team_record/<team_record_id>/section/add': 5,
+    '/team_record/<team_record_id>/sections': 5,
+    '/master/add': 2,
+    '/master/delete': 3,
+    '/event/add': 3,
+    '/event/<event_id>/edit': 3,
+    '/event/<event_id>/delete': 3,
+    '/practice_log/add': 11,  # 日誌の追記と出欠の一括登録
+    '/practice_log/<log_id>/edit': 3,
+    '/practice_log/<log_id>/delete': 3,
+    '/attendance/save': 5,
+    '/simulation/save': 2,
+    '/api/simulation/optimize': 2,
+    '/admin/login': 0,
+}
+
+# 応答時間の上限（ミリ秒、注入した遅延を除く）。重いルールだけ個別に指定する
+COLD_MS_BUDGET = 300
+WARM_MS_BUDGET = 30
+MS_BUDGETS = {
+    '/api/changes': (600, WARM_MS_BUDGET),
+    '/api/simulation/optimize': (COLD_MS_BUDGET, 300),
+}
+
+
+def _sample_url(rule):
+    """ルールの計測用URL（なければNone）"""
+    if rule == '/static/dist/<filename>':
+        from services import assets
+        return assets.asset_url('css/base.css')
+    return SAMPLE_URLS.get(rule)
+
+
+def _request(client, sheet, method, url, form=None, json=None):
+    """1回リクエストし、(ステータス, API呼び出し回数, ミリ秒) を返す"""
+    sheet.calls.reset()
+    start = time.perf_counter()
+    response = client.open(url, method=method, data=form, json=json)
+    elapsed = (time.perf_counter() - start) * 1000
+    response.close()
+    return response.status_code, sheet.calls.total(), elapsed
+
+
+def _ms_budget(rule, index, calls, latency):
+    """応答時間の上限（注入した遅延の分を足す）"""
+    budget = MS_BUDGETS.get(rule, (COLD_MS_BUDGET, WARM_MS_BUDGET))[index]
+    return budget + calls * latency * 1000
+
+
+def measure_reads(app, rules, latency, scale=1):
+    """GETのルールを初回・2回目の順に呼び出して計測し、結果の行のリストを返す"""
+    results = []
+    for rule in rules:
+        url = _sample_url(rule)
+        if url is None:
+            results.append({'rule': rule, 'error': '計測用URLが未登録です（SAMPLE_URLSに追加してください）'})
+            continue
+        sheet = fake_sheets.install(generate_data.build_spreadsheet(latency, scale))
+        client = app.test_client()
+        cold = _request(client, sheet, 'GET', url)
+        warm = _request(client, sheet, 'GET', url)
+        results.append({'rule': rule, 'url': url, 'cold': cold, 'warm': warm})
+    return results
+
+
+def _form_data(form):
+    """フォームの (バイト列, ファイル名) をアップロード用のファイルにする（毎回新しく作る）"""
+    if form is None:
+        return None
+    return {k: (io.BytesIO(v[0]), v[1]) if isinstance(v, tuple) else v for k, v in form.items()}
+
+
+def _failed_flashes(client):
+    """失敗を示すフラッシュメッセージ（warning/danger、画面を表示した場合は表示済みのため残らない）"""
+    with client.session_transaction() as session:
+        return [message for category, message in session.get('_flashes', []) if category in ('warning', 'danger')]
+
+
+def measure_writes(app, rules, latency, scale=1):
+    """POSTのルールを、画面を開いてキャッシュがある状態から呼び出して計測する"""
+    results = []
+    for rule in rules:
+        if rule not in WRITE_REQUESTS:
+            results.append({'rule': rule, 'error': '計測用のリクエストが未登録です（WRITE_REQUESTSに追加してください）'})
+            continue
+        url, form, json, page = WRITE_REQUESTS[rule]
+        sheet = fake_sheets.install(generate_data.build_spreadsheet(latency, scale))
+        client = app.test_client()
+        client.get(page).close()
+        row = {'rule': rule, 'url': url, 'write': _request(client, sheet, 'POST', url, _form_data(form), json)}
+        status = row['write'][0]
+        failures = _failed_flashes(client)
+        if json is None and rule not in RENDERS_ON_SUCCESS:
+            succeeded = 300 <= status < 400
+        else:
+            succeeded = 200 <= status < 300
+        if not succeeded and not failures:
+            failures = [f'ステータス {status}']
+        if failures and rule not in EXPECTED_FAILURES:
+            # 失敗した書き込みは呼び出し回数が少なく出るため、予算の確認にならない
+            row = {'rule': rule, 'error': f'書き込みに失敗しました: {failures[0]}'}
+        results.append(row)
+    return results
+
+
+def check(results, latency, check_ms=True):
+    """予算を超えた項目のメッセージのリストを返す（check_ms=Falseなら応答時間は見ない）"""
+    violations = []
+    for row in results:
+        rule = row['rule']
+        if 'error' in row:
+            violations.append(f"{rule}: {row['error']}")
+            continue
+        if 'write' in row:
+            status, calls, ms = row['write']
+            limits = [('書き込み', status, calls, WRITE_CALL_BUDGETS.get(rule), ms, _ms_budget(rule, 0, calls, latency))]
+        else:
+            call_budget = CALL_BUDGETS.get(rule)
+            limits = []
+            for index, label in enumerate(('初回', '2回目')):
+                status, calls, ms = row['cold' if index == 0 else 'warm']
+                budget = call_budget[index] if call_budget else None
+                limits.append((label, status, calls, budget, ms, _ms_budget(rule, index, calls, latency)))
+        for label, status, calls, budget, ms, ms_budget in limits:
+            if status >= 500:
+                violations.append(f'{rule}: {label} ステータス {status}')
+            if budget is None:
+                violations.append(f'{rule}: API呼び出し回数の予算が未登録です（{label} {calls}回）')
+            elif calls > budget:
+                violations.append(f'{rule}: {label} API呼び出し {calls}回 > 予算 {budget}回')
+            if check_ms and ms > ms_budget:
+                violations.append(f'{rule}: {label} {ms:.0f}ms > 予算 {ms_budget:.0f}ms')
+    return violations
+
+
+def print_table(results):
+    """計測結果を表にして表示"""
+    print(f"{'ルール':<44} {'初回':>12} {'2回目':>12}")
+    for row in results:
+        if 'error' in row:
+            print(f"{row['rule']:<44} {'-':>12} {'-':>12}")
+            continue
+        cells = [row[k] for k in ('cold', 'warm', 'write') if k in row]
+        text = ' '.join(f'{calls:>3}回 {ms:>6.1f}ms' for _, calls, ms in cells)
+        print(f"{row['rule']:<44} {text}")
+
+
+def main(argv=None):
+    """コマンドラインから計測（予算超過があれば終了コード1）"""
+    parser = argparse.ArgumentParser(description='ルートごとのSheets API呼び出し回数・応答時間の予算を検証')
+    parser.add_argument('--latency', type=float, default=0.0, help='API呼び出し1回あたりに注入する遅延（秒）')
+    parser.add_argument('--scale', type=int, default=1,
+                        help='データ量の倍率（1以外では応答時間の予算は確認せず、API呼び出し回数のみ確認する）')
+    parser.add_argument('--route', action='append', help='計測するルール（複数指定可、省略時は全ルート）')
+    args = parser.parse_args(argv)
+
+    from main import app
+    app.testing = True
+
+    get_rules = sorted({rule.rule for rule in app.url_map.iter_rules()
+                        if 'GET' in rule.methods and rule.endpoint != 'static'})
+    write_rules = sorted({rule.rule for rule in app.url_map.iter_rules() if 'POST' in rule.methods})
+    if args.route:
+        get_rules = [r for r in get_rules if r in args.route]
+        write_rules = [r for r in write_rules if r in args.route]
+
+    results = (measure_reads(app, get_rules, args.latency, args.scale)
+               + measure_writes(app, write_rules, args.latency, args.scale))
+    print_table(results)
+    violations = check(results, args.latency, check_ms=args.scale == 1)
+    for message in violations:
+        print(f'予算超過: {message}', file=sys.stderr)
+    if violations:
+        return 1
+    print(f'{len(results)}ルートすべて予算内です')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# ============ 起動時間の計測 ============
+# 新しいPythonのプロセスでアプリを起動し、インタプリタの起動から main の読み込み完了までの時間、
+# main の読み込み時間、初回のSheets API利用まで遅らせたGoogleのライブラリの読み込み時間、
+# 各ページの初回・2回目の応答時間（フェイクのSheets API、遅延なし）を測る。
+# mainの読み込み時にGoogleのライブラリが読み込まれていれば終了コード1を返す。
+# 使い方: python -m tools.startup_bench [--runs 5] [--paths /,/races,/pace_analysis]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 子プロセスで実行するコード（結果をJSONで標準出力に書く）
+_CHILD = '''
+import json, sys, time
+spawned = float(sys.argv[1])
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+result = {
+    'boot_ms': (time.time() - spawned) * 1000,
+    'import_ms': (imported - start) * 1000,
+    'deferred': 'gspread' not in sys.modules and 'google.auth' not in sys.modules,
+}
+start = time.perf_counter()
+import gspread, google.auth
+result['google_ms'] = (time.perf_counter() - start) * 1000
+
+from tools import fake_sheets, generate_data
+fake_sheets.install(generate_data.build_spreadsheet())
+client = main.app.test_client()
+for label in ('初回', '2回目'):
+    for path in sys.argv[2].split(','):
+        start = time.perf_counter()
+        status = client.get(path).status_code
+        result[f'{label} {path}'] = (time.perf_counter() - start) * 1000
+        if status >= 500:
+            raise SystemExit(f'{path}: {status}')
+print(json.dumps(result, ensure_ascii=False))
+'''
+
+
+def _run_child(paths, env):
+    """子プロセスでアプリを起動して計測結果を返す"""
+    output = subprocess.run([sys.executable, '-c', _CHILD, repr(time.time()), ','.join(paths)],
+                            cwd=ROOT, env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure(paths, runs):
+    """runs回起動し、項目ごとの中央値と遅延インポートできていたかを返す"""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    for name in ('WARMUP_ON_BOOT', 'CACHE_SNAPSHOT_PATH'):
+        env.pop(name, None)
+    results = [_run_child(paths, env) for _ in range(runs)]
+    medians = {key: statistics.median(r[key] for r in results) for key in results[0] if key != 'deferred'}
+    return medians, all(r['deferred'] for r in results)
+
+
+def report(values, deferred):
+    """項目ごとの中央値を表示"""
+    labels = {
+        'boot_ms': '起動〜main読み込み完了',
+        'import_ms': 'mainの読み込み',
+        'google_ms': 'Googleのライブラリ（初回利用時）',
+    }
+    width = max(len(labels.get(k, k)) for k in values) + 2
+    for key, value in values.items():
+        print(f'{labels.get(key, key):<{width}}{value:>10.1f}ms')
+    if not deferred:
+        print('mainの読み込み時にGoogleのライブラリが読み込まれています')
+
+
+def main(argv=None):
+    """コマンドラインから起動時間を計測"""
+    parser = argparse.ArgumentParser(description='アプリの起動時間と初回リクエストの応答時間を計測する')
+    parser.add_argument('--runs', type=int, default=5, help='起動回数（中央値を表示）')
+    parser.add_argument('--paths', default='/,/races,/pace_analysis', help='初回・2回目を計測するパス（カンマ区切り）')
+    args = parser.parse_args(argv)
+    paths = [p for p in args.paths.split(',') if p]
+
+    values, deferred = measure(paths, args.runs)
+    report(values, deferred)
+    return 0 if deferred else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())